@@ -5,28 +5,25 @@ Provides REST API endpoints and WebSocket connections for the Next.js dashboard
 """
 
 import asyncio
-import json
 import sys
 import os
+import time
+from collections import defaultdict
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 import uvicorn
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-import pandas as pd
+from fastapi.responses import ORJSONResponse
+import orjson
 
 # Add src directory to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
-# Import trading bot components
-from core.database_schema import TradingDatabase
-from core.binance_client import BinanceClient
-from core.risk_management import RiskManager
-from strategies.strategy_engine import StrategyEngine
+# Trading bot components are imported lazily by the getters below
 import config
 
-app = FastAPI(title="Trading Bot Dashboard API", version="1.0.0")
+app = FastAPI(title="Trading Bot Dashboard API", version="1.0.0", default_response_class=ORJSONResponse)
 
 # Enable CORS for Next.js dashboard
 app.add_middleware(
@@ -37,11 +34,50 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Global instances
+# Trade fields each endpoint actually reads; everything else stays on the server
+LIST_TRADE_FIELDS = {"timestamp": 1, "symbol": 1, "side": 1, "quantity": 1, "price": 1,
+                     "pnl": 1, "pnl_percentage": 1, "strategy": 1, "status": 1}
+PORTFOLIO_TRADE_FIELDS = {"pnl": 1, "timestamp": 1, "_id": 0}
+
+# Global instances, created on first use
 database = None
 exchange = None
-risk_manager = None
-strategy_engine = None
+
+def _get_database():
+    """Shared TradingDatabase, connected on first use"""
+    global database
+    if database is None:
+        from core.database_schema import TradingDatabase
+        database = TradingDatabase()
+    return database
+
+def _get_exchange():
+    """Shared BinanceClient, connected on first use"""
+    global exchange
+    if exchange is None:
+        from core.binance_client import BinanceClient
+        exchange = BinanceClient()
+    return exchange
+
+# Short-lived response cache: key -> (monotonic time computed, response)
+_response_cache: Dict[str, Tuple[float, Any]] = {}
+_response_cache_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+async def _cached_response(key: str, ttl: float, compute: Callable[[], Awaitable[Any]]) -> Any:
+    """Serve key from cache for ttl seconds; concurrent misses wait for a single compute"""
+    async with _response_cache_locks[key]:
+        cached = _response_cache.get(key)
+        now = time.monotonic()
+        if cached and now - cached[0] < ttl:
+            return cached[1]
+        
+        response = await compute()
+        _response_cache[key] = (now, response)
+        return response
+
+def _encode_frame(message: Dict[str, Any]) -> str:
+    """Serialize a WebSocket message (datetimes included) with orjson"""
+    return orjson.dumps(message).decode()
 
 # WebSocket connection manager
 class ConnectionManager:
@@ -53,51 +89,66 @@ class ConnectionManager:
         self.active_connections.append(websocket)
 
     def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+        if websocket in self.active_connections:
+            self.active_connections.remove(websocket)
 
     async def send_personal_message(self, message: str, websocket: WebSocket):
         await websocket.send_text(message)
 
     async def broadcast(self, message: str):
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(message)
-            except:
-                # Connection might be closed
-                pass
+        """Send one encoded frame to every client concurrently; clients whose send fails are dropped"""
+        connections = list(self.active_connections)
+        results = await asyncio.gather(*(connection.send_text(message) for connection in connections),
+                                       return_exceptions=True)
+        for connection, result in zip(connections, results):
+            if isinstance(result, Exception):
+                self.disconnect(connection)
 
 manager = ConnectionManager()
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize trading bot components on startup"""
-    global database, exchange, risk_manager, strategy_engine
-    
+    """Server startup; database and exchange connect on the first request that needs them"""
     print("🚀 Starting Dashboard API Server...")
-    
-    # Initialize components
-    database = TradingDatabase()
-    exchange = BinanceClient()
-    strategy_engine = StrategyEngine(database)
-    risk_manager = RiskManager(database, config.STRATEGY_CONFIG)
-    
+    app.state.market_broadcast = asyncio.create_task(broadcast_market_data())  # keep a reference
     print("✅ Dashboard API Server ready!")
 
+async def broadcast_market_data():
+    """Fetch market data once every 30 seconds and push the same frame to all WebSocket clients"""
+    while True:
+        await asyncio.sleep(30)
+        if not manager.active_connections:
+            continue
+        
+        try:
+            market_data = await get_market_data()
+        except Exception as e:
+            print(f"Market data broadcast error: {e}")
+            continue
+        
+        await manager.broadcast(_encode_frame({
+            "type": "market_data",
+            "data": market_data
+        }))
+
 @app.get("/api/status")
 async def get_bot_status():
     """Get trading bot status and statistics"""
+    return await _cached_response("status", 5, _bot_status)
+
+async def _bot_status():
     try:
-        # Get recent trades from database
-        trades = list(database.trades.find().limit(100).sort("timestamp", -1)) if database else []
+        # Count recent trades and winners on the server
+        database = _get_database()
+        stats = database.get_recent_trade_stats(limit=100) if database else {}
         
         # Calculate statistics
-        total_trades = len(trades) if trades else 0
+        total_trades = stats.get('total_trades', 0)
         active_trades = 0  # This would come from open positions
         
         # Calculate success rate
-        if trades:
-            profitable_trades = len([t for t in trades if t.get('pnl', 0) > 0])
-            success_rate = (profitable_trades / total_trades) * 100 if total_trades > 0 else 0
+        if total_trades:
+            success_rate = (stats['profitable_trades'] / total_trades) * 100
         else:
             success_rate = 75.0  # Default success rate
         
@@ -107,7 +158,7 @@ async def get_bot_status():
             "activeTrades": active_trades,
             "totalTrades": total_trades,
             "successRate": success_rate,
-            "lastUpdate": datetime.utcnow().isoformat(),
+            "lastUpdate": datetime.utcnow(),
             "strategies": ["RSI Oversold", "Bollinger Bands", "MACD Crossover", "EMA Trend"]
         }
     except Exception as e:
@@ -119,14 +170,18 @@ async def get_bot_status():
             "activeTrades": 3,
             "totalTrades": 127,
             "successRate": 73.5,
-            "lastUpdate": datetime.utcnow().isoformat(),
+            "lastUpdate": datetime.utcnow(),
             "strategies": ["RSI Oversold", "Bollinger Bands", "MACD Crossover", "EMA Trend"]
         }
 
 @app.get("/api/balance")
 async def get_balance():
     """Get account balance information"""
+    return await _cached_response("balance", 5, _balance)
+
+async def _balance():
     try:
+        exchange = _get_exchange()
         if not exchange or not exchange.client:
             # Return demo data if exchange not connected
             return {
@@ -189,14 +244,33 @@ async def get_trades(limit: int = 50, offset: int = 0):
     """Get trade history"""
     try:
         # Get trades from database
-        trades = list(database.trades.find().sort("timestamp", -1).limit(limit + offset)) if database else []
+        database = _get_database()
+        trades = database.get_recent_trades(limit=limit, projection=LIST_TRADE_FIELDS, skip=offset) if database else []
+        
+        # Process database trades as the cursor streams them
+        processed_trades = [
+            {
+                "id": str(trade.get('_id', '')),
+                "timestamp": trade.get('timestamp', datetime.utcnow()),
+                "symbol": trade.get('symbol', 'ETH/USDT'),
+                "type": trade.get('side', 'buy').lower(),
+                "quantity": trade.get('quantity', 0),
+                "price": trade.get('price', 0),
+                "total": trade.get('quantity', 0) * trade.get('price', 0),
+                "pnl": trade.get('pnl', 0),
+                "pnlPercentage": trade.get('pnl_percentage', 0),
+                "strategy": trade.get('strategy', 'Unknown'),
+                "status": trade.get('status', 'completed')
+            }
+            for trade in trades
+        ]
         
-        if not trades:
+        if not processed_trades:
             # Return demo trades if no database trades
             demo_trades = [
                 {
                     "id": "1",
-                    "timestamp": (datetime.utcnow() - timedelta(hours=2)).isoformat(),
+                    "timestamp": datetime.utcnow() - timedelta(hours=2),
                     "symbol": "ETH/USDT",
                     "type": "buy",
                     "quantity": 0.5,
@@ -209,7 +283,7 @@ async def get_trades(limit: int = 50, offset: int = 0):
                 },
                 {
                     "id": "2",
-                    "timestamp": (datetime.utcnow() - timedelta(hours=5)).isoformat(),
+                    "timestamp": datetime.utcnow() - timedelta(hours=5),
                     "symbol": "ETH/USDT",
                     "type": "sell",
                     "quantity": 0.3,
@@ -223,31 +297,14 @@ async def get_trades(limit: int = 50, offset: int = 0):
             ]
             return {"trades": demo_trades[offset:offset+limit], "total": len(demo_trades)}
         
-        # Process database trades
-        processed_trades = []
-        for trade in trades[offset:offset+limit]:
-            processed_trades.append({
-                "id": str(trade.get('_id', '')),
-                "timestamp": trade.get('timestamp', datetime.utcnow()).isoformat(),
-                "symbol": trade.get('symbol', 'ETH/USDT'),
-                "type": trade.get('side', 'buy').lower(),
-                "quantity": trade.get('quantity', 0),
-                "price": trade.get('price', 0),
-                "total": trade.get('quantity', 0) * trade.get('price', 0),
-                "pnl": trade.get('pnl', 0),
-                "pnlPercentage": trade.get('pnl_percentage', 0),
-                "strategy": trade.get('strategy', 'Unknown'),
-                "status": trade.get('status', 'completed')
-            })
-        
-        return {"trades": processed_trades, "total": len(trades)}
+        return {"trades": processed_trades, "total": offset + len(processed_trades)}
     except Exception as e:
         print(f"Trades error: {e}")
         # Return demo data if error
         demo_trades = [
             {
                 "id": "1",
-                "timestamp": (datetime.utcnow() - timedelta(hours=2)).isoformat(),
+                "timestamp": datetime.utcnow() - timedelta(hours=2),
                 "symbol": "ETH/USDT",
                 "type": "buy",
                 "quantity": 0.5,
@@ -260,7 +317,7 @@ async def get_trades(limit: int = 50, offset: int = 0):
             },
             {
                 "id": "2",
-                "timestamp": (datetime.utcnow() - timedelta(hours=5)).isoformat(),
+                "timestamp": datetime.utcnow() - timedelta(hours=5),
                 "symbol": "ETH/USDT",
                 "type": "sell",
                 "quantity": 0.3,
@@ -277,9 +334,12 @@ async def get_trades(limit: int = 50, offset: int = 0):
 @app.get("/api/portfolio")
 async def get_portfolio():
     """Get portfolio analytics data"""
+    return await _cached_response("portfolio", 30, _portfolio)
+
+async def _portfolio():
     try:
         # Get recent trades for calculations
-        trades = database.get_recent_trades(limit=100) or []
+        trades = list(_get_database().get_recent_trades(limit=100, projection=PORTFOLIO_TRADE_FIELDS))
         
         # Calculate portfolio metrics
         total_pnl = sum(trade.get('pnl', 0) for trade in trades)
@@ -293,7 +353,7 @@ async def get_portfolio():
             date = datetime.utcnow() - timedelta(days=6-i)
             pnl = (i * 100) + (50 if i % 2 == 0 else -30)
             portfolio_history.append({
-                "timestamp": date.isoformat(),
+                "timestamp": date,
                 "portfolioValue": base_value + (i * 100),
                 "pnl": pnl,
                 "cumulativePnl": sum(h["pnl"] for h in portfolio_history) + pnl
@@ -331,6 +391,7 @@ async def get_portfolio():
 async def get_market_data():
     """Get current market data"""
     try:
+        exchange = _get_exchange()
         if not exchange or not exchange.client:
             # Return demo data
             return {
@@ -341,7 +402,7 @@ async def get_market_data():
                 "volume": 1750000,
                 "high": 3000,
                 "low": 2880,
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": datetime.utcnow()
             }
         
         # Get real market data
@@ -355,7 +416,7 @@ async def get_market_data():
             "volume": float(ticker['volume']),
             "high": float(ticker['highPrice']),
             "low": float(ticker['lowPrice']),
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": datetime.utcnow()
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -366,27 +427,20 @@ async def websocket_endpoint(websocket: WebSocket):
     await manager.connect(websocket)
     try:
         # Send initial status
-        await websocket.send_text(json.dumps({
+        await websocket.send_text(_encode_frame({
             "type": "bot_status",
             "data": {
                 "isRunning": True,
                 "uptime": 3600,
                 "activeTrades": 3,
                 "totalTrades": 127,
-                "lastUpdate": datetime.utcnow().isoformat()
+                "lastUpdate": datetime.utcnow()
             }
         }))
         
-        # Keep connection alive and send periodic updates
+        # Market data updates arrive through broadcast_market_data; just wait for the client to leave
         while True:
-            await asyncio.sleep(30)  # Send updates every 30 seconds
-            
-            # Send market data update
-            market_data = await get_market_data()
-            await websocket.send_text(json.dumps({
-                "type": "market_data",
-                "data": market_data
-            }))
+            await websocket.receive_text()
             
     except WebSocketDisconnect:
         manager.disconnect(websocket)
@@ -5,18 +5,24 @@ Includes 10 sophisticated trading strategies and comprehensive market analysis
 """
 
 import asyncio
+import functools
+from dataclasses import dataclass, field, replace
+import heapq
+import itertools
+import queue
 import time
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
-import pandas as pd
-import schedule
+import numpy as np
+from bson import ObjectId
 from concurrent.futures import ThreadPoolExecutor
 import signal
 import sys
+import threading
 
 # Import our modules
 from database_schema import TradingDatabase
-from technical_indicators_simple import TechnicalIndicators
+from technical_indicators_simple import TechnicalIndicators, RSI_ZONES, BB_POSITION_ZONES
 from strategy_engine import (
     StrategyEngine, MultiIndicatorStrategy, MeanReversionStrategy,
     TrendFollowingStrategy, BreakoutStrategy
@@ -30,25 +36,65 @@ from risk_management import RiskManager
 from logger import TradingLogger, get_logger
 from enhanced_logger import EnhancedMarketLogger
 from binance_client import BinanceClient
-from backtesting_engine import AdvancedBacktester
+from binance_ws import BinanceKlineStream
+from console import buffered_output
+from market_data import TIMEFRAME_MAP, KlineArchive, MarketData, MarketDataCache
 import config
 
+# Balance reported until live account queries are implemented
+SIMULATED_BALANCE = {'total_balance': 10000.0, 'available_balance': 8000.0}
+
+@dataclass
+class SessionStats:
+    """Session counters; jobs on different threads update them via increment() and report from snapshot()"""
+    start_time: datetime = field(default_factory=datetime.utcnow)
+    signals_generated: int = 0
+    trades_attempted: int = 0
+    trades_executed: int = 0
+    trades_rejected: int = 0
+    total_pnl: float = 0.0
+    strategies_active: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
+    
+    def increment(self, name: str, amount=1):
+        """Add amount to one counter"""
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+    
+    def snapshot(self) -> 'SessionStats':
+        """Consistent copy of all counters for reporting"""
+        with self._lock:
+            return replace(self)
+    
+    @property
+    def success_rate(self) -> float:
+        return (self.trades_executed / max(self.trades_attempted, 1)) * 100
+
 class EnhancedTradingBot:
     """
     Enhanced trading bot with advanced strategies and comprehensive logging
     Features 10+ strategies and detailed 30-second market analysis
     """
     
+    # High-confidence strategies checked between the 30-second analyses
+    URGENT_STRATEGIES = ('BbandRsi', 'MacdRsi', 'VolatilityBreakout')
+    
     def __init__(self, config_dict: Dict[str, Any]):
         self.config = config_dict
         self.is_running = False
         self.is_paused = False
+        self._loop = None  # event loop of the running main loop
+        self._stop_event = None
         
         # Initialize core components
         print("🤖 Initializing Enhanced Trading Bot...")
         print("🔥 With Advanced Strategies & 30-Second Logging")
         print("=" * 60)
         
+        # Compile indicator kernels while the database and exchange connect
+        kernel_warmup = threading.Thread(target=TechnicalIndicators.warm_up_kernels, name="kernel-warmup", daemon=True)
+        kernel_warmup.start()
+        
         # Database
         self.database = TradingDatabase()
         print("✅ Database connected")
@@ -67,6 +113,15 @@ class EnhancedTradingBot:
             raise Exception("Exchange connection failed")
         print("✅ Exchange connected")
         
+        # Klines are followed over a websocket once started; until then, and whenever the
+        # stream cannot serve a request, it reads through to REST
+        self.kline_stream = BinanceKlineStream(self.exchange)
+        
+        # Trade records and trade log entries are written by a background thread so
+        # signal processing does not wait on MongoDB round trips
+        self._persist_q = queue.Queue(maxsize=10_000)
+        threading.Thread(target=self._persist_worker, name="bot-persist", daemon=True).start()
+        
         # Strategy engine with ALL strategies
         self.strategy_engine = StrategyEngine(self.database)
         self._setup_all_strategies()
@@ -76,9 +131,25 @@ class EnhancedTradingBot:
         self.risk_manager = RiskManager(self.database, config.STRATEGY_CONFIG)
         print("✅ Risk management initialized")
         
+        # In TEST_MODE the available balance is the fixed simulated one, so it is bound into
+        # the validator once instead of being looked up for every signal
+        self._validate_test_trade = (
+            functools.partial(self.risk_manager.validate_trade,
+                              account_balance=SIMULATED_BALANCE['available_balance'])
+            if config.TEST_MODE else None
+        )
+        
+        # Candles fetched by any periodic task are reused for a few seconds by the others
+        self.market_data_cache = MarketDataCache(ttl=5.0)
+        
+        # Backtest history kept on disk; repeat runs only download the newest bars
+        self.kline_archive = KlineArchive()
+        
         # Enhanced logger for 30-second analysis
         self.enhanced_logger = EnhancedMarketLogger(
-            self.database, self.strategy_engine, self.risk_manager, self.exchange
+            self.database, self.strategy_engine, self.risk_manager, self.exchange,
+            market_data_cache=self.market_data_cache, kline_source=self.kline_stream,
+            interactive=sys.stdout.isatty()
         )
         print("✅ Enhanced 30-second logger ready")
         
@@ -86,23 +157,18 @@ class EnhancedTradingBot:
         self.indicators = TechnicalIndicators()
         
         # Performance tracking
-        self.session_stats = {
-            'start_time': datetime.utcnow(),
-            'signals_generated': 0,
-            'trades_attempted': 0,
-            'trades_executed': 0,
-            'trades_rejected': 0,
-            'total_pnl': 0.0,
-            'strategies_active': len(self.strategy_engine.active_strategies)
-        }
+        self.session_stats = SessionStats(strategies_active=len(self.strategy_engine.active_strategies))
         
         # Setup signal handlers for graceful shutdown
         signal.signal(signal.SIGINT, self._signal_handler)
         signal.signal(signal.SIGTERM, self._signal_handler)
         
+        # Ready means compiled: the first 30-second analysis must not pay for JIT
+        kernel_warmup.join()
+        
         self.logger.log_system_status("INITIALIZED")
         print("🚀 Enhanced Trading Bot initialized successfully!")
-        print(f"📊 Active Strategies: {self.session_stats['strategies_active']}")
+        print(f"📊 Active Strategies: {self.session_stats.strategies_active}")
     
     def _setup_all_strategies(self):
         """Initialize and register ALL trading strategies"""
@@ -116,8 +182,7 @@ class EnhancedTradingBot:
         self.strategy_engine.register_strategy(BreakoutStrategy(config.STRATEGY_CONFIG))
         
         # Advanced strategies
-        factory = AdvancedStrategyFactory()
-        advanced_strategies = factory.get_all_strategies(config.STRATEGY_CONFIG)
+        advanced_strategies = AdvancedStrategyFactory.get_all_strategies(config.STRATEGY_CONFIG)
         
         for strategy in advanced_strategies:
             self.strategy_engine.register_strategy(strategy)
@@ -125,7 +190,7 @@ class EnhancedTradingBot:
         print(f"   📈 Registered {len(self.strategy_engine.strategies)} strategies:")
         
         # Show all available strategies
-        descriptions = factory.get_strategy_descriptions()
+        descriptions = AdvancedStrategyFactory.get_strategy_descriptions()
         for name, strategy in self.strategy_engine.strategies.items():
             description = descriptions.get(name, "Original core strategy")
             print(f"      • {name}: {description}")
@@ -144,6 +209,18 @@ class EnhancedTradingBot:
                 print(f"      ❌ {strategy_name} not found")
         
         print(f"   🎯 Total active strategies: {len(self.strategy_engine.active_strategies)}")
+        
+        self._urgent_strategies_version = None
+        self._refresh_urgent_strategies()
+    
+    def _refresh_urgent_strategies(self) -> List[str]:
+        """Active urgent strategies, re-resolved only after a strategy is activated or deactivated"""
+        version = self.strategy_engine.active_version
+        if version != self._urgent_strategies_version:
+            active = set(self.strategy_engine.active_strategies)
+            self._urgent_strategies = [name for name in self.URGENT_STRATEGIES if name in active]
+            self._urgent_strategies_version = version
+        return self._urgent_strategies
     
     def start(self):
         """Start the enhanced trading bot"""
@@ -158,6 +235,9 @@ class EnhancedTradingBot:
         print("📊 30-second detailed analysis will begin shortly...")
         
         try:
+            # Stream the trading market's candles before the periodic fetches begin
+            self._start_kline_stream()
+            
             # Start enhanced logging first
             self.enhanced_logger.start_logging()
             
@@ -175,7 +255,12 @@ class EnhancedTradingBot:
         except Exception as e:
             self.logger.error(f"Critical error in main loop: {e}", exception=e)
         finally:
-            self.stop()
+            if self.is_running:
+                self.stop()
+            else:
+                # stop() ran during startup, possibly before these were started
+                self.enhanced_logger.stop_logging()
+                self.kline_stream.stop()
     
     def stop(self):
         """Stop the trading bot gracefully"""
@@ -185,20 +270,45 @@ class EnhancedTradingBot:
         print("🛑 Stopping Enhanced Trading Bot...")
         self.is_running = False
         
+        # Wake the main loop's tasks; stop() may be called from another thread, and
+        # _run_async resets _loop on exit, so read it once
+        loop = self._loop
+        if loop is not None:
+            try:
+                loop.call_soon_threadsafe(self._stop_event.set)
+            except RuntimeError:
+                pass  # the loop closed in the meantime
+        
         # Stop enhanced logging
         self.enhanced_logger.stop_logging()
+        self.kline_stream.stop()
         
         self.logger.log_system_status("STOPPING")
         
         # Close any open positions (if needed)
         self._emergency_close_positions()
         
+        # Write out queued trades before summarizing the session
+        self._persist_q.join()
+        self.database.flush_writes()
+        
         # Generate session summary
         self._generate_session_summary()
         
         self.logger.log_system_status("STOPPED")
         print("✅ Enhanced Trading Bot stopped successfully")
     
+    def _start_kline_stream(self):
+        """Subscribe to the configured market's kline socket; REST polling remains the fallback"""
+        symbol = config.TRADING_CONFIG['symbol'].replace('/', '')
+        interval = TIMEFRAME_MAP.get(config.TRADING_CONFIG['timeframe'], '5m')
+        try:
+            self.kline_stream.start()
+            if self.kline_stream.subscribe(symbol, interval):
+                print(f"✅ Streaming {symbol} {interval} klines")
+        except Exception as e:
+            print(f"⚠️ Kline stream unavailable, polling REST instead: {e}")
+    
     def pause(self):
         """Pause trading (stop generating new signals)"""
         self.is_paused = True
@@ -211,6 +321,7 @@ class EnhancedTradingBot:
         self.logger.info("Enhanced trading bot resumed")
         print("▶️ Trading resumed")
     
+    @buffered_output()
     def _show_startup_status(self):
         """Show detailed startup status"""
         print(f"\n📋 ENHANCED TRADING BOT STATUS")
@@ -239,19 +350,19 @@ class EnhancedTradingBot:
             market_data = self._fetch_market_data(symbol, config.TRADING_CONFIG['timeframe'])
             
             if market_data is not None:
-                current_price = float(market_data['close'].iloc[-1])
+                current_price = float(market_data.close[-1])
                 indicators = self.indicators.calculate_all_indicators(market_data, config.STRATEGY_CONFIG)
                 
                 print(f"📈 INITIAL MARKET STATUS")
                 print(f"   {symbol}: ${current_price:,.2f}")
                 
                 if 'rsi' in indicators:
-                    rsi_status = "Overbought" if indicators['rsi'] > 70 else "Oversold" if indicators['rsi'] < 30 else "Neutral"
+                    rsi_status = self.indicators.classify(indicators['rsi'], RSI_ZONES, ('Oversold', 'Neutral', 'Overbought'))
                     print(f"   RSI: {indicators['rsi']:.1f} ({rsi_status})")
                 
                 if 'bb_position' in indicators:
                     bb_pos = indicators['bb_position']
-                    bb_status = "Upper band" if bb_pos > 0.8 else "Lower band" if bb_pos < 0.2 else "Middle range"
+                    bb_status = self.indicators.classify(bb_pos, BB_POSITION_ZONES, ('Lower band', 'Middle range', 'Upper band'))
                     print(f"   Bollinger Position: {bb_pos:.1%} ({bb_status})")
                 
                 if 'volume_above_average' in indicators:
@@ -263,54 +374,112 @@ class EnhancedTradingBot:
     
     def _schedule_tasks(self):
         """Schedule periodic tasks"""
+        # Heap of (next run on the monotonic clock, timer id, seconds-until-next-run function, job)
+        self._timers = []
+        self._timer_ids = itertools.count()
         
         # Enhanced analysis already runs every 30 seconds via enhanced_logger
         
         # Strategy performance review every 10 minutes
-        schedule.every(10).minutes.do(self._review_strategy_performance)
+        self._add_timer(lambda: 10 * 60, self._review_strategy_performance)
         
         # Risk monitoring every 5 minutes
-        schedule.every(5).minutes.do(self._monitor_risk)
+        self._add_timer(lambda: 5 * 60, self._monitor_risk)
         
         # Portfolio update every 15 minutes  
-        schedule.every(15).minutes.do(self._update_portfolio)
+        self._add_timer(lambda: 15 * 60, self._update_portfolio)
         
         # Hourly performance report
-        schedule.every(1).hours.do(self._generate_hourly_report)
+        self._add_timer(lambda: 60 * 60, self._generate_hourly_report)
         
         # Daily comprehensive report
-        schedule.every().day.at("09:00").do(self._generate_daily_report)
+        self._add_timer(lambda: self._seconds_until(9, 0), self._generate_daily_report)
         
-        # Weekly cleanup and optimization
-        schedule.every().sunday.at("02:00").do(self._weekly_maintenance)
+        # Weekly cleanup and optimization (Sunday)
+        self._add_timer(lambda: self._seconds_until(2, 0, weekday=6), self._weekly_maintenance)
+    
+    def _add_timer(self, next_delay, job):
+        """Queue job to run next_delay() seconds from now"""
+        heapq.heappush(self._timers, (time.monotonic() + next_delay(), next(self._timer_ids), next_delay, job))
+    
+    @staticmethod
+    def _seconds_until(hour: int, minute: int, weekday: Optional[int] = None) -> float:
+        """Seconds until the next local hh:mm, optionally on a given weekday (Monday=0)"""
+        now = datetime.now()
+        target = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if weekday is not None:
+            target += timedelta(days=(weekday - now.weekday()) % 7)
+        if target <= now:
+            target += timedelta(days=1 if weekday is None else 7)
+        return (target - now).total_seconds()
     
     def _run_main_loop(self):
         """Enhanced main event loop"""
         self.logger.log_system_status("RUNNING")
+        asyncio.run(self._run_async())
+    
+    async def _run_async(self):
+        """Run the urgent-signal, health-check and scheduler cadences as independent tasks"""
+        self._stop_event = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        # A stop() that ran before _loop was set could not wake this loop; don't start
+        if not self.is_running:
+            self._loop = None
+            return
         
-        loop_count = 0
-        last_major_analysis = time.time()
+        # Jobs are blocking REST/MongoDB calls; one worker keeps them serialized as before
+        # while the event loop itself sleeps until the next deadline
+        self._job_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bot-jobs")
         
+        tasks = [
+            asyncio.create_task(self._periodic_task(60, self._check_urgent_signals, skip_when_paused=True)),
+            asyncio.create_task(self._periodic_task(300, self._health_check)),
+            asyncio.create_task(self._scheduler_task()),
+        ]
+        try:
+            await self._stop_event.wait()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self._job_executor.shutdown(wait=False)
+            self._loop = None
+    
+    async def _sleep_until_stopped(self, seconds: float) -> bool:
+        """Sleep up to `seconds`; True if the bot was stopped in the meantime"""
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), seconds)
+            return True
+        except asyncio.TimeoutError:
+            return False
+    
+    async def _run_job(self, loop: asyncio.AbstractEventLoop, job):
+        """Run a blocking job on the job worker, logging instead of raising"""
+        try:
+            await loop.run_in_executor(self._job_executor, job)
+        except Exception as e:
+            self.logger.error(f"Error in main loop: {e}", exception=e)
+    
+    async def _periodic_task(self, interval: float, job, skip_when_paused: bool = False):
+        """Run job now and then every `interval` seconds until the bot stops"""
+        loop = asyncio.get_running_loop()
         while self.is_running:
-            try:
-                # Run scheduled tasks
-                schedule.run_pending()
-                
-                # Every minute, check for high-priority signals
-                if loop_count % 60 == 0:  # Every minute (since we sleep 1 second)
-                    if not self.is_paused:
-                        self._check_urgent_signals()
-                
-                # Every 5 minutes, ensure we're still connected
-                if loop_count % 300 == 0:  # Every 5 minutes
-                    self._health_check()
-                
-                loop_count += 1
-                time.sleep(1)  # 1 second loop
-                
-            except Exception as e:
-                self.logger.error(f"Error in main loop: {e}", exception=e)
-                time.sleep(5)  # Wait before retrying
+            if not (skip_when_paused and self.is_paused):
+                await self._run_job(loop, job)
+            if await self._sleep_until_stopped(interval):
+                return
+    
+    async def _scheduler_task(self):
+        """Sleep until the earliest timer is due, run every due job, then requeue it"""
+        loop = asyncio.get_running_loop()
+        while self.is_running and self._timers:
+            if await self._sleep_until_stopped(max(0.0, self._timers[0][0] - time.monotonic())):
+                return
+            now = time.monotonic()
+            while self._timers and self._timers[0][0] <= now:
+                _, _, next_delay, job = heapq.heappop(self._timers)
+                await self._run_job(loop, job)
+                self._add_timer(next_delay, job)
     
     def _check_urgent_signals(self):
         """Check for urgent trading signals between 30-second analyses"""
@@ -323,30 +492,34 @@ class EnhancedTradingBot:
             if market_data is None:
                 return
             
-            # Quick indicator calculation
+            # Quick indicator calculation, straight from the column arrays
             indicators = self.indicators.calculate_all_indicators(market_data, config.STRATEGY_CONFIG)
             
+            # Strategies read a frame
+            df = market_data.to_dataframe()
+            
             # Check only high-confidence strategies for urgent signals
-            urgent_strategies = ['BbandRsi', 'MacdRsi', 'VolatilityBreakout']
             urgent_signals = []
             
-            for strategy_name in urgent_strategies:
-                if strategy_name in self.strategy_engine.active_strategies:
-                    strategy = self.strategy_engine.strategies[strategy_name]
-                    signal_data = strategy.generate_signal(market_data, indicators)
-                    
-                    # Only consider high-confidence signals as urgent
-                    if signal_data['signal'] in ['BUY', 'SELL'] and signal_data['confidence'] > 0.8:
-                        urgent_signals.append(signal_data)
+            for strategy_name in self._refresh_urgent_strategies():
+                strategy = self.strategy_engine.strategies[strategy_name]
+                signal_data = strategy.generate_signal(df, indicators)
+                
+                # Only consider high-confidence signals as urgent
+                if signal_data['signal'] in ['BUY', 'SELL'] and signal_data['confidence'] > 0.8:
+                    signal_data['strategy'] = strategy_name
+                    urgent_signals.append(signal_data)
             
             # Process urgent signals
             if urgent_signals:
-                print(f"\n🚨 URGENT SIGNAL DETECTED - {datetime.utcnow().strftime('%H:%M:%S')}")
+                print(f"\n🚨 URGENT SIGNAL DETECTED - {time.strftime('%H:%M:%S', time.gmtime())}")
                 for signal in urgent_signals:
                     print(f"   🎯 {signal.get('strategy', 'Unknown')}: {signal['signal']} (Confidence: {signal['confidence']:.1%})")
                 
                 # Process the highest confidence signal
-                best_signal = max(urgent_signals, key=lambda x: x['confidence'])
+                confidences = np.fromiter((signal['confidence'] for signal in urgent_signals),
+                                          dtype=np.float64, count=len(urgent_signals))
+                best_signal = urgent_signals[int(confidences.argmax())]
                 self._process_trading_signal(symbol, best_signal)
                 
         except Exception as e:
@@ -358,11 +531,11 @@ class EnhancedTradingBot:
             # Check exchange connection
             if not self.exchange.client:
                 print("⚠️ Exchange connection lost - attempting reconnection...")
-                self.exchange = BinanceClient()
+                self.exchange.connect()
             
             # Check database connection
             try:
-                self.database.logs.find_one()
+                self.database.logs.find_one({}, {"_id": 1})  # round trip only, no log body
             except Exception as e:
                 print(f"⚠️ Database connection issue: {e}")
             
@@ -375,9 +548,10 @@ class EnhancedTradingBot:
         except Exception as e:
             self.logger.error(f"Health check failed: {e}", exception=e)
     
+    @buffered_output()
     def _review_strategy_performance(self):
         """Review and compare strategy performance"""
-        print(f"\n📊 STRATEGY PERFORMANCE REVIEW - {datetime.utcnow().strftime('%H:%M:%S')}")
+        print(f"\n📊 STRATEGY PERFORMANCE REVIEW - {time.strftime('%H:%M:%S', time.gmtime())}")
         print("=" * 50)
         
         # This would analyze strategy performance from database
@@ -386,64 +560,46 @@ class EnhancedTradingBot:
         for strategy_name in self.strategy_engine.active_strategies:
             print(f"   ✅ {strategy_name}")
         
+        stats = self.session_stats.snapshot()
         print(f"📈 Session Stats:")
-        print(f"   Signals Generated: {self.session_stats['signals_generated']}")
-        print(f"   Trades Attempted: {self.session_stats['trades_attempted']}")
-        print(f"   Trades Executed: {self.session_stats['trades_executed']}")
-        
-        success_rate = (self.session_stats['trades_executed'] / max(self.session_stats['trades_attempted'], 1)) * 100
-        print(f"   Success Rate: {success_rate:.1f}%")
+        print(f"   Signals Generated: {stats.signals_generated}")
+        print(f"   Trades Attempted: {stats.trades_attempted}")
+        print(f"   Trades Executed: {stats.trades_executed}")
+        print(f"   Success Rate: {stats.success_rate:.1f}%")
     
-    def _fetch_market_data(self, symbol: str, timeframe: str, limit: int = 100) -> Optional[pd.DataFrame]:
+    def _fetch_market_data(self, symbol: str, timeframe: str, limit: int = 100) -> Optional[MarketData]:
         """Fetch market data from exchange"""
         try:
-            binance_interval = self._map_timeframe(timeframe)
-            klines = self.exchange.get_klines(symbol=symbol, interval=binance_interval, limit=limit)
-            
-            if not klines:
-                return None
-            
-            df = pd.DataFrame(klines, columns=[
-                'timestamp', 'open', 'high', 'low', 'close', 'volume',
-                'close_time', 'quote_asset_volume', 'number_of_trades',
-                'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore'
-            ])
-            
-            for col in ['open', 'high', 'low', 'close', 'volume']:
-                df[col] = pd.to_numeric(df[col])
-            
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            return df[['timestamp', 'open', 'high', 'low', 'close', 'volume']]
+            binance_interval = TIMEFRAME_MAP.get(timeframe, '5m')
+            return self.market_data_cache.get(
+                symbol, binance_interval, limit,
+                lambda n: self.kline_stream.get_klines(symbol=symbol, interval=binance_interval, limit=n)
+            )
             
         except Exception as e:
             self.logger.error(f"Error fetching market data: {e}", exception=e)
             return None
     
-    def _map_timeframe(self, timeframe: str) -> str:
-        """Map timeframe to Binance interval format"""
-        mapping = {
-            '1m': '1m', '5m': '5m', '15m': '15m', '30m': '30m',
-            '1h': '1h', '4h': '4h', '1d': '1d'
-        }
-        return mapping.get(timeframe, '5m')
-    
     def _process_trading_signal(self, symbol: str, signal_data: Dict[str, Any]):
         """Process a trading signal and execute if valid"""
         try:
-            self.session_stats['trades_attempted'] += 1
+            self.session_stats.increment('trades_attempted')
             
-            account_info = self._get_account_balance()
-            if not account_info:
-                self.logger.error("Failed to get account information")
-                return
-            
-            balance = account_info['available_balance']
-            validation_result = self.risk_manager.validate_trade(symbol, signal_data, balance)
+            if self._validate_test_trade is not None:
+                validation_result = self._validate_test_trade(symbol, signal_data)
+            else:
+                account_info = self._get_account_balance()
+                if not account_info:
+                    self.logger.error("Failed to get account information")
+                    return
+                
+                balance = account_info['available_balance']
+                validation_result = self.risk_manager.validate_trade(symbol, signal_data, balance)
             
-            self.logger.log_trade_attempt(symbol, signal_data, validation_result)
+            self._persist(self.logger.log_trade_attempt, symbol, signal_data, validation_result)
             
             if not validation_result['allowed']:
-                self.session_stats['trades_rejected'] += 1
+                self.session_stats.increment('trades_rejected')
                 print(f"❌ Trade rejected: {', '.join(validation_result['blocking_issues'])}")
                 return
             
@@ -451,10 +607,10 @@ class EnhancedTradingBot:
             success = self._execute_trade(symbol, signal_data, risk_metrics)
             
             if success:
-                self.session_stats['trades_executed'] += 1
+                self.session_stats.increment('trades_executed')
                 print(f"✅ Trade executed: {signal_data['signal']} {symbol}")
             else:
-                self.session_stats['trades_rejected'] += 1
+                self.session_stats.increment('trades_rejected')
                 
         except Exception as e:
             self.logger.error(f"Error processing trading signal: {e}", exception=e)
@@ -477,7 +633,8 @@ class EnhancedTradingBot:
                     'side': signal_data['signal'],
                     'quantity': risk_metrics['position_size'],
                     'price': signal_data['price'],
-                    'order_id': f"SIM_{int(time.time())}",
+                    # ObjectId is generated locally and unique even for several fills in one second
+                    'order_id': f"SIM_{ObjectId()}",
                     'status': 'SIMULATED',
                     'timestamp': datetime.utcnow(),
                     'strategy': signal_data.get('strategy', 'Unknown'),
@@ -485,8 +642,8 @@ class EnhancedTradingBot:
                     'pnl': 0.0
                 }
                 
-                self.database.insert_trade(trade_data)
-                self.logger.log_trade_executed(symbol, trade_data)
+                self._persist(self.database.insert_trade, trade_data)
+                self._persist(self.logger.log_trade_executed, symbol, trade_data)
                 return True
             else:
                 # Real trade execution would go here
@@ -497,14 +654,38 @@ class EnhancedTradingBot:
             self.logger.error(f"Error executing trade: {e}", exception=e)
             return False
     
+    def _persist(self, write, *args):
+        """Queue a database/log write for the persistence thread (run inline if the queue is full)"""
+        try:
+            self._persist_q.put_nowait((write, args))
+        except queue.Full:
+            self._run_write(write, args)
+    
+    def _persist_worker(self):
+        """Run queued writes in order, draining up to 100 per wake-up"""
+        while True:
+            batch = [self._persist_q.get()]
+            while len(batch) < 100:
+                try:
+                    batch.append(self._persist_q.get_nowait())
+                except queue.Empty:
+                    break
+            
+            for write, args in batch:
+                self._run_write(write, args)
+                self._persist_q.task_done()
+    
+    def _run_write(self, write, args):
+        try:
+            write(*args)
+        except Exception as e:
+            print(f"⚠️ Background write failed: {e}")
+    
     def _get_account_balance(self) -> Optional[Dict[str, float]]:
         """Get account balance information"""
         try:
             # Return simulated balance for now
-            return {
-                'total_balance': 10000.0,
-                'available_balance': 8000.0
-            }
+            return dict(SIMULATED_BALANCE)
         except Exception as e:
             self.logger.error(f"Error getting account balance: {e}", exception=e)
             return None
@@ -536,13 +717,14 @@ class EnhancedTradingBot:
             if not account_info:
                 return
             
+            stats = self.session_stats.snapshot()
             portfolio_data = {
                 'total_balance': account_info['total_balance'],
                 'available_balance': account_info['available_balance'],
                 'positions': [],
                 'unrealized_pnl': 0.0,
-                'realized_pnl': self.session_stats['total_pnl'],
-                'total_trades': self.session_stats['trades_executed']
+                'realized_pnl': stats.total_pnl,
+                'total_trades': stats.trades_executed
             }
             
             self.database.update_portfolio(portfolio_data)
@@ -550,16 +732,18 @@ class EnhancedTradingBot:
         except Exception as e:
             self.logger.error(f"Error updating portfolio: {e}", exception=e)
     
+    @buffered_output()
     def _generate_hourly_report(self):
         """Generate hourly performance report"""
-        print(f"\n📈 HOURLY PERFORMANCE REPORT - {datetime.utcnow().strftime('%Y-%m-%d %H:%M')}")
+        print(f"\n📈 HOURLY PERFORMANCE REPORT - {time.strftime('%Y-%m-%d %H:%M', time.gmtime())}")
         print("=" * 60)
         
-        uptime = datetime.utcnow() - self.session_stats['start_time']
+        stats = self.session_stats.snapshot()
+        uptime = datetime.utcnow() - stats.start_time
         print(f"⏱️ Session Duration: {uptime}")
         print(f"📊 Analyses Completed: {self.enhanced_logger.analysis_count}")
-        print(f"🎯 Signals Generated: {self.session_stats['signals_generated']}")
-        print(f"💼 Trades Executed: {self.session_stats['trades_executed']}")
+        print(f"🎯 Signals Generated: {stats.signals_generated}")
+        print(f"💼 Trades Executed: {stats.trades_executed}")
         print(f"📈 Active Strategies: {len(self.strategy_engine.active_strategies)}")
         
         # Show recent alerts
@@ -568,9 +752,10 @@ class EnhancedTradingBot:
         
         self.logger.log_bot_performance()
     
+    @buffered_output()
     def _generate_daily_report(self):
         """Generate daily performance report"""
-        print(f"\n📊 DAILY PERFORMANCE REPORT - {datetime.utcnow().strftime('%Y-%m-%d')}")
+        print(f"\n📊 DAILY PERFORMANCE REPORT - {time.strftime('%Y-%m-%d', time.gmtime())}")
         print("=" * 60)
         
         account_info = self._get_account_balance()
@@ -584,7 +769,7 @@ class EnhancedTradingBot:
             print(f"   Win Rate: {risk_report['performance']['win_rate']:.1f}%")
             
             self.logger.info("Daily report generated", {
-                'date': datetime.utcnow().strftime('%Y-%m-%d'),
+                'date': time.strftime('%Y-%m-%d', time.gmtime()),
                 'performance': risk_report['performance'],
                 'risk_metrics': risk_report
             })
@@ -592,7 +777,7 @@ class EnhancedTradingBot:
     def _weekly_maintenance(self):
         """Perform weekly maintenance tasks"""
         try:
-            print(f"\n🔧 WEEKLY MAINTENANCE - {datetime.utcnow().strftime('%Y-%m-%d')}")
+            print(f"\n🔧 WEEKLY MAINTENANCE - {time.strftime('%Y-%m-%d', time.gmtime())}")
             
             # Cleanup old logs
             self.logger.cleanup_old_logs(30)
@@ -612,19 +797,21 @@ class EnhancedTradingBot:
         except Exception as e:
             self.logger.error(f"Error in emergency position closure: {e}", exception=e)
     
+    @buffered_output()
     def _generate_session_summary(self):
         """Generate summary of the trading session"""
         try:
-            session_duration = datetime.utcnow() - self.session_stats['start_time']
+            stats = self.session_stats.snapshot()
+            session_duration = datetime.utcnow() - stats.start_time
             
             summary = {
                 'session_duration': str(session_duration),
                 'analyses_completed': getattr(self.enhanced_logger, 'analysis_count', 0),
-                'signals_generated': self.session_stats['signals_generated'],
-                'trades_attempted': self.session_stats['trades_attempted'],
-                'trades_executed': self.session_stats['trades_executed'],
-                'trades_rejected': self.session_stats['trades_rejected'],
-                'success_rate': (self.session_stats['trades_executed'] / max(self.session_stats['trades_attempted'], 1)) * 100,
+                'signals_generated': stats.signals_generated,
+                'trades_attempted': stats.trades_attempted,
+                'trades_executed': stats.trades_executed,
+                'trades_rejected': stats.trades_rejected,
+                'success_rate': stats.success_rate,
                 'strategies_active': len(self.strategy_engine.active_strategies)
             }
             
@@ -643,38 +830,45 @@ class EnhancedTradingBot:
         self.stop()
         sys.exit(0)
     
-    def run_backtest(self, symbol: str, days: int = 30, strategy_name: Optional[str] = None):
-        """Run backtest on recent data"""
+    def run_backtest(self, symbol: str, days: int = 30, strategy_name: Optional[str] = None,
+                     strategy_names: Optional[List[str]] = None):
+        """Run backtest on recent data (strategy_names: test exactly these, each in its own process)"""
+        # The backtester is only needed here, so the live bot does not load it at startup
+        from backtesting_engine import run_backtests_parallel
+        
         try:
             print(f"🔄 Running enhanced backtest for {symbol} over {days} days...")
             
-            market_data = self._fetch_market_data(symbol, '1h', days * 24)
+            market_data = self.kline_archive.get(self.exchange, symbol, '1h', days * 24)
             if market_data is None:
                 print("❌ Failed to fetch market data for backtest")
                 return
-            
-            backtester = AdvancedBacktester(initial_capital=10000)
-            
-            # Test specific strategy or all active strategies
-            strategies_to_test = [strategy_name] if strategy_name else self.strategy_engine.active_strategies
-            
-            for strategy_name in strategies_to_test[:3]:  # Limit to 3 for performance
-                if strategy_name in self.strategy_engine.strategies:
-                    strategy = self.strategy_engine.strategies[strategy_name]
-                    
-                    print(f"\n🧪 Testing {strategy_name}...")
-                    results = backtester.run_backtest(strategy, market_data, config.STRATEGY_CONFIG)
-                    
-                    # Show key results
-                    print(f"   📊 Results:")
-                    print(f"      Total Return: {results['metrics'].total_return_pct:+.2f}%")
-                    print(f"      Total Trades: {results['metrics'].total_trades}")
-                    print(f"      Win Rate: {results['metrics'].win_rate:.1f}%")
-                    print(f"      Max Drawdown: {results['metrics'].max_drawdown_pct:.2f}%")
-                    
-                    if results['metrics'].total_trades > 0:
-                        print(f"      Avg Win: ${results['metrics'].avg_win:.2f}")
-                        print(f"      Avg Loss: ${results['metrics'].avg_loss:.2f}")
+            market_data = market_data.to_dataframe()
+            
+            # Test the given strategies, one specific strategy or the first active ones
+            if strategy_names is None:
+                strategy_names = [strategy_name] if strategy_name else self.strategy_engine.active_strategies[:3]  # Limit to 3 for performance
+            strategies = [self.strategy_engine.strategies[name] for name in strategy_names
+                          if name in self.strategy_engine.strategies]
+            
+            # Strategies are independent, so each one runs in its own process
+            print(f"\n🧪 Testing {', '.join(strategy.name for strategy in strategies)}...")
+            for name, results, error in run_backtests_parallel(strategies, market_data, config.STRATEGY_CONFIG,
+                                                               initial_capital=10000):
+                if error:
+                    print(f"\n❌ {name} failed: {error}")
+                    continue
+                
+                # Show key results
+                print(f"\n   📊 {name} Results:")
+                print(f"      Total Return: {results['metrics'].total_return_pct:+.2f}%")
+                print(f"      Total Trades: {results['metrics'].total_trades}")
+                print(f"      Win Rate: {results['metrics'].win_rate:.1f}%")
+                print(f"      Max Drawdown: {results['metrics'].max_drawdown_pct:.2f}%")
+                
+                if results['metrics'].total_trades > 0:
+                    print(f"      Avg Win: ${results['metrics'].avg_win:.2f}")
+                    print(f"      Avg Loss: ${results['metrics'].avg_loss:.2f}")
         
         except Exception as e:
             self.logger.error(f"Error running backtest: {e}", exception=e)
@@ -685,6 +879,8 @@ def main():
     print("🔥 Featuring Advanced Strategies & 30-Second Analysis")
     print("=" * 60)
     
+    bot = None
+    trading_thread = None
     try:
         # Create enhanced trading bot
         bot_config = {
@@ -714,9 +910,12 @@ def main():
             choice = input(f"\nEnter your choice (1-7): ").strip()
             
             if choice == '1':
-                if not bot.is_running:
+                # is_running only flips inside start(), so the thread handle is what guards against a second bot
+                if trading_thread is None or not trading_thread.is_alive():
                     print("🚀 Starting enhanced trading with 30-second analysis...")
-                    bot.start()
+                    # The bot runs on its own thread so this menu stays usable (pause, reports, exit)
+                    trading_thread = threading.Thread(target=bot.start, name="trading-bot", daemon=True)
+                    trading_thread.start()
                 else:
                     print("Bot is already running!")
             
@@ -747,8 +946,7 @@ def main():
             
             elif choice == '5':
                 print(f"\n🎯 ACTIVE STRATEGIES ({len(bot.strategy_engine.active_strategies)}):")
-                factory = AdvancedStrategyFactory()
-                descriptions = factory.get_strategy_descriptions()
+                descriptions = AdvancedStrategyFactory.get_strategy_descriptions()
                 
                 for strategy_name in bot.strategy_engine.active_strategies:
                     description = descriptions.get(strategy_name, "Core trading strategy")
@@ -757,12 +955,16 @@ def main():
             elif choice == '6':
                 print(f"\n🧪 Available strategies:")
                 strategies = list(bot.strategy_engine.strategies.keys())
+                print(f"   0. All strategies (run in parallel)")
                 for i, name in enumerate(strategies, 1):
                     print(f"   {i}. {name}")
                 
                 try:
                     choice_idx = int(input("Select strategy number: ")) - 1
-                    if 0 <= choice_idx < len(strategies):
+                    if choice_idx == -1:
+                        symbol = input("Enter symbol (default ETHUSDT): ").strip() or 'ETHUSDT'
+                        bot.run_backtest(symbol, 7, strategy_names=strategies)
+                    elif 0 <= choice_idx < len(strategies):
                         strategy_name = strategies[choice_idx]
                         symbol = input("Enter symbol (default ETHUSDT): ").strip() or 'ETHUSDT'
                         bot.run_backtest(symbol, 7, strategy_name)
@@ -782,6 +984,10 @@ def main():
         print("\n👋 Goodbye!")
     except Exception as e:
         print(f"❌ Error: {e}")
+    finally:
+        # Release the pooled keep-alive connections to Binance
+        if bot is not None:
+            bot.exchange.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
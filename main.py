@@ -10,17 +10,15 @@ import sys
 import os
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
-import pandas as pd
-import schedule
-from concurrent.futures import ThreadPoolExecutor
 import signal
+import threading
 
 # Add src directory to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 # Import organized modules
 from core.database_schema import TradingDatabase
-from indicators.technical_indicators_simple import TechnicalIndicators
+from indicators.technical_indicators_simple import TechnicalIndicators, RSI_ZONES
 from strategies.strategy_engine import (
     StrategyEngine, MultiIndicatorStrategy, MeanReversionStrategy,
     TrendFollowingStrategy, BreakoutStrategy
@@ -34,7 +32,9 @@ from core.risk_management import RiskManager
 from utils.logger import TradingLogger
 from utils.enhanced_logger import EnhancedMarketLogger
 from core.binance_client import BinanceClient
-from utils.backtesting_engine import AdvancedBacktester
+from core.binance_ws import BinanceKlineStream
+from core.market_data import TIMEFRAME_MAP, KlineArchive, MarketData
+from utils.backtesting_engine import run_backtests_parallel
 import config
 
 class AdvancedTradingBot:
@@ -56,6 +56,10 @@ class AdvancedTradingBot:
         # Initialize core components
         print("🔧 Initializing components...")
         
+        # Compile indicator kernels while the database and exchange connect
+        kernel_warmup = threading.Thread(target=TechnicalIndicators.warm_up_kernels, name="kernel-warmup", daemon=True)
+        kernel_warmup.start()
+        
         self.database = TradingDatabase()
         print("   ✅ Database connected")
         
@@ -65,6 +69,12 @@ class AdvancedTradingBot:
         else:
             print("   ✅ Exchange connected")
         
+        # Candles come from the kline websocket while trading; REST is the backfill and fallback
+        self.kline_stream = BinanceKlineStream(self.exchange)
+        
+        # Backtest history kept on disk; repeat runs only download the newest bars
+        self.kline_archive = KlineArchive()
+        
         self.strategy_engine = StrategyEngine(self.database)
         self.risk_manager = RiskManager(self.database, config.STRATEGY_CONFIG)
         self.indicators = TechnicalIndicators()
@@ -76,9 +86,14 @@ class AdvancedTradingBot:
         })
         
         self.enhanced_logger = EnhancedMarketLogger(
-            self.database, self.strategy_engine, self.risk_manager, self.exchange
+            self.database, self.strategy_engine, self.risk_manager, self.exchange,
+            kline_source=self.kline_stream,
+            interactive=sys.stdout.isatty()
         )
         
+        # Ready means compiled: the first 30-second analysis must not pay for JIT
+        kernel_warmup.join()
+        
         print("   ✅ All components initialized")
         
         # Load all strategies
@@ -87,6 +102,7 @@ class AdvancedTradingBot:
         # Bot state
         self.is_running = False
         self.is_paused = False
+        self._stop_event = threading.Event()  # wakes the main loop immediately on stop
         
         # Performance tracking
         self.session_stats = {
@@ -115,8 +131,7 @@ class AdvancedTradingBot:
         ]
         
         # Advanced strategies
-        factory = AdvancedStrategyFactory()
-        advanced_strategies = factory.get_all_strategies(config.STRATEGY_CONFIG)
+        advanced_strategies = AdvancedStrategyFactory.get_all_strategies(config.STRATEGY_CONFIG)
         strategies.extend(advanced_strategies)
         
         # Register all strategies
@@ -140,27 +155,41 @@ class AdvancedTradingBot:
             return
         
         self.is_running = True
+        self._stop_event.clear()
         print("\n🟢 STARTING ENHANCED TRADING BOT")
         print("📊 30-second analysis will begin shortly...")
         print("=" * 50)
         
         try:
+            # Stream the trading market's candles before the 30-second analysis starts
+            self._start_kline_stream()
+            
             # Start enhanced logging
             self.enhanced_logger.start_logging()
             
             # Show current market status
             self._show_market_status()
             
-            # Schedule tasks
-            schedule.every(5).minutes.do(self._monitor_risk)
-            schedule.every(10).minutes.do(self._update_portfolio)
-            schedule.every(1).hours.do(self._hourly_report)
+            # Periodic tasks as (interval in seconds, task)
+            tasks = [
+                (5 * 60, self._monitor_risk),
+                (10 * 60, self._update_portfolio),
+                (60 * 60, self._hourly_report),
+            ]
             
-            # Main loop
+            # Main loop: sleep until the earliest monotonic deadline instead of polling
             print("🔄 Bot running... Press Ctrl+C to stop")
+            start = time.monotonic()
+            deadlines = [start + interval for interval, _ in tasks]
             while self.is_running:
-                schedule.run_pending()
-                time.sleep(1)
+                now = time.monotonic()
+                for i, (interval, task) in enumerate(tasks):
+                    if now >= deadlines[i]:
+                        task()
+                        # Stay on the original cadence; skip runs missed while a task overran
+                        deadlines[i] += interval * (int((now - deadlines[i]) // interval) + 1)
+                
+                self._stop_event.wait(max(0.0, min(deadlines) - time.monotonic()))
                 
         except KeyboardInterrupt:
             print("\n🛑 Bot stopped by user")
@@ -177,15 +206,28 @@ class AdvancedTradingBot:
         
         print("🛑 Stopping trading bot...")
         self.is_running = False
+        self._stop_event.set()
         
         # Stop enhanced logging
         self.enhanced_logger.stop_logging()
+        self.kline_stream.stop()
         
         # Generate session summary
         self._generate_session_summary()
         
         print("✅ Trading bot stopped successfully")
     
+    def _start_kline_stream(self):
+        """Follow the configured market over the kline socket; REST polling remains the fallback"""
+        symbol = config.TRADING_CONFIG['symbol'].replace('/', '')
+        interval = TIMEFRAME_MAP.get(config.TRADING_CONFIG['timeframe'], '1h')
+        try:
+            self.kline_stream.start()
+            if self.kline_stream.subscribe(symbol, interval):
+                print(f"   ✅ Streaming {symbol} {interval} klines")
+        except Exception as e:
+            print(f"   ⚠️ Kline stream unavailable, polling REST instead: {e}")
+    
     def run_backtest(self, symbol: str = None, days: int = 30, strategy: str = None):
         """Run comprehensive backtesting"""
         symbol = symbol or config.TRADING_CONFIG['symbol'].replace('/', '')
@@ -195,10 +237,11 @@ class AdvancedTradingBot:
         
         try:
             # Fetch historical data
-            market_data = self._fetch_market_data(symbol, '1h', days * 24)
+            market_data = self.kline_archive.get(self.exchange, symbol, '1h', days * 24)
             if market_data is None:
                 print("❌ Could not fetch market data")
                 return
+            market_data = market_data.to_dataframe()
             
             print(f"✅ Fetched {len(market_data)} data points")
             
@@ -210,33 +253,31 @@ class AdvancedTradingBot:
                 strategies_to_test = [self.strategy_engine.strategies[name] 
                                     for name in self.strategy_engine.active_strategies[:5]]
             
-            # Run backtests
+            # Run backtests (strategies are independent, so they run in parallel processes)
             results = []
-            backtester = AdvancedBacktester(initial_capital=10000)
-            
-            for strat in strategies_to_test:
-                print(f"\n🧪 Testing {strat.name}...")
-                try:
-                    result = backtester.run_backtest(
-                        strat, market_data.set_index('timestamp'), config.STRATEGY_CONFIG
-                    )
-                    
-                    metrics = result['metrics']
-                    results.append({
-                        'strategy': strat.name,
-                        'return_pct': metrics.total_return_pct,
-                        'trades': metrics.total_trades,
-                        'win_rate': metrics.win_rate,
-                        'max_drawdown': metrics.max_drawdown_pct,
-                        'sharpe_ratio': metrics.sharpe_ratio
-                    })
-                    
-                    print(f"   📊 Return: {metrics.total_return_pct:+.2f}% | "
-                          f"Trades: {metrics.total_trades} | "
-                          f"Win Rate: {metrics.win_rate:.1f}%")
-                    
-                except Exception as e:
-                    print(f"   ❌ Error testing {strat.name}: {e}")
+            backtest_data = market_data.set_index('timestamp')
+            print(f"\n🧪 Testing {len(strategies_to_test)} strategies...")
+            
+            for name, result, error in run_backtests_parallel(
+                strategies_to_test, backtest_data, config.STRATEGY_CONFIG, initial_capital=10000
+            ):
+                if error:
+                    print(f"   ❌ Error testing {name}: {error}")
+                    continue
+                
+                metrics = result['metrics']
+                results.append({
+                    'strategy': name,
+                    'return_pct': metrics.total_return_pct,
+                    'trades': metrics.total_trades,
+                    'win_rate': metrics.win_rate,
+                    'max_drawdown': metrics.max_drawdown_pct,
+                    'sharpe_ratio': metrics.sharpe_ratio
+                })
+                
+                print(f"   📊 {name}: Return: {metrics.total_return_pct:+.2f}% | "
+                      f"Trades: {metrics.total_trades} | "
+                      f"Win Rate: {metrics.win_rate:.1f}%")
             
             # Show summary
             if results:
@@ -267,15 +308,18 @@ class AdvancedTradingBot:
                 print("❌ Could not fetch market data")
                 return
             
-            current_price = float(market_data['close'].iloc[-1])
+            current_price = float(market_data.close[-1])
             print(f"💰 {symbol}: ${current_price:,.2f}")
             
-            # Calculate indicators
+            # Calculate indicators straight from the column arrays
             indicators = self.indicators.calculate_all_indicators(market_data, config.STRATEGY_CONFIG)
             
+            # Strategy code works on frames
+            market_data = market_data.to_dataframe()
+            
             # Show key indicators
             if 'rsi' in indicators:
-                rsi_status = "Overbought" if indicators['rsi'] > 70 else "Oversold" if indicators['rsi'] < 30 else "Neutral"
+                rsi_status = self.indicators.classify(indicators['rsi'], RSI_ZONES, ('Oversold', 'Neutral', 'Overbought'))
                 print(f"📈 RSI: {indicators['rsi']:.1f} ({rsi_status})")
             
             if 'macd_bullish' in indicators:
@@ -283,7 +327,7 @@ class AdvancedTradingBot:
                 print(f"📊 MACD: {macd_status}")
             
             # Generate signals
-            signals = self.strategy_engine.analyze_market(symbol, market_data, config.STRATEGY_CONFIG)
+            signals = self.strategy_engine.analyze_market(symbol, market_data, config.STRATEGY_CONFIG, indicators)
             
             buy_signals = [s for s in signals if s['signal'] == 'BUY']
             sell_signals = [s for s in signals if s['signal'] == 'SELL']
@@ -320,8 +364,7 @@ class AdvancedTradingBot:
             
             if choice == '1':
                 print(f"\n📊 ALL STRATEGIES ({len(self.strategy_engine.strategies)}):")
-                factory = AdvancedStrategyFactory()
-                descriptions = factory.get_strategy_descriptions()
+                descriptions = AdvancedStrategyFactory.get_strategy_descriptions()
                 
                 for name in self.strategy_engine.strategies.keys():
                     status = "🔥 ACTIVE" if name in self.strategy_engine.active_strategies else "⚪ INACTIVE"
@@ -375,40 +418,24 @@ class AdvancedTradingBot:
             else:
                 print("Invalid choice!")
     
-    def _fetch_market_data(self, symbol: str, timeframe: str = '1h', limit: int = 100):
-        """Fetch market data from exchange"""
+    def _fetch_market_data(self, symbol: str, timeframe: str = '1h', limit: int = 100) -> Optional[MarketData]:
+        """Fetch market data from exchange as column arrays"""
         try:
             if not self.exchange.client:
                 return None
                 
-            binance_interval = self._map_timeframe(timeframe)
-            klines = self.exchange.get_klines(symbol=symbol, interval=binance_interval, limit=limit)
+            binance_interval = TIMEFRAME_MAP.get(timeframe, '1h')
+            klines = self.kline_stream.get_klines(symbol=symbol, interval=binance_interval, limit=limit)
             
             if not klines:
                 return None
             
-            df = pd.DataFrame(klines, columns=[
-                'timestamp', 'open', 'high', 'low', 'close', 'volume',
-                'close_time', 'quote_asset_volume', 'number_of_trades',
-                'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore'
-            ])
-            
-            for col in ['open', 'high', 'low', 'close', 'volume']:
-                df[col] = pd.to_numeric(df[col])
-            
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            return df[['timestamp', 'open', 'high', 'low', 'close', 'volume']]
+            return MarketData.from_klines(klines)
             
         except Exception as e:
             self.logger.error(f"Error fetching market data: {e}", exception=e)
             return None
     
-    def _map_timeframe(self, timeframe: str) -> str:
-        """Map timeframe to Binance format"""
-        mapping = {'1m': '1m', '5m': '5m', '15m': '15m', '30m': '30m',
-                  '1h': '1h', '4h': '4h', '1d': '1d'}
-        return mapping.get(timeframe, '1h')
-    
     def _show_market_status(self):
         """Show initial market status"""
         try:
@@ -416,7 +443,7 @@ class AdvancedTradingBot:
             market_data = self._fetch_market_data(symbol, config.TRADING_CONFIG['timeframe'])
             
             if market_data is not None:
-                current_price = float(market_data['close'].iloc[-1])
+                current_price = float(market_data.close[-1])
                 print(f"💰 {symbol}: ${current_price:,.2f}")
                 print(f"📊 Timeframe: {config.TRADING_CONFIG['timeframe']}")
                 print(f"🎯 Active strategies: {len(self.strategy_engine.active_strategies)}")
@@ -450,7 +477,7 @@ class AdvancedTradingBot:
     
     def _hourly_report(self):
         """Generate hourly report"""
-        print(f"\n📈 HOURLY REPORT - {datetime.utcnow().strftime('%H:%M')}")
+        print(f"\n📈 HOURLY REPORT - {time.strftime('%H:%M', time.gmtime())}")
         print(f"   🎯 Signals: {self.session_stats['signals_generated']}")
         print(f"   💼 Trades: {self.session_stats['trades_executed']}")
         print(f"   📊 Analyses: {getattr(self.enhanced_logger, 'analysis_count', 0)}")
@@ -473,6 +500,7 @@ class AdvancedTradingBot:
 def main():
     """Main entry point"""
     bot = AdvancedTradingBot()
+    trading_thread = None
     
     while True:
         print(f"\n🚀 ADVANCED TRADING BOT MENU")
@@ -488,7 +516,12 @@ def main():
         
         try:
             if choice == '1':
-                bot.start_trading()
+                if trading_thread is None or not trading_thread.is_alive():
+                    # Trading runs on its own thread so the menu stays usable while it runs
+                    trading_thread = threading.Thread(target=bot.start_trading, name="trading-bot", daemon=True)
+                    trading_thread.start()
+                else:
+                    print("⚠️ Trading is already running!")
             
             elif choice == '2':
                 symbol = input("Symbol (default ETHUSDT): ").strip() or 'ETHUSDT'
@@ -511,6 +544,7 @@ def main():
                 print(f"   Active strategies: {len(bot.strategy_engine.active_strategies)}")
             
             elif choice == '6':
+                bot.stop_trading()
                 print("👋 Goodbye!")
                 break
             
@@ -522,6 +556,9 @@ def main():
             break
         except Exception as e:
             print(f"❌ Error: {e}")
+    
+    # Release the pooled keep-alive connections to Binance
+    bot.exchange.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,31 +1,74 @@
 # binance_client.py
 
+import time
 from binance.client import Client
 from binance.exceptions import BinanceAPIException
+from requests.adapters import HTTPAdapter
 import config
 
+# Most klines Binance returns per request
+KLINES_PAGE_LIMIT = 1000
+
 class BinanceClient:
     def __init__(self):
+        self.client = None
+        self.connect()
+
+    def connect(self):
+        """(Re)creates the API client in place, so every holder of this object sees the new connection."""
+        self.close()
         try:
             # Use testnet if in test mode
-            self.client = Client(config.API_KEY, config.API_SECRET, tld='com', testnet=config.TEST_MODE)
+            # ping=False: Client would otherwise ping over its default adapter, and the ping
+            # below would pay for a second DNS lookup and TLS handshake on the pooled one
+            self.client = Client(config.API_KEY, config.API_SECRET, tld='com', testnet=config.TEST_MODE,
+                                 requests_params={'timeout': config.EXCHANGE_CONFIG['request_timeout']},
+                                 ping=False)
+            # Every REST call goes through this one keep-alive session; size its pool for the
+            # bot's threads so concurrent fetches reuse open TLS connections instead of new handshakes
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=config.EXCHANGE_CONFIG['pool_maxsize'])
+            self.client.session.mount('https://', adapter)
+            # Warms the pooled connection that the first kline fetch then reuses
             self.client.ping()
             print("Successfully connected to Binance API.")
         except BinanceAPIException as e:
             print(f"Error connecting to Binance API: {e}")
             self.client = None
 
+    def close(self):
+        """Closes the pooled HTTP connections."""
+        if self.client:
+            self.client.close_connection()
+            self.client = None
+
     def get_klines(self, symbol, interval, limit=100):
-        """Fetches historical kline (candlestick) data."""
+        """Fetches the latest limit klines, paging back in KLINES_PAGE_LIMIT requests for longer histories."""
         if not self.client:
             return None
         try:
-            klines = self.client.get_klines(symbol=symbol, interval=interval, limit=limit)
+            klines = self.client.get_klines(symbol=symbol, interval=interval, limit=min(limit, KLINES_PAGE_LIMIT))
+            # Binance rejects limit > 1000, so older pages end just before the oldest bar fetched so far
+            while klines and len(klines) < limit:
+                self._throttle()
+                page = self.client.get_klines(symbol=symbol, interval=interval, endTime=klines[0][0] - 1,
+                                              limit=min(limit - len(klines), KLINES_PAGE_LIMIT))
+                if not page:
+                    break
+                klines = page + klines
             return klines
         except BinanceAPIException as e:
             print(f"Error fetching klines for {symbol}: {e}")
             return None
 
+    def _throttle(self):
+        """Waits for the next minute once the IP's used request weight reaches the configured budget."""
+        # Binance reports the weight used in the current minute on every response; a 429
+        # (and then an IP ban) follows if a burst of paged requests runs past 6000
+        response = self.client.response
+        used = response.headers.get('x-mbx-used-weight-1m') if response is not None else None
+        if used is not None and int(used) >= config.EXCHANGE_CONFIG['weight_budget']:
+            time.sleep(60 - time.time() % 60)
+
     def place_order(self, symbol, side, order_type, quantity):
         """Places an order."""
         if not self.client:
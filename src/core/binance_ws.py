@@ -0,0 +1,95 @@
+"""
+Live kline stream from Binance websockets.
+Each subscribed (symbol, interval) is backfilled once over REST and then kept current by
+the kline socket, so periodic fetches read candles from memory instead of polling REST.
+"""
+
+import threading
+import time
+from collections import deque
+from itertools import islice
+from typing import Deque, Dict, List, Optional, Tuple
+from binance import ThreadedWebsocketManager
+import config
+
+class BinanceKlineStream:
+    """
+    get_klines() has the same signature and REST row format as BinanceClient.get_klines.
+    It answers from the stream while the subscription is live and falls back to REST
+    (re-seeding the stream) when it is stale, has a gap, or holds fewer bars than asked for.
+    """
+
+    def __init__(self, exchange, max_bars: int = 1000, stale_after: float = 30.0):
+        self.exchange = exchange
+        self.max_bars = max_bars
+        self.stale_after = stale_after  # Binance pushes an update every ~2s while connected
+        self._candles: Dict[Tuple[str, str], Deque[list]] = {}
+        self._last_update: Dict[Tuple[str, str], float] = {}
+        self._lock = threading.Lock()
+        self._manager = None
+
+    def start(self):
+        """Start the websocket manager thread"""
+        self._manager = ThreadedWebsocketManager(config.API_KEY, config.API_SECRET, testnet=config.TEST_MODE)
+        self._manager.start()
+
+    def stop(self):
+        """Close every socket"""
+        if self._manager is not None:
+            self._manager.stop()
+            self._manager = None
+
+    def subscribe(self, symbol: str, interval: str, backfill: int = 500) -> bool:
+        """Backfill a market over REST and follow it on the kline socket"""
+        klines = self.exchange.get_klines(symbol=symbol, interval=interval, limit=backfill)
+        if not klines:
+            return False
+
+        with self._lock:
+            self._candles[(symbol, interval)] = deque(klines, maxlen=self.max_bars)
+            self._last_update[(symbol, interval)] = time.monotonic()
+        self._manager.start_kline_socket(callback=self._on_message, symbol=symbol, interval=interval)
+        return True
+
+    def get_klines(self, symbol: str, interval: str, limit: int = 100) -> Optional[List[list]]:
+        """Latest limit klines, from the stream when possible"""
+        key = (symbol, interval)
+        with self._lock:
+            candles = self._candles.get(key)
+            if (candles is not None and len(candles) >= limit
+                    and time.monotonic() - self._last_update[key] < self.stale_after):
+                return list(islice(candles, len(candles) - limit, None))
+
+        klines = self.exchange.get_klines(symbol=symbol, interval=interval, limit=limit)
+        if klines and candles is not None:
+            with self._lock:
+                # Only grow the window; a short REST read must not shrink a healthy stream
+                if len(klines) >= len(self._candles[key]) or time.monotonic() - self._last_update[key] >= self.stale_after:
+                    self._candles[key] = deque(klines, maxlen=self.max_bars)
+                    self._last_update[key] = time.monotonic()
+        return klines
+
+    def _on_message(self, message: dict):
+        """Socket callback: update the open bar in place or append a new one"""
+        if message.get('e') != 'kline':
+            # Errors and reconnect notices arrive as {'e': 'error', ...}; a silent socket goes stale
+            return
+
+        k = message['k']
+        row = [k['t'], k['o'], k['h'], k['l'], k['c'], k['v'], k['T'], k['q'], k['n'], k['V'], k['Q'], k['B']]
+        key = (message['s'], k['i'])
+        with self._lock:
+            candles = self._candles.get(key)
+            if candles is None:
+                return
+
+            last_open = candles[-1][0] if candles else None
+            if last_open == row[0]:
+                candles[-1] = row
+            elif last_open is None or row[0] > last_open:
+                # Bars missed while reconnecting would leave a hole; empty the window so the
+                # next get_klines re-seeds it over REST
+                if len(candles) >= 2 and row[0] - last_open > last_open - candles[-2][0]:
+                    candles.clear()
+                candles.append(row)
+            self._last_update[key] = time.monotonic()
@@ -1,11 +1,37 @@
-from pymongo import MongoClient, ASCENDING, DESCENDING
+"""
+MongoDB collections, indexes and read/write helpers for the trading bot.
+
+Aggregation pipelines here (and in callers such as the risk manager) start with
+$match and go straight to $sort/$limit/$group; computed fields ($project,
+$addFields) only come after $group. A reshaping stage in front of the sort or
+group stops MongoDB from using the index-backed plan and makes the pipeline
+cost scale with the collection instead of the matched documents.
+"""
+
+from pymongo import MongoClient, ASCENDING, DESCENDING, InsertOne, UpdateOne, WriteConcern
+from pymongo.errors import PyMongoError
 from datetime import datetime
+import atexit
+import threading
 import config
 
 class TradingDatabase:
     def __init__(self):
-        self.client = MongoClient(config.DATABASE_CONFIG['connection_string'])
+        self.client = MongoClient(config.DATABASE_CONFIG['connection_string'],
+                                  **config.DATABASE_CONFIG.get('client_options', {}))
         self.db = self.client[config.DATABASE_CONFIG['database']]
+        
+        # High-volume, non-critical writes (market data, indicators, signals, logs) are
+        # buffered per collection and sent as one unordered bulk_write
+        self.write_batch_size = 100
+        self.flush_interval = 2.0  # seconds
+        self._pending_writes = {}
+        self._pending_lock = threading.Lock()
+        self._flush_timer = None
+        atexit.register(self.flush_writes)
+        
+        self._transactions_supported = None  # probed on the first filled trade
+        
         self.setup_collections()
     
     def setup_collections(self):
@@ -28,7 +54,17 @@ class TradingDatabase:
         # Trades Collection
         self.trades = self.db.trades
         self.trades.create_index([("symbol", ASCENDING), ("timestamp", DESCENDING)])
-        self.trades.create_index([("status", ASCENDING)])
+        self.trades.create_index([("timestamp", DESCENDING)])  # latest-N trade queries
+        # Equality fields first, then the sort/range field (ESR), matching the risk queries
+        self.trades.create_index([("status", ASCENDING), ("timestamp", DESCENDING)])  # filled trades in a window
+        self.trades.create_index([("status", ASCENDING), ("side", ASCENDING)])  # open position count
+        if "status_1" in self.trades.index_information():
+            self.trades.drop_index("status_1")  # prefix of both compound indexes above
+        
+        # Daily P&L rollup of filled trades, kept current by insert_trade
+        self.daily_pnl = self.db.daily_pnl
+        self.daily_pnl.create_index([("date", DESCENDING)], unique=True)
+        self._backfill_daily_pnl()
         
         # Portfolio Collection
         self.portfolio = self.db.portfolio
@@ -48,11 +84,16 @@ class TradingDatabase:
         
         # Bot Logs Collection
         self.logs = self.db.bot_logs
-        self.logs.create_index([("timestamp", DESCENDING)])
+        self.logs.create_index([("timestamp", DESCENDING), ("level", ASCENDING)])  # covers per-level session counts
         self.logs.create_index([("level", ASCENDING), ("timestamp", DESCENDING)])
+        if "timestamp_-1" in self.logs.index_information():
+            self.logs.drop_index("timestamp_-1")  # prefix of the {timestamp, level} index
+        # Bot logs are fire-and-forget telemetry, so their writes skip the server ack;
+        # trades and portfolio stay on acknowledged writes
+        self.logs_unacknowledged = self.logs.with_options(write_concern=WriteConcern(w=0))
     
-    def insert_market_data(self, symbol, timeframe, data):
-        """Insert OHLCV market data"""
+    def insert_market_data(self, symbol, timeframe, data, now=None):
+        """Insert OHLCV market data; now (default utcnow) lets a cycle stamp all its writes with one clock read"""
         document = {
             "symbol": symbol,
             "timeframe": timeframe,
@@ -62,30 +103,30 @@ class TradingDatabase:
             "low": float(data['low']),
             "close": float(data['close']),
             "volume": float(data['volume']),
-            "created_at": datetime.utcnow()
+            "created_at": now or datetime.utcnow()
         }
-        return self.market_data.update_one(
+        self._queue_write(self.market_data, UpdateOne(
             {"symbol": symbol, "timestamp": data['timestamp']},
             {"$set": document},
             upsert=True
-        )
+        ))
     
-    def insert_indicators(self, symbol, timeframe, timestamp, indicators_data):
+    def insert_indicators(self, symbol, timeframe, timestamp, indicators_data, now=None):
         """Insert technical indicators data"""
         document = {
             "symbol": symbol,
             "timeframe": timeframe,
             "timestamp": timestamp,
             "indicators": indicators_data,
-            "created_at": datetime.utcnow()
+            "created_at": now or datetime.utcnow()
         }
-        return self.indicators.update_one(
+        self._queue_write(self.indicators, UpdateOne(
             {"symbol": symbol, "timestamp": timestamp, "timeframe": timeframe},
             {"$set": document},
             upsert=True
-        )
+        ))
     
-    def insert_signal(self, symbol, strategy, signal_data):
+    def insert_signal(self, symbol, strategy, signal_data, now=None):
         """Insert trading signal"""
         document = {
             "symbol": symbol,
@@ -96,9 +137,9 @@ class TradingDatabase:
             "price": float(signal_data['price']),
             "indicators_snapshot": signal_data.get('indicators', {}),
             "reasoning": signal_data.get('reasoning', ''),
-            "created_at": datetime.utcnow()
+            "created_at": now or datetime.utcnow()
         }
-        return self.signals.insert_one(document)
+        self._queue_write(self.signals, InsertOne(document))
     
     def insert_trade(self, trade_data):
         """Insert trade execution data"""
@@ -115,7 +156,72 @@ class TradingDatabase:
             "pnl": float(trade_data.get('pnl', 0)),
             "created_at": datetime.utcnow()
         }
-        return self.trades.insert_one(document)
+        if document['status'] != 'FILLED':
+            # Nothing else depends on a non-filled trade, so it goes out with the next batch
+            self._queue_write(self.trades, InsertOne(document))
+            return
+        
+        # A filled trade also moves the daily P&L rollup; commit both together when the
+        # deployment supports transactions so the rollup never drifts from the trades
+        if self._supports_transactions():
+            with self.client.start_session() as session:
+                return session.with_transaction(lambda s: self._insert_filled_trade(document, s))
+        return self._insert_filled_trade(document)
+    
+    def _insert_filled_trade(self, document, session=None):
+        """Insert a filled trade and add it to the daily rollup"""
+        result = self.trades.insert_one(document, session=session)
+        self._roll_up_daily_pnl(document['timestamp'], document['pnl'], session)
+        return result
+    
+    def _supports_transactions(self):
+        """Multi-document transactions need a replica set or a sharded cluster, not a standalone server"""
+        if self._transactions_supported is None:
+            try:
+                hello = self.client.admin.command('hello')
+                self._transactions_supported = 'setName' in hello or hello.get('msg') == 'isdbgrid'
+            except PyMongoError:
+                self._transactions_supported = False
+        return self._transactions_supported
+    
+    def _roll_up_daily_pnl(self, timestamp, pnl, session=None):
+        """Add a filled trade's P&L to its day's running total"""
+        day = timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+        self.daily_pnl.update_one(
+            {"date": day},
+            {"$inc": {"pnl": pnl, "trades": 1}, "$set": {"updated_at": datetime.utcnow()}},
+            upsert=True,
+            session=session
+        )
+    
+    def _backfill_daily_pnl(self):
+        """Build the daily P&L rollup from trade history the first time it is created"""
+        # Keyed on filled trades rather than any trade: a history with no fills leaves the
+        # rollup empty, and an estimated count would re-run the aggregation on every start
+        if self.daily_pnl.estimated_document_count() > 0 or self.trades.find_one({"status": "FILLED"}, {"_id": 1}) is None:
+            return
+        
+        # $dateToString day keys rather than $dateTrunc, which needs MongoDB 5.0;
+        # $merge and $$NOW keep the floor at MongoDB 4.2
+        self.trades.aggregate([
+            {"$match": {"status": "FILLED"}},
+            {"$group": {
+                "_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$timestamp"}},
+                "pnl": {"$sum": "$pnl"},
+                "trades": {"$sum": 1}
+            }},
+            {"$project": {
+                "_id": 0, "date": {"$dateFromString": {"dateString": "$_id", "format": "%Y-%m-%d"}},
+                "pnl": 1, "trades": 1, "updated_at": "$$NOW"
+            }},
+            {"$merge": {"into": "daily_pnl", "on": "date", "whenMatched": "replace", "whenNotMatched": "insert"}}
+        ])
+    
+    def get_daily_pnl(self, day=None):
+        """Realized P&L of filled trades for a UTC day (default today)"""
+        day = (day or datetime.utcnow()).replace(hour=0, minute=0, second=0, microsecond=0)
+        rollup = self.daily_pnl.find_one({"date": day}, {"_id": 0, "pnl": 1})
+        return rollup['pnl'] if rollup else 0.0
     
     def update_portfolio(self, portfolio_data):
         """Update portfolio snapshot"""
@@ -128,17 +234,17 @@ class TradingDatabase:
             "realized_pnl": float(portfolio_data.get('realized_pnl', 0)),
             "total_trades": portfolio_data.get('total_trades', 0)
         }
-        return self.portfolio.insert_one(document)
+        self._queue_write(self.portfolio, InsertOne(document))
     
-    def log_bot_activity(self, level, message, details=None):
+    def log_bot_activity(self, level, message, details=None, now=None):
         """Log bot activities"""
         document = {
-            "timestamp": datetime.utcnow(),
+            "timestamp": now or datetime.utcnow(),
             "level": level,  # INFO, WARNING, ERROR, DEBUG
             "message": message,
             "details": details or {}
         }
-        return self.logs.insert_one(document)
+        self._queue_write(self.logs_unacknowledged, InsertOne(document))
     
     def get_latest_market_data(self, symbol, timeframe, limit=100):
         """Get latest market data"""
@@ -148,6 +254,35 @@ class TradingDatabase:
             limit=limit
         ))
     
+    def get_recent_trades(self, limit=100, status=None, projection=None, skip=0):
+        """
+        Cursor over the latest trades, newest first, walked straight off the timestamp indexes.
+        projection trims the documents; callers iterate it rather than holding the whole page.
+        """
+        if status is None:
+            query, index = {}, [("timestamp", DESCENDING)]
+        else:
+            query, index = {"status": status}, [("status", ASCENDING), ("timestamp", DESCENDING)]
+        
+        # The hint pins the top-K index plan so the planner never falls back to an in-memory sort
+        return (self.trades.find(query, projection)
+                .sort("timestamp", DESCENDING).skip(skip).limit(limit)
+                .hint(index).batch_size(50))
+    
+    def get_recent_trade_stats(self, limit=100):
+        """Trade count and profitable trades among the latest `limit` trades, in one index walk"""
+        pipeline = [
+            {"$sort": {"timestamp": DESCENDING}},
+            {"$limit": limit},
+            {"$group": {
+                "_id": None,
+                "total_trades": {"$sum": 1},
+                "profitable_trades": {"$sum": {"$cond": [{"$gt": ["$pnl", 0]}, 1, 0]}}
+            }}
+        ]
+        
+        return next(self.trades.aggregate(pipeline), {"total_trades": 0, "profitable_trades": 0})
+    
     def get_performance_summary(self, days=30):
         """Get performance summary for specified days"""
         from datetime import timedelta
@@ -165,14 +300,14 @@ class TradingDatabase:
             }}
         ]
         
-        result = list(self.trades.aggregate(pipeline))
-        return result[0] if result else None
+        # A $group on _id None yields at most one document
+        return next(self.trades.aggregate(pipeline), None)
     
     def clear_all_data(self):
         """Clear all trading data for fresh start - USE WITH CAUTION"""
         collections = [
             self.market_data, self.indicators, self.signals, 
-            self.trades, self.portfolio, self.performance,
+            self.trades, self.daily_pnl, self.portfolio, self.performance,
             self.strategy_performance, self.risk_metrics, self.logs
         ]
         
@@ -181,8 +316,37 @@ class TradingDatabase:
         
         print("All trading data cleared. Fresh start initiated!")
     
+    def _queue_write(self, collection, operation):
+        """Buffer a write; flushed when the batch fills or flush_interval passes"""
+        with self._pending_lock:
+            _, batch = self._pending_writes.setdefault(collection.name, (collection, []))
+            batch.append(operation)
+            batch_full = len(batch) >= self.write_batch_size
+            if not batch_full and self._flush_timer is None:
+                self._flush_timer = threading.Timer(self.flush_interval, self.flush_writes)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+        
+        if batch_full:
+            self.flush_writes()
+    
+    def flush_writes(self):
+        """Send every buffered write, one bulk_write per collection"""
+        with self._pending_lock:
+            pending, self._pending_writes = self._pending_writes, {}
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+        
+        for name, (collection, operations) in pending.items():
+            try:
+                collection.bulk_write(operations, ordered=False)
+            except PyMongoError as e:
+                print(f"⚠️ Buffered write to {name} failed: {e}")
+    
     def close_connection(self):
         """Close database connection"""
+        self.flush_writes()
         self.client.close()
 
 if __name__ == "__main__":
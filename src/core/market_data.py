@@ -0,0 +1,236 @@
+"""
+Kline parsing shared by everything that pulls candles from Binance.
+Raw klines are lists of strings; they are parsed in one pass into a preallocated
+float64 buffer instead of a string DataFrame followed by per-column to_numeric.
+"""
+
+import os
+import threading
+import time
+from types import MappingProxyType
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+from typing import Callable, Dict, Final, List, Mapping, Optional, Tuple
+
+OHLCV_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+# Closed candles kept on disk by KlineArchive, next to the backtester's indicator cache
+KLINE_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                               '.cache', 'klines')
+
+# Length of a Binance kline interval unit in ms ('1M' months are not fixed and are not archived)
+_INTERVAL_UNIT_MS = {'m': 60_000, 'h': 3_600_000, 'd': 86_400_000, 'w': 604_800_000}
+
+# Config timeframe -> Binance kline interval; callers pick their own default for unknown timeframes
+TIMEFRAME_MAP: Final[Mapping[str, str]] = MappingProxyType({
+    '1m': '1m', '5m': '5m', '15m': '15m', '30m': '30m',
+    '1h': '1h', '4h': '4h', '1d': '1d'
+})
+
+def parse_klines(klines: List[list]) -> Tuple[np.ndarray, np.ndarray]:
+    """Open times (epoch ms) and an (n, 5) float64 OHLCV block from raw Binance klines"""
+    if not klines:
+        return np.empty(0, dtype=np.int64), np.empty((0, len(OHLCV_COLUMNS)), dtype=np.float64)
+
+    # One object array, then one C-level str -> float conversion for the whole block;
+    # assigning row by row paid NumPy's per-row conversion overhead limit times per fetch
+    rows = np.array(klines, dtype=object)
+    open_times = rows[:, 0].astype(np.int64)
+    # float64 on purpose: float32 keeps ~7 significant digits, which rounds BTC prices to cents
+    ohlcv = rows[:, 1:1 + len(OHLCV_COLUMNS)].astype(np.float64)
+
+    return open_times, ohlcv
+
+def klines_to_dataframe(klines: List[list]) -> pd.DataFrame:
+    """timestamp/open/high/low/close/volume DataFrame from raw Binance klines"""
+    open_times, ohlcv = parse_klines(klines)
+    return _ohlcv_frame(open_times, ohlcv.T)
+
+def _ohlcv_frame(open_times: np.ndarray, columns) -> pd.DataFrame:
+    """timestamp/OHLCV frame from epoch-ms open times and the five column arrays, in one constructor call"""
+    # Epoch ms -> datetime64[ns] is a plain integer cast; pd.to_datetime(unit='ms') and a
+    # later insert() of the column each cost more than building the whole frame
+    data = {'timestamp': open_times.astype('datetime64[ms]').astype('datetime64[ns]')}
+    data.update(zip(OHLCV_COLUMNS, columns))
+    # Copied on purpose: callers may modify the frame, and the arrays can be shared via MarketDataCache
+    return pd.DataFrame(data, copy=True)
+
+@dataclass
+class MarketData:
+    """
+    Candles as contiguous float64 column arrays (timestamp is the open time in epoch ms).
+    Live code and calculate_all_indicators read the columns directly; to_dataframe() is for strategy code that needs a frame.
+    """
+    __slots__ = ('timestamp',) + OHLCV_COLUMNS
+    timestamp: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    @classmethod
+    def from_klines(cls, klines: List[list]) -> 'MarketData':
+        """Parse raw Binance klines into one contiguous row per column"""
+        open_times, ohlcv = parse_klines(klines)
+        return cls(open_times, *np.ascontiguousarray(ohlcv.T))
+
+    def __len__(self) -> int:
+        return self.close.shape[0]
+
+    def tail(self, n: int) -> 'MarketData':
+        """Last n bars as views on the same arrays"""
+        start = max(len(self) - n, 0)
+        return MarketData(*(getattr(self, column)[start:] for column in self.__slots__))
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Same layout as klines_to_dataframe"""
+        return _ohlcv_frame(self.timestamp, (getattr(self, column) for column in OHLCV_COLUMNS))
+
+class MarketDataCache:
+    """
+    Short-lived cache of fetched candles per (symbol, interval), shared by the periodic tasks
+    that poll the same market. Entries expire after ttl seconds; an expired window is topped
+    up with only the bars opened since its last one (that bar included, as it may have been
+    still forming), so a newly closed bar is picked up on the first miss without downloading
+    the whole window again. A request for fewer bars than are cached is served from the tail.
+    """
+
+    def __init__(self, ttl: float = 5.0):
+        self.ttl = ttl
+        self._entries: Dict[Tuple[str, str], Tuple[float, MarketData]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, symbol: str, interval: str, limit: int,
+            fetch_klines: Callable[[int], List[list]]) -> Optional[MarketData]:
+        """Cached candles, or ones fetched with fetch_klines(n) for the latest n bars (None when it returns nothing)"""
+        key = (symbol, interval)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and len(entry[1]) >= limit:
+            if time.monotonic() - entry[0] < self.ttl:
+                return entry[1].tail(limit)
+            data = self._top_up(entry[1], interval, fetch_klines)
+        else:
+            data = None
+
+        if data is None:
+            klines = fetch_klines(limit)
+            if not klines:
+                return None
+            data = MarketData.from_klines(klines)
+
+        with self._lock:
+            self._entries[key] = (time.monotonic(), data)
+        return data.tail(limit)
+
+    def _top_up(self, cached: MarketData, interval: str,
+                fetch_klines: Callable[[int], List[list]]) -> Optional[MarketData]:
+        """cached with its last bar refreshed and newer bars appended; None when a full fetch is needed"""
+        step = _interval_ms(interval)
+        if step is None:
+            return None
+
+        last_open = int(cached.timestamp[-1])
+        # Bars opened since the newest cached one, plus one so local clock drift cannot skip it
+        missing = max(int(time.time() * 1000) - last_open, 0) // step + 2
+        if missing >= len(cached):
+            return None
+
+        klines = fetch_klines(missing)
+        if not klines or klines[0][0] > last_open:
+            # The refetch must overlap the cached window, or a bar could be missing or left unfinished
+            return None
+
+        fresh = MarketData.from_klines(klines)
+        kept = int(np.searchsorted(cached.timestamp, fresh.timestamp[0]))
+        joined = MarketData(*(np.concatenate((getattr(cached, column)[:kept], getattr(fresh, column)))
+                              for column in MarketData.__slots__))
+        # Keep the window size stable instead of growing it by every new bar
+        return joined.tail(len(cached))
+
+class KlineArchive:
+    """
+    Closed candles per (symbol, interval) kept on disk, so a repeated backtest only downloads the
+    bars that opened since the previous run. Each market is one (n, 6) float64 .npy file of
+    open time + OHLCV rows, memory-mapped on read so only the requested tail is paged in.
+    """
+
+    def __init__(self, cache_dir: str = KLINE_CACHE_DIR, max_bars: int = 100_000):
+        self.cache_dir = cache_dir
+        self.max_bars = max_bars
+        self._lock = threading.Lock()
+
+    def get(self, exchange, symbol: str, interval: str, limit: int) -> Optional[MarketData]:
+        """Latest limit candles (the last one still forming), topped up from exchange.get_klines"""
+        step = _interval_ms(interval)
+        if step is None:
+            klines = exchange.get_klines(symbol=symbol, interval=interval, limit=limit)
+            return MarketData.from_klines(klines) if klines else None
+
+        with self._lock:
+            rows = self._update(exchange, symbol, interval, limit, step)
+        if rows is None:
+            return None
+
+        rows = rows[-limit:]
+        return MarketData(rows[:, 0].astype(np.int64), *np.ascontiguousarray(rows[:, 1:].T))
+
+    def _update(self, exchange, symbol: str, interval: str, limit: int, step: int) -> Optional[np.ndarray]:
+        """Stored bars joined with freshly fetched ones; writes the closed bars back"""
+        path = os.path.join(self.cache_dir, f"{symbol}_{interval}.npy")
+        stored = self._load(path)
+        rows = None
+
+        if stored is not None and len(stored):
+            last_open = int(stored[-1, 0])
+            # Bars opened since the newest stored one (the forming bar included), plus one overlap
+            missing = max(int(time.time() * 1000) - last_open, 0) // step + 2
+            if missing <= limit:
+                fresh = exchange.get_klines(symbol=symbol, interval=interval, limit=missing)
+                if fresh and fresh[0][0] <= last_open + step:
+                    kept = stored[:np.searchsorted(stored[:, 0], fresh[0][0])]
+                    if len(kept) + len(fresh) >= limit:
+                        rows = np.concatenate((kept, _kline_rows(fresh)))
+
+        if rows is None:
+            # Nothing stored, a gap since the last run, or more history than is stored
+            klines = exchange.get_klines(symbol=symbol, interval=interval, limit=limit)
+            if not klines:
+                return None
+            rows = _kline_rows(klines)
+
+        self._save(path, rows[:-1][-self.max_bars:])
+        return rows
+
+    def _load(self, path: str) -> Optional[np.ndarray]:
+        """Stored rows, memory-mapped; an unreadable file counts as empty"""
+        if not os.path.exists(path):
+            return None
+        try:
+            rows = np.load(path, mmap_mode='r')
+        except (OSError, ValueError):
+            return None
+        return rows if rows.ndim == 2 and rows.shape[1] == len(OHLCV_COLUMNS) + 1 else None
+
+    def _save(self, path: str, rows: np.ndarray):
+        """Write rows atomically, so a reader never maps a partial file"""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, 'wb') as f:
+                np.save(f, np.ascontiguousarray(rows))
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"⚠️ Could not write kline cache: {e}")
+
+def _interval_ms(interval: str) -> Optional[int]:
+    """Milliseconds per bar for a Binance interval such as '15m' or '4h', None for '1M'"""
+    unit = _INTERVAL_UNIT_MS.get(interval[-1:])
+    return int(interval[:-1]) * unit if unit and interval[:-1].isdigit() else None
+
+def _kline_rows(klines: List[list]) -> np.ndarray:
+    """(n, 6) rows of open time (epoch ms, exact in float64) and OHLCV"""
+    open_times, ohlcv = parse_klines(klines)
+    return np.column_stack((open_times.astype(np.float64), ohlcv))
@@ -224,8 +224,8 @@ class RiskManager:
         daily_pnl = self._get_daily_pnl()
         daily_pnl_pct = (daily_pnl / account_balance) * 100
         
-        # Weekly P&L
-        weekly_pnl = self._get_weekly_pnl()
+        # Weekly P&L and win rate, from a single aggregation
+        weekly_pnl, win_rate_data = self._get_trade_stats()
         weekly_pnl_pct = (weekly_pnl / account_balance) * 100
         
         # Open positions analysis
@@ -235,9 +235,6 @@ class RiskManager:
         total_risk_amount = sum([pos.get('risk_amount', 0) for pos in open_positions])
         risk_utilization_pct = (total_risk_amount / account_balance) * 100
         
-        # Win rate calculation
-        win_rate_data = self._calculate_win_rate()
-        
         return {
             'timestamp': datetime.utcnow(),
             'account_balance': account_balance,
@@ -287,39 +284,8 @@ class RiskManager:
     
     def _get_daily_pnl(self) -> float:
         """Get today's P&L"""
-        today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-        
-        pipeline = [
-            {"$match": {
-                "timestamp": {"$gte": today},
-                "status": "FILLED"
-            }},
-            {"$group": {
-                "_id": None,
-                "total_pnl": {"$sum": "$pnl"}
-            }}
-        ]
-        
-        result = list(self.database.trades.aggregate(pipeline))
-        return result[0]['total_pnl'] if result else 0.0
-    
-    def _get_weekly_pnl(self) -> float:
-        """Get this week's P&L"""
-        week_ago = datetime.utcnow() - timedelta(days=7)
-        
-        pipeline = [
-            {"$match": {
-                "timestamp": {"$gte": week_ago},
-                "status": "FILLED"
-            }},
-            {"$group": {
-                "_id": None,
-                "total_pnl": {"$sum": "$pnl"}
-            }}
-        ]
-        
-        result = list(self.database.trades.aggregate(pipeline))
-        return result[0]['total_pnl'] if result else 0.0
+        # O(1) read of the rollup insert_trade maintains, instead of aggregating today's trades
+        return self.database.get_daily_pnl()
     
     def _count_open_positions(self) -> int:
         """Count currently open positions"""
@@ -344,7 +310,7 @@ class RiskManager:
         # Get recent ATR data from indicators
         recent_indicators = list(self.database.indicators.find({
             "symbol": symbol
-        }).sort("timestamp", -1).limit(20))
+        }, {"_id": 0, "indicators.atr": 1, "indicators.current_price": 1}).sort("timestamp", -1).limit(20))
         
         if not recent_indicators:
             return {'high_volatility': False, 'atr_pct': 0}
@@ -370,32 +336,47 @@ class RiskManager:
             'avg_atr': avg_atr
         }
     
-    def _calculate_win_rate(self) -> Dict[str, Any]:
-        """Calculate win rate and other performance metrics"""
+    def _get_trade_stats(self) -> Tuple[float, Dict[str, Any]]:
+        """This week's P&L and 30-day performance metrics from one $facet aggregation"""
         
-        # Get last 30 days of closed trades
+        # Both windows come from the last 30 days of closed trades, so one scan serves both
         thirty_days_ago = datetime.utcnow() - timedelta(days=30)
+        week_ago = datetime.utcnow() - timedelta(days=7)
         
         pipeline = [
             {"$match": {
                 "timestamp": {"$gte": thirty_days_ago},
                 "status": "FILLED"
             }},
-            {"$group": {
-                "_id": None,
-                "total_trades": {"$sum": 1},
-                "winning_trades": {"$sum": {"$cond": [{"$gt": ["$pnl", 0]}, 1, 0]}},
-                "losing_trades": {"$sum": {"$cond": [{"$lt": ["$pnl", 0]}, 1, 0]}},
-                "total_pnl": {"$sum": "$pnl"},
-                "avg_win": {"$avg": {"$cond": [{"$gt": ["$pnl", 0]}, "$pnl", None]}},
-                "avg_loss": {"$avg": {"$cond": [{"$lt": ["$pnl", 0]}, "$pnl", None]}}
+            {"$facet": {
+                "weekly": [
+                    {"$match": {"timestamp": {"$gte": week_ago}}},
+                    {"$group": {
+                        "_id": None,
+                        "total_pnl": {"$sum": "$pnl"}
+                    }}
+                ],
+                "performance": [
+                    {"$group": {
+                        "_id": None,
+                        "total_trades": {"$sum": 1},
+                        "winning_trades": {"$sum": {"$cond": [{"$gt": ["$pnl", 0]}, 1, 0]}},
+                        "losing_trades": {"$sum": {"$cond": [{"$lt": ["$pnl", 0]}, 1, 0]}},
+                        "total_pnl": {"$sum": "$pnl"},
+                        "avg_win": {"$avg": {"$cond": [{"$gt": ["$pnl", 0]}, "$pnl", None]}},
+                        "avg_loss": {"$avg": {"$cond": [{"$lt": ["$pnl", 0]}, "$pnl", None]}}
+                    }}
+                ]
             }}
         ]
         
-        result = list(self.database.trades.aggregate(pipeline))
+        facets = next(self.database.trades.aggregate(pipeline), {})
+        weekly = facets.get('weekly')
+        weekly_pnl = weekly[0]['total_pnl'] if weekly else 0.0
         
-        if not result:
-            return {
+        performance = facets.get('performance')
+        if not performance:
+            return weekly_pnl, {
                 'win_rate': 0,
                 'total_trades': 0,
                 'avg_win': 0,
@@ -403,7 +384,7 @@ class RiskManager:
                 'profit_factor': 0
             }
         
-        data = result[0]
+        data = performance[0]
         win_rate = (data['winning_trades'] / data['total_trades']) * 100 if data['total_trades'] > 0 else 0
         
         avg_win = data.get('avg_win', 0) or 0
@@ -411,7 +392,7 @@ class RiskManager:
         
         profit_factor = avg_win / avg_loss if avg_loss > 0 else 0
         
-        return {
+        return weekly_pnl, {
             'win_rate': win_rate,
             'total_trades': data['total_trades'],
             'winning_trades': data['winning_trades'],
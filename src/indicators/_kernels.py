@@ -0,0 +1,144 @@
+"""
+NumPy/numba kernels for the indicator hot loops.
+Each kernel takes float64 arrays and returns full-length series with NaN during warm-up.
+"""
+
+import numpy as np
+from utils._njit import njit
+
+@njit(cache=True)
+def bbands(close, length, num_std):
+    """Bollinger Bands (lower, middle, upper) using running sums; sample std like pandas rolling().std()"""
+    n = close.shape[0]
+    lower = np.full(n, np.nan)
+    middle = np.full(n, np.nan)
+    upper = np.full(n, np.nan)
+    if n == 0 or length < 2:
+        return lower, middle, upper
+
+    # Sums are taken relative to the first close to limit cancellation in the variance
+    shift = close[0]
+    total = 0.0
+    total_sq = 0.0
+    for i in range(n):
+        x = close[i] - shift
+        total += x
+        total_sq += x * x
+        if i >= length:
+            y = close[i - length] - shift
+            total -= y
+            total_sq -= y * y
+
+        if i >= length - 1:
+            mean = total / length
+            variance = (total_sq - total * mean) / (length - 1)
+            if variance < 0.0:
+                variance = 0.0
+            std = np.sqrt(variance)
+            sma = mean + shift
+            middle[i] = sma
+            upper[i] = sma + (std * num_std)
+            lower[i] = sma - (std * num_std)
+
+    return lower, middle, upper
+
+@njit(cache=True)
+def ewm_mean(values, span):
+    """pandas ewm(span=span, adjust=True).mean() for a series without NaN, bit for bit"""
+    n = values.shape[0]
+    out = np.empty(n)
+    if n == 0:
+        return out
+    # Same recurrence and operation order as pandas' ewm: separate weighted/weight sums
+    # round differently, and on a flat series that flips ema_12 > ema_26 and MACD comparisons
+    alpha = 1.0 / (1.0 + (span - 1.0) / 2.0)
+    old_wt_factor = 1.0 - alpha
+    weighted = values[0]
+    out[0] = weighted
+    old_wt = 1.0
+    for i in range(1, n):
+        cur = values[i]
+        old_wt *= old_wt_factor
+        if weighted != cur:
+            weighted = old_wt * weighted + cur
+            weighted = weighted / (old_wt + 1.0)
+        old_wt += 1.0
+        out[i] = weighted
+    return out
+
+@njit(cache=True)
+def rsi_last(close, period):
+    """RSI of the last bar from simple averages of the last `period` gains and losses; NaN if there are no losses"""
+    n = close.shape[0]
+    if n < period or period < 1:
+        return np.nan
+
+    gain = 0.0
+    loss = 0.0
+    # The first bar has no change and counts as zero, as in the rolling pandas version
+    for i in range(max(n - period, 1), n):
+        delta = close[i] - close[i - 1]
+        if delta > 0.0:
+            gain += delta
+        elif delta < 0.0:
+            loss -= delta
+
+    if loss == 0.0:
+        return np.nan
+    return 100.0 - (100.0 / (1.0 + gain / loss))
+
+@njit(cache=True)
+def true_range(high, low, close):
+    """True range per bar; the first bar has no previous close and uses high - low"""
+    n = close.shape[0]
+    out = np.empty(n)
+    for i in range(n):
+        out[i] = high[i] - low[i]
+        if i > 0:
+            out[i] = max(out[i], abs(high[i] - close[i - 1]), abs(low[i] - close[i - 1]))
+    return out
+
+@njit(cache=True)
+def rolling_mean(values, window):
+    """pandas rolling(window).mean() for a series without NaN, from one running sum"""
+    n = values.shape[0]
+    out = np.full(n, np.nan)
+    if window < 1:
+        return out
+
+    total = 0.0
+    for i in range(n):
+        total += values[i]
+        if i >= window:
+            total -= values[i - window]
+        if i >= window - 1:
+            out[i] = total / window
+    return out
+
+@njit(cache=True)
+def on_balance_volume(close, volume):
+    """Running On-Balance Volume; NaN on the first bar"""
+    n = close.shape[0]
+    out = np.empty(n)
+    if n == 0:
+        return out
+
+    out[0] = np.nan
+    obv = 0.0
+    for i in range(1, n):
+        if close[i] > close[i - 1]:
+            obv += volume[i]
+        elif close[i] < close[i - 1]:
+            obv -= volume[i]
+        out[i] = obv
+    return out
+
+def warm_up():
+    """Compile every kernel (or load it from numba's on-disk cache) using a tiny input"""
+    x = np.linspace(1.0, 2.0, 32)
+    bbands(x, 20, 2.0)
+    ewm_mean(x, 12.0)
+    rsi_last(x, 14)
+    true_range(x + 0.5, x - 0.5, x)
+    rolling_mean(x, 14)
+    on_balance_volume(x, x)
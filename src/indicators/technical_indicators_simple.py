@@ -1,9 +1,46 @@
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from typing import Dict, Any, Optional
 import warnings
+from dataclasses import dataclass
+from indicators import _kernels
+from indicators._kernels import bbands, ewm_mean, rsi_last, rolling_mean, true_range, on_balance_volume
 warnings.filterwarnings('ignore')
 
+# Bars needed before calculate_all_indicators returns anything
+MIN_INDICATOR_BARS = 50
+
+# Indicators stored as 1.0/0.0 in an indicator frame and returned as bool
+BOOLEAN_INDICATORS = frozenset({
+    'price_above_sma20', 'sma_trend', 'ema_crossover', 'macd_bullish',
+    'rsi_oversold', 'rsi_overbought', 'rsi_bullish', 'stoch_oversold', 'stoch_overbought',
+    'near_bb_lower', 'near_bb_upper', 'volatility_high',
+    'volume_above_average', 'volume_spike', 'obv_trend',
+    'near_resistance', 'near_support'
+})
+
+# Config keys that change calculate_indicator_frame output
+INDICATOR_CONFIG_KEYS = (
+    'ema_fast', 'ema_slow', 'macd_signal', 'rsi_period', 'rsi_oversold', 'rsi_overbought',
+    'stoch_k', 'stoch_d', 'stoch_oversold', 'stoch_overbought',
+    'bb_period', 'bb_std_dev', 'atr_period', 'volume_sma'
+)
+
+# Zone boundaries for TechnicalIndicators.classify
+RSI_ZONES = np.array([30.0, 70.0])
+BB_POSITION_ZONES = np.array([0.2, 0.8])
+
+@dataclass(frozen=True)
+class SignalScore:
+    """What get_trading_signal decided and why; the condition maps hold each check that was counted"""
+    signal: str
+    strength: float
+    buy_score: int
+    sell_score: int
+    buy_conditions: Dict[str, bool]
+    sell_conditions: Dict[str, bool]
+
 class TechnicalIndicators:
     """
     Simplified technical indicators calculator without pandas-ta dependency
@@ -13,94 +50,288 @@ class TechnicalIndicators:
     def __init__(self):
         self.indicators = {}
     
-    def calculate_all_indicators(self, df: pd.DataFrame, config: Dict[str, Any]) -> Dict[str, Any]:
-        """Calculate all technical indicators for given OHLCV data"""
+    @staticmethod
+    def warm_up_kernels():
+        """Compile the numba kernels ahead of the first live calculation (run it on a background thread)"""
+        _kernels.warm_up()
+    
+    @staticmethod
+    def classify(values, thresholds: np.ndarray, labels):
+        """
+        Zone label per value, one binary search each: labels[i] covers thresholds[i-1] < value <= thresholds[i],
+        so labels has one entry more than thresholds. NaN gets the middle label, as no comparison holds for it.
+        Returns a single label for a scalar and an object array for an array of values.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        zones = np.searchsorted(thresholds, values)
+        zones = np.where(np.isnan(values), len(thresholds) // 2, zones)
+        if zones.ndim == 0:
+            return labels[int(zones)]
+        return np.asarray(labels, dtype=object)[zones]
+    
+    def calculate_all_indicators(self, df, config: Dict[str, Any]) -> Dict[str, Any]:
+        """Calculate all technical indicators for given OHLCV data (a DataFrame or MarketData column arrays)"""
         
         # Ensure we have enough data
-        if len(df) < 50:
+        if len(df) < MIN_INDICATOR_BARS:
             return {}
         
         indicators = {}
         
+        # Pull every column out of the frame once; the kernels below all take float64 arrays
+        columns = self._column_arrays(df)
+        
         # Price-based indicators
-        indicators.update(self._calculate_price_indicators(df))
+        indicators.update(self._calculate_price_indicators(columns))
         
         # Trend indicators
-        indicators.update(self._calculate_trend_indicators(df, config))
+        indicators.update(self._calculate_trend_indicators(columns, config))
         
         # Momentum indicators
-        indicators.update(self._calculate_momentum_indicators(df, config))
+        indicators.update(self._calculate_momentum_indicators(columns, config))
         
         # Volatility indicators
-        indicators.update(self._calculate_volatility_indicators(df, config))
+        indicators.update(self._calculate_volatility_indicators(columns, config))
         
         # Volume indicators
-        indicators.update(self._calculate_volume_indicators(df, config))
+        indicators.update(self._calculate_volume_indicators(columns, config))
         
         # Support/Resistance indicators
-        indicators.update(self._calculate_support_resistance(df))
+        indicators.update(self._calculate_support_resistance(columns))
         
         # Convert all numpy types to Python native types for MongoDB compatibility
         return self._convert_numpy_types(indicators)
+
+    def calculate_indicator_frame(self, df: pd.DataFrame, config: Dict[str, Any]) -> pd.DataFrame:
+        """
+        Calculate every indicator as a full series in one vectorized pass.
+        Row i holds what calculate_all_indicators returns for df.iloc[:i+1]
+        (all indicators are causal); flags are 1.0/0.0 and missing values NaN.
+        """
+        close = df['close'].astype(float)
+        high = df['high'].astype(float)
+        low = df['low'].astype(float)
+        frame = {}
+
+        # Price-based indicators
+        prev_close = close.shift(1)
+        close_24 = close.shift(23)
+        frame['current_price'] = close
+        frame['price_change_1h'] = ((close - prev_close) / prev_close) * 100
+        frame['price_change_24h'] = ((close - close_24) / close_24) * 100
+        frame['high_24h'] = high.rolling(window=24).max()
+        frame['low_24h'] = low.rolling(window=24).min()
+
+        # Trend indicators
+        sma_20 = close.rolling(window=20).mean()
+        sma_50 = close.rolling(window=50).mean()
+        frame['sma_20'] = sma_20
+        frame['price_above_sma20'] = self._flag(close > sma_20, sma_20.notna())
+        frame['sma_50'] = sma_50
+        frame['sma_trend'] = self._flag((sma_20 > sma_50) & sma_20.notna(), sma_50.notna())
+
+        ema_12 = close.ewm(span=config.get('ema_fast', 12)).mean()
+        ema_26 = close.ewm(span=config.get('ema_slow', 26)).mean()
+        frame['ema_12'] = ema_12
+        frame['ema_26'] = ema_26
+        frame['ema_crossover'] = self._flag(ema_12 > ema_26, ema_26.notna())
+
+        macd_line = ema_12 - ema_26
+        signal_line = macd_line.ewm(span=config.get('macd_signal', 9)).mean()
+        macd_valid = macd_line.notna() & signal_line.notna()
+        frame['macd'] = macd_line.where(macd_valid)
+        frame['macd_signal'] = signal_line.where(macd_valid)
+        frame['macd_histogram'] = (macd_line - signal_line).where(macd_valid)
+        frame['macd_bullish'] = self._flag(macd_line > signal_line, macd_valid)
+
+        # Momentum indicators
+        delta = close.diff()
+        rsi_period = config.get('rsi_period', 14)
+        gain = (delta.where(delta > 0, 0)).rolling(window=rsi_period).mean()
+        loss = (-delta.where(delta < 0, 0)).rolling(window=rsi_period).mean()
+        rsi = (100 - (100 / (1 + gain / loss))).where(gain.notna() & loss.notna() & (loss != 0))
+        rsi_valid = rsi.notna()
+        frame['rsi'] = rsi
+        frame['rsi_oversold'] = self._flag(rsi < config.get('rsi_oversold', 30), rsi_valid)
+        frame['rsi_overbought'] = self._flag(rsi > config.get('rsi_overbought', 70), rsi_valid)
+        frame['rsi_bullish'] = self._flag(rsi > 50, rsi_valid)
+
+        low_min = low.rolling(window=config.get('stoch_k', 14)).min()
+        high_max = high.rolling(window=config.get('stoch_k', 14)).max()
+        stoch_k = 100 * ((close - low_min) / (high_max - low_min))
+        stoch_d = stoch_k.rolling(window=config.get('stoch_d', 3)).mean()
+        stoch_d = stoch_d.where(stoch_d.notna(), stoch_k)
+        stoch_valid = low_min.notna() & high_max.notna() & stoch_k.notna() & stoch_d.notna()
+        frame['stoch_k'] = stoch_k.where(stoch_valid)
+        frame['stoch_d'] = stoch_d.where(stoch_valid)
+        frame['stoch_oversold'] = self._flag(stoch_k < config.get('stoch_oversold', 20), stoch_valid)
+        frame['stoch_overbought'] = self._flag(stoch_k > config.get('stoch_overbought', 80), stoch_valid)
+
+        # Volatility indicators
+        bb_lower, sma, bb_upper = bbands(self._as_float_array(close),
+                                         int(config.get('bb_period', 20)), float(config.get('bb_std_dev', 2)))
+        bb_lower = pd.Series(bb_lower, index=df.index)
+        sma = pd.Series(sma, index=df.index)
+        bb_upper = pd.Series(bb_upper, index=df.index)
+        bb_valid = bb_upper.notna()
+        frame['bb_upper'] = bb_upper.where(bb_valid)
+        frame['bb_middle'] = sma.where(bb_valid)
+        frame['bb_lower'] = bb_lower.where(bb_valid)
+        frame['bb_width'] = (bb_upper - bb_lower).where(bb_valid)
+        frame['bb_position'] = ((close - bb_lower) / (bb_upper - bb_lower)).where(bb_valid)
+        frame['near_bb_lower'] = self._flag(close <= bb_lower * 1.02, bb_valid)
+        frame['near_bb_upper'] = self._flag(close >= bb_upper * 0.98, bb_valid)
+
+        true_range = pd.concat([high - low, (high - prev_close).abs(), (low - prev_close).abs()], axis=1).max(axis=1)
+        atr = true_range.rolling(window=config.get('atr_period', 14)).mean()
+        atr_14 = true_range.rolling(window=14).mean()
+        atr.iloc[:1] = np.nan
+        atr_14.iloc[:1] = np.nan
+        atr_valid = atr.notna()
+        frame['atr'] = atr
+        frame['volatility_high'] = self._flag(atr > atr_14.expanding().quantile(0.8),
+                                              atr_valid & (atr_14.notna().cumsum() > 20))
+
+        # Volume indicators
+        if 'volume' in df.columns:
+            volume = df['volume'].astype(float)
+            volume_sma = volume.rolling(window=config.get('volume_sma', 20)).mean()
+            volume_valid = volume_sma.notna()
+            frame['volume_sma'] = volume_sma
+            frame['volume_above_average'] = self._flag(volume > volume_sma, volume_valid)
+            frame['volume_spike'] = self._flag(volume > volume_sma * 1.5, volume_valid)
+
+            obv = (np.sign(delta).fillna(0) * volume).cumsum()
+            obv.iloc[:1] = np.nan
+            frame['obv'] = obv
+            frame['obv_trend'] = self._flag(obv > obv.shift(4), pd.Series(np.arange(len(df)) > 5, index=df.index))
+
+        # Support/Resistance indicators
+        prev_high = high.shift(1)
+        prev_low = low.shift(1)
+        pivot = (prev_high + prev_low + prev_close) / 3
+        frame['pivot_point'] = pivot
+        frame['resistance_1'] = 2 * pivot - prev_low
+        frame['support_1'] = 2 * pivot - prev_high
+        frame['resistance_2'] = pivot + (prev_high - prev_low)
+        frame['support_2'] = pivot - (prev_high - prev_low)
+
+        recent_high = high.rolling(window=20).max()
+        recent_low = low.rolling(window=20).min()
+        frame['recent_high'] = recent_high
+        frame['recent_low'] = recent_low
+        frame['near_resistance'] = self._flag(close >= recent_high * 0.98, recent_high.notna())
+        frame['near_support'] = self._flag(close <= recent_low * 1.02, recent_low.notna())
+
+        return pd.DataFrame(frame, index=df.index)
+
+    def indicators_at(self, columns: Dict[str, np.ndarray], i: int) -> Dict[str, Any]:
+        """Build the calculate_all_indicators dict for bar i from indicator frame columns"""
+        if i + 1 < MIN_INDICATOR_BARS:
+            return {}
+
+        indicators = {}
+        for key, values in columns.items():
+            value = values[i]
+            if value == value:  # NaN marks an indicator that is not available yet
+                indicators[key] = bool(value) if key in BOOLEAN_INDICATORS else float(value)
+        return indicators
+
+    def indicator_values(self, columns: Dict[str, np.ndarray], key: str, default: float) -> np.ndarray:
+        """
+        Whole-series counterpart of indicators_at(...).get(key, default).
+        Boolean indicators come back as 1.0/0.0; compare with != 0 for a mask.
+        """
+        values = columns.get(key)
+        if values is None:
+            return np.full(len(next(iter(columns.values()))), float(default))
+        
+        values = np.where(np.isnan(values), float(default), values)
+        values[:MIN_INDICATOR_BARS - 1] = default
+        return values
     
-    def _calculate_price_indicators(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _as_float_array(self, series: pd.Series) -> np.ndarray:
+        """Contiguous float64 view of a column for the numba kernels"""
+        return np.ascontiguousarray(series.to_numpy(dtype=np.float64))
+
+    def _column_arrays(self, df) -> Dict[str, np.ndarray]:
+        """high/low/close (and volume, when present) as float64 arrays"""
+        if not isinstance(df, pd.DataFrame):
+            # MarketData already holds contiguous float64 columns
+            return {name: getattr(df, name) for name in ('high', 'low', 'close', 'volume')}
+        names = ('high', 'low', 'close', 'volume') if 'volume' in df.columns else ('high', 'low', 'close')
+        return {name: self._as_float_array(df[name]) for name in names}
+
+    def _tail_mean(self, values: np.ndarray, window: int) -> float:
+        """Last value of a rolling(window).mean(), NaN while fewer than window values are available"""
+        if values.shape[0] < window:
+            return np.nan
+        return values[-window:].mean()
+
+    def _flag(self, condition: pd.Series, valid: pd.Series) -> pd.Series:
+        """Store a boolean series as 1.0/0.0, NaN where the indicator is unavailable"""
+        return condition.astype(float).where(valid)
+
+    def _calculate_price_indicators(self, columns: Dict[str, np.ndarray]) -> Dict[str, Any]:
         """Basic price indicators"""
-        current_price = float(df['close'].iloc[-1])
+        close = columns['close']
+        current_price = float(close[-1])
+        n = close.shape[0]
         
         return {
             'current_price': current_price,
-            'price_change_1h': float(((current_price - df['close'].iloc[-2]) / df['close'].iloc[-2]) * 100) if len(df) > 1 else 0,
-            'price_change_24h': float(((current_price - df['close'].iloc[-24]) / df['close'].iloc[-24]) * 100) if len(df) > 24 else 0,
-            'high_24h': float(df['high'].tail(24).max()) if len(df) > 24 else current_price,
-            'low_24h': float(df['low'].tail(24).min()) if len(df) > 24 else current_price,
+            'price_change_1h': float(((current_price - close[-2]) / close[-2]) * 100) if n > 1 else 0,
+            'price_change_24h': float(((current_price - close[-24]) / close[-24]) * 100) if n > 24 else 0,
+            'high_24h': float(columns['high'][-24:].max()) if n > 24 else current_price,
+            'low_24h': float(columns['low'][-24:].min()) if n > 24 else current_price,
         }
     
-    def _calculate_trend_indicators(self, df: pd.DataFrame, config: Dict[str, Any]) -> Dict[str, Any]:
+    def _calculate_trend_indicators(self, columns: Dict[str, np.ndarray], config: Dict[str, Any]) -> Dict[str, Any]:
         """Trend-following indicators"""
         indicators = {}
         
-        # Simple Moving Averages
-        sma_20 = df['close'].rolling(window=20).mean()
-        sma_50 = df['close'].rolling(window=50).mean()
+        # Simple Moving Averages: only the latest value is reported, so average just the tail window
+        close = columns['close']
+        sma_20 = self._tail_mean(close, 20)
+        sma_50 = self._tail_mean(close, 50)
         
-        if not sma_20.empty and not pd.isna(sma_20.iloc[-1]):
-            indicators['sma_20'] = float(sma_20.iloc[-1])
-            indicators['price_above_sma20'] = df['close'].iloc[-1] > sma_20.iloc[-1]
+        if not np.isnan(sma_20):
+            indicators['sma_20'] = float(sma_20)
+            indicators['price_above_sma20'] = close[-1] > sma_20
         
-        if not sma_50.empty and not pd.isna(sma_50.iloc[-1]):
-            indicators['sma_50'] = float(sma_50.iloc[-1])
-            indicators['sma_trend'] = sma_20.iloc[-1] > sma_50.iloc[-1] if not pd.isna(sma_20.iloc[-1]) else False
+        if not np.isnan(sma_50):
+            indicators['sma_50'] = float(sma_50)
+            indicators['sma_trend'] = sma_20 > sma_50 if not np.isnan(sma_20) else False
         
         # Exponential Moving Averages
-        ema_12 = df['close'].ewm(span=config.get('ema_fast', 12)).mean()
-        ema_26 = df['close'].ewm(span=config.get('ema_slow', 26)).mean()
+        ema_12 = ewm_mean(close, float(config.get('ema_fast', 12)))
+        ema_26 = ewm_mean(close, float(config.get('ema_slow', 26)))
         
-        if not ema_12.empty and not pd.isna(ema_12.iloc[-1]):
-            indicators['ema_12'] = float(ema_12.iloc[-1])
+        if not np.isnan(ema_12[-1]):
+            indicators['ema_12'] = float(ema_12[-1])
         
-        if not ema_26.empty and not pd.isna(ema_26.iloc[-1]):
-            indicators['ema_26'] = float(ema_26.iloc[-1])
-            indicators['ema_crossover'] = ema_12.iloc[-1] > ema_26.iloc[-1] if not pd.isna(ema_12.iloc[-1]) else False
+        if not np.isnan(ema_26[-1]):
+            indicators['ema_26'] = float(ema_26[-1])
+            indicators['ema_crossover'] = ema_12[-1] > ema_26[-1] if not np.isnan(ema_12[-1]) else False
         
         # MACD
         macd_line = ema_12 - ema_26
-        signal_line = macd_line.ewm(span=config.get('macd_signal', 9)).mean()
-        histogram = macd_line - signal_line
+        signal_line = ewm_mean(macd_line, float(config.get('macd_signal', 9)))
         
-        if not pd.isna(macd_line.iloc[-1]) and not pd.isna(signal_line.iloc[-1]):
-            indicators['macd'] = float(macd_line.iloc[-1])
-            indicators['macd_signal'] = float(signal_line.iloc[-1])
-            indicators['macd_histogram'] = float(histogram.iloc[-1])
-            indicators['macd_bullish'] = macd_line.iloc[-1] > signal_line.iloc[-1]
+        if not np.isnan(macd_line[-1]) and not np.isnan(signal_line[-1]):
+            indicators['macd'] = float(macd_line[-1])
+            indicators['macd_signal'] = float(signal_line[-1])
+            indicators['macd_histogram'] = float(macd_line[-1] - signal_line[-1])
+            indicators['macd_bullish'] = macd_line[-1] > signal_line[-1]
         
         return indicators
     
-    def _calculate_momentum_indicators(self, df: pd.DataFrame, config: Dict[str, Any]) -> Dict[str, Any]:
+    def _calculate_momentum_indicators(self, columns: Dict[str, np.ndarray], config: Dict[str, Any]) -> Dict[str, Any]:
         """Momentum oscillators"""
         indicators = {}
         
         # RSI
-        rsi = self._calculate_rsi(df['close'], config.get('rsi_period', 14))
+        rsi = rsi_last(columns['close'], int(config.get('rsi_period', 14)))
         if not pd.isna(rsi):
             indicators['rsi'] = float(rsi)
             indicators['rsi_oversold'] = rsi < config.get('rsi_oversold', 30)
@@ -108,7 +339,8 @@ class TechnicalIndicators:
             indicators['rsi_bullish'] = rsi > 50
         
         # Stochastic Oscillator
-        stoch_k, stoch_d = self._calculate_stochastic(df, config.get('stoch_k', 14), config.get('stoch_d', 3))
+        stoch_k, stoch_d = self._stochastic(columns['high'], columns['low'], columns['close'],
+                                            config.get('stoch_k', 14), config.get('stoch_d', 3))
         if not pd.isna(stoch_k) and not pd.isna(stoch_d):
             indicators['stoch_k'] = float(stoch_k)
             indicators['stoch_d'] = float(stoch_d)
@@ -117,75 +349,74 @@ class TechnicalIndicators:
         
         return indicators
     
-    def _calculate_volatility_indicators(self, df: pd.DataFrame, config: Dict[str, Any]) -> Dict[str, Any]:
+    def _calculate_volatility_indicators(self, columns: Dict[str, np.ndarray], config: Dict[str, Any]) -> Dict[str, Any]:
         """Volatility-based indicators"""
         indicators = {}
         
         # Bollinger Bands
-        bb_period = config.get('bb_period', 20)
-        bb_std = config.get('bb_std_dev', 2)
-        
-        sma = df['close'].rolling(window=bb_period).mean()
-        std = df['close'].rolling(window=bb_period).std()
-        
-        if not pd.isna(sma.iloc[-1]) and not pd.isna(std.iloc[-1]):
-            bb_upper = sma + (std * bb_std)
-            bb_lower = sma - (std * bb_std)
-            
-            current_price = df['close'].iloc[-1]
-            indicators['bb_upper'] = float(bb_upper.iloc[-1])
-            indicators['bb_middle'] = float(sma.iloc[-1])
-            indicators['bb_lower'] = float(bb_lower.iloc[-1])
+        close = columns['close']
+        bb_lower, sma, bb_upper = bbands(close, int(config.get('bb_period', 20)), float(config.get('bb_std_dev', 2)))
+        
+        if not np.isnan(bb_upper[-1]):
+            current_price = close[-1]
+            indicators['bb_upper'] = float(bb_upper[-1])
+            indicators['bb_middle'] = float(sma[-1])
+            indicators['bb_lower'] = float(bb_lower[-1])
             indicators['bb_width'] = indicators['bb_upper'] - indicators['bb_lower']
             indicators['bb_position'] = (current_price - indicators['bb_lower']) / indicators['bb_width']
             indicators['near_bb_lower'] = current_price <= indicators['bb_lower'] * 1.02
             indicators['near_bb_upper'] = current_price >= indicators['bb_upper'] * 0.98
         
         # Average True Range (ATR)
-        atr = self._calculate_atr(df, config.get('atr_period', 14))
-        if not pd.isna(atr):
+        tr = true_range(columns['high'], columns['low'], close)
+        atr = self._tail_mean(tr, int(config.get('atr_period', 14)))
+        if not np.isnan(atr):
             indicators['atr'] = float(atr)
-            # Calculate volatility percentile
-            atr_series = df.apply(lambda x: self._calculate_atr(df.loc[:x.name], 14), axis=1).dropna()
+            # Calculate volatility percentile over the 14-bar ATR of every bar so far
+            atr_series = self._atr_series(tr, 14)
+            atr_series = atr_series[~np.isnan(atr_series)]
             if len(atr_series) > 20:
-                indicators['volatility_high'] = atr > atr_series.quantile(0.8)
+                indicators['volatility_high'] = atr > np.quantile(atr_series, 0.8)
         
         return indicators
     
-    def _calculate_volume_indicators(self, df: pd.DataFrame, config: Dict[str, Any]) -> Dict[str, Any]:
+    def _calculate_volume_indicators(self, columns: Dict[str, np.ndarray], config: Dict[str, Any]) -> Dict[str, Any]:
         """Volume-based indicators"""
         indicators = {}
         
-        if 'volume' not in df.columns:
+        if 'volume' not in columns:
             return indicators
         
         # Volume moving average
-        volume_sma = df['volume'].rolling(window=config.get('volume_sma', 20)).mean()
-        if not pd.isna(volume_sma.iloc[-1]):
-            current_volume = df['volume'].iloc[-1]
-            indicators['volume_sma'] = float(volume_sma.iloc[-1])
-            indicators['volume_above_average'] = current_volume > volume_sma.iloc[-1]
-            indicators['volume_spike'] = current_volume > volume_sma.iloc[-1] * 1.5
+        volume = columns['volume']
+        volume_sma = self._tail_mean(volume, int(config.get('volume_sma', 20)))
+        if not np.isnan(volume_sma):
+            current_volume = volume[-1]
+            indicators['volume_sma'] = float(volume_sma)
+            indicators['volume_above_average'] = current_volume > volume_sma
+            indicators['volume_spike'] = current_volume > volume_sma * 1.5
         
         # On-Balance Volume (OBV)
-        obv = self._calculate_obv(df)
-        if not pd.isna(obv):
+        if len(volume) >= 2:
+            obv_series = on_balance_volume(columns['close'], volume)
+            obv = obv_series[-1]
             indicators['obv'] = float(obv)
-            obv_series = df.apply(lambda x: self._calculate_obv(df.loc[:x.name]), axis=1).dropna()
-            if len(obv_series) > 5:
-                indicators['obv_trend'] = obv > obv_series.iloc[-5]
+            # Bar 0 has no OBV, so the series holds len(volume) - 1 values
+            if len(obv_series) - 1 > 5:
+                indicators['obv_trend'] = obv > obv_series[-5]
         
         return indicators
     
-    def _calculate_support_resistance(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _calculate_support_resistance(self, columns: Dict[str, np.ndarray]) -> Dict[str, Any]:
         """Support and resistance levels"""
         indicators = {}
+        n = len(columns['close'])
         
         # Pivot Points
-        if len(df) >= 3:
-            high = df['high'].iloc[-2]
-            low = df['low'].iloc[-2]
-            close = df['close'].iloc[-2]
+        if n >= 3:
+            high = columns['high'][-2]
+            low = columns['low'][-2]
+            close = columns['close'][-2]
             
             pivot = (high + low + close) / 3
             indicators['pivot_point'] = float(pivot)
@@ -195,10 +426,10 @@ class TechnicalIndicators:
             indicators['support_2'] = float(pivot - (high - low))
         
         # Recent highs and lows
-        if len(df) >= 20:
-            recent_high = df['high'].tail(20).max()
-            recent_low = df['low'].tail(20).min()
-            current_price = df['close'].iloc[-1]
+        if n >= 20:
+            recent_high = columns['high'][-20:].max()
+            recent_low = columns['low'][-20:].min()
+            current_price = columns['close'][-1]
             
             indicators['recent_high'] = float(recent_high)
             indicators['recent_low'] = float(recent_low)
@@ -209,64 +440,61 @@ class TechnicalIndicators:
     
     def _calculate_rsi(self, prices: pd.Series, period: int = 14) -> float:
         """Calculate Relative Strength Index"""
-        delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        
-        if pd.isna(gain.iloc[-1]) or pd.isna(loss.iloc[-1]) or loss.iloc[-1] == 0:
-            return np.nan
-        
-        rs = gain.iloc[-1] / loss.iloc[-1]
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
+        return rsi_last(self._as_float_array(prices), int(period))
     
     def _calculate_stochastic(self, df: pd.DataFrame, k_period: int = 14, d_period: int = 3):
-        """Calculate Stochastic Oscillator"""
-        low_min = df['low'].rolling(window=k_period).min()
-        high_max = df['high'].rolling(window=k_period).max()
+        """Calculate Stochastic Oscillator from the last k_period + d_period - 1 bars"""
+        return self._stochastic(self._as_float_array(df['high']), self._as_float_array(df['low']),
+                                self._as_float_array(df['close']), k_period, d_period)
+    
+    def _stochastic(self, high: np.ndarray, low: np.ndarray, close: np.ndarray, k_period: int, d_period: int):
+        """Stochastic %K and %D on float64 arrays"""
+        k_period, d_period = int(k_period), int(d_period)
+        if len(close) < k_period:
+            return np.nan, np.nan
+        
+        # %D averages the last d_period values of %K, each of which needs k_period bars
+        span = k_period + d_period - 1
+        low_min = sliding_window_view(low[-span:], k_period).min(axis=1)
+        high_max = sliding_window_view(high[-span:], k_period).max(axis=1)
         
-        if pd.isna(low_min.iloc[-1]) or pd.isna(high_max.iloc[-1]):
+        if np.isnan(low_min[-1]) or np.isnan(high_max[-1]):
             return np.nan, np.nan
         
-        k_percent = 100 * ((df['close'].iloc[-1] - low_min.iloc[-1]) / (high_max.iloc[-1] - low_min.iloc[-1]))
+        close = close[-len(low_min):]
+        k_series = 100 * ((close - low_min) / (high_max - low_min))
+        k_percent = k_series[-1]
         
         # Calculate D as moving average of K
-        k_series = 100 * ((df['close'] - low_min) / (high_max - low_min))
-        d_percent = k_series.rolling(window=d_period).mean().iloc[-1]
+        d_percent = self._tail_mean(k_series, d_period)
         
-        return k_percent, d_percent if not pd.isna(d_percent) else k_percent
+        return k_percent, d_percent if not np.isnan(d_percent) else k_percent
     
     def _calculate_atr(self, df: pd.DataFrame, period: int = 14) -> float:
         """Calculate Average True Range"""
         if len(df) < 2:
             return np.nan
         
-        high = df['high']
-        low = df['low']
-        close = df['close'].shift(1)
-        
-        tr1 = high - low
-        tr2 = abs(high - close)
-        tr3 = abs(low - close)
-        
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-        atr = tr.rolling(window=period).mean()
-        
-        return atr.iloc[-1] if not pd.isna(atr.iloc[-1]) else np.nan
+        return self._tail_mean(self._true_range(df), int(period))
+    
+    def _true_range(self, df: pd.DataFrame) -> np.ndarray:
+        """True range of every bar"""
+        return true_range(self._as_float_array(df['high']), self._as_float_array(df['low']),
+                          self._as_float_array(df['close']))
+    
+    def _atr_series(self, tr: np.ndarray, period: int = 14) -> np.ndarray:
+        """ATR of every bar (what _calculate_atr returns for each prefix) from _true_range; NaN until available"""
+        # Running sum: each bar adds its true range and drops the one leaving the window
+        atr = rolling_mean(tr, int(period))
+        atr[:1] = np.nan
+        return atr
     
     def _calculate_obv(self, df: pd.DataFrame) -> float:
         """Calculate On-Balance Volume"""
         if 'volume' not in df.columns or len(df) < 2:
             return np.nan
         
-        obv = 0
-        for i in range(1, len(df)):
-            if df['close'].iloc[i] > df['close'].iloc[i-1]:
-                obv += df['volume'].iloc[i]
-            elif df['close'].iloc[i] < df['close'].iloc[i-1]:
-                obv -= df['volume'].iloc[i]
-        
-        return obv
+        return on_balance_volume(self._as_float_array(df['close']), self._as_float_array(df['volume']))[-1]
     
     def _convert_numpy_types(self, obj):
         """Convert numpy types to Python native types for MongoDB compatibility"""
@@ -337,39 +565,45 @@ class TechnicalIndicators:
         signal_ratio = bullish_signals / total_signals
         return signal_ratio * 10
     
-    def get_trading_signal(self, indicators: Dict[str, Any], config: Dict[str, Any]) -> str:
-        """Generate BUY/SELL/HOLD signal based on indicators"""
+    def score_signal(self, indicators: Dict[str, Any], config: Dict[str, Any]) -> SignalScore:
+        """Strength, buy/sell condition counts and the resulting BUY/SELL/HOLD signal, computed once"""
         signal_strength = self.get_signal_strength(indicators)
         min_strength = config.get('min_signal_strength', 6)
         
         # Strong bullish conditions
-        bullish_conditions = [
-            indicators.get('rsi_oversold', False),
-            indicators.get('near_bb_lower', False),
-            indicators.get('ema_crossover', False),
-            indicators.get('macd_bullish', False),
-            indicators.get('volume_above_average', False),
-            indicators.get('stoch_oversold', False)
-        ]
+        buy_conditions = {
+            'rsi_oversold': indicators.get('rsi_oversold', False),
+            'near_bb_lower': indicators.get('near_bb_lower', False),
+            'ema_crossover': indicators.get('ema_crossover', False),
+            'macd_bullish': indicators.get('macd_bullish', False),
+            'volume_above_average': indicators.get('volume_above_average', False),
+            'stoch_oversold': indicators.get('stoch_oversold', False)
+        }
         
         # Strong bearish conditions  
-        bearish_conditions = [
-            indicators.get('rsi_overbought', False),
-            indicators.get('near_bb_upper', False),
-            not indicators.get('ema_crossover', True),
-            not indicators.get('macd_bullish', True),
-            indicators.get('stoch_overbought', False)
-        ]
-        
-        bullish_score = sum(bullish_conditions)
-        bearish_score = sum(bearish_conditions)
-        
-        if signal_strength >= min_strength and bullish_score >= 3:
-            return 'BUY'
-        elif signal_strength <= (10 - min_strength) and bearish_score >= 3:
-            return 'SELL'
+        sell_conditions = {
+            'rsi_overbought': indicators.get('rsi_overbought', False),
+            'near_bb_upper': indicators.get('near_bb_upper', False),
+            'ema_bearish': not indicators.get('ema_crossover', True),
+            'macd_bearish': not indicators.get('macd_bullish', True),
+            'stoch_overbought': indicators.get('stoch_overbought', False)
+        }
+        
+        buy_score = sum(buy_conditions.values())
+        sell_score = sum(sell_conditions.values())
+        
+        if signal_strength >= min_strength and buy_score >= 3:
+            signal = 'BUY'
+        elif signal_strength <= (10 - min_strength) and sell_score >= 3:
+            signal = 'SELL'
         else:
-            return 'HOLD'
+            signal = 'HOLD'
+        
+        return SignalScore(signal, signal_strength, buy_score, sell_score, buy_conditions, sell_conditions)
+    
+    def get_trading_signal(self, indicators: Dict[str, Any], config: Dict[str, Any]) -> str:
+        """Generate BUY/SELL/HOLD signal based on indicators"""
+        return self.score_signal(indicators, config).signal
 
 if __name__ == "__main__":
     # Example usage
@@ -399,8 +633,7 @@ if __name__ == "__main__":
     
     # Calculate indicators
     indicators = ti.calculate_all_indicators(sample_data, config)
-    signal = ti.get_trading_signal(indicators, config)
-    strength = ti.get_signal_strength(indicators)
+    score = ti.score_signal(indicators, config)
     
     print(f"Sample indicators calculated: {len(indicators)} indicators")
-    print(f"Signal: {signal}, Strength: {strength:.2f}")
\ No newline at end of file
+    print(f"Signal: {score.signal}, Strength: {score.strength:.2f} (buy {score.buy_score}/sell {score.sell_score})")
\ No newline at end of file
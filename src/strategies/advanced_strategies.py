@@ -4,7 +4,8 @@ Implements proven algorithmic trading patterns with enhanced features
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional
+from types import MappingProxyType
+from typing import Dict, Any, Final, List, Mapping, Optional, Tuple
 import pandas as pd
 import numpy as np
 from datetime import datetime
@@ -25,7 +26,7 @@ class BbandRsiStrategy(BaseStrategy):
         
         signal_data = {
             'timestamp': datetime.utcnow(),
-            'price': float(df['close'].iloc[-1]),
+            'price': float(df['close'].iat[-1]),
             'signal': 'HOLD',
             'confidence': 0.0,
             'reasoning': [],
@@ -85,6 +86,30 @@ class BbandRsiStrategy(BaseStrategy):
         signal_data['reasoning'] = reasoning
         return signal_data
     
+    def generate_signal_arrays(self, df: pd.DataFrame, indicator_columns: Dict[str, np.ndarray],
+                               start: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorized generate_signal over the whole series"""
+        values = self.indicators_calculator.indicator_values
+        rsi = values(indicator_columns, 'rsi', 50)
+        bb_position = values(indicator_columns, 'bb_position', 0.5)
+        volume_above_avg = values(indicator_columns, 'volume_above_average', 0.0) != 0
+        macd_bullish = values(indicator_columns, 'macd_bullish', 0.0) != 0
+        
+        strong_buy = (rsi < 30) & (bb_position < 0.2)
+        moderate_buy = ~strong_buy & (rsi < 35) & (bb_position < 0.3)
+        score = 4 * strong_buy + 2 * moderate_buy + volume_above_avg + macd_bullish
+        
+        strong_sell = (rsi > 70) & (bb_position > 0.8)
+        moderate_sell = ~strong_sell & (rsi > 65) & (bb_position > 0.7)
+        sell_score = 4 * strong_sell + 2 * moderate_sell
+        
+        return self._select_signals(
+            [score >= 4, sell_score >= 4, score >= 2, sell_score >= 2],
+            [1, -1, 1, -1],
+            [np.minimum(score / 6, 1.0), np.minimum(sell_score / 6, 1.0), score / 6, sell_score / 6],
+            start
+        )
+    
     def get_parameters(self) -> Dict[str, Any]:
         return {
             'rsi_oversold': 30,
@@ -107,7 +132,7 @@ class EmaRsiStrategy(BaseStrategy):
         
         signal_data = {
             'timestamp': datetime.utcnow(),
-            'price': float(df['close'].iloc[-1]),
+            'price': float(df['close'].iat[-1]),
             'signal': 'HOLD',
             'confidence': 0.0,
             'reasoning': [],
@@ -124,7 +149,7 @@ class EmaRsiStrategy(BaseStrategy):
         volume_above_avg = indicators.get('volume_above_average', False)
         atr = indicators.get('atr', 0)
         
-        current_price = float(df['close'].iloc[-1])
+        current_price = float(df['close'].iat[-1])
         ema_12 = indicators.get('ema_12', current_price)
         ema_26 = indicators.get('ema_26', current_price)
         
@@ -208,7 +233,7 @@ class MacdRsiStrategy(BaseStrategy):
         
         signal_data = {
             'timestamp': datetime.utcnow(),
-            'price': float(df['close'].iloc[-1]),
+            'price': float(df['close'].iat[-1]),
             'signal': 'HOLD',
             'confidence': 0.0,
             'reasoning': [],
@@ -263,7 +288,7 @@ class MacdRsiStrategy(BaseStrategy):
         # Look for divergence (simplified)
         if len(df) >= 5:
             recent_prices = df['close'].tail(5)
-            price_trend = recent_prices.iloc[-1] > recent_prices.iloc[0]
+            price_trend = recent_prices.iat[-1] > recent_prices.iat[0]
             
             # If MACD bullish but price declining (bullish divergence)
             if macd_bullish and not price_trend and rsi < 40:
@@ -284,6 +309,36 @@ class MacdRsiStrategy(BaseStrategy):
         signal_data['reasoning'] = reasoning
         return signal_data
     
+    def generate_signal_arrays(self, df: pd.DataFrame, indicator_columns: Dict[str, np.ndarray],
+                               start: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorized generate_signal over the whole series"""
+        values = self.indicators_calculator.indicator_values
+        macd_bullish = values(indicator_columns, 'macd_bullish', 0.0) != 0
+        macd_histogram = values(indicator_columns, 'macd_histogram', 0)
+        rsi = values(indicator_columns, 'rsi', 50)
+        volume_above_avg = values(indicator_columns, 'volume_above_average', 0.0) != 0
+        bb_position = values(indicator_columns, 'bb_position', 0.5)
+        
+        # Price falling over the last 5 bars, for every bar at once: close[i] vs close[i-4]
+        close = df['close'].to_numpy(dtype=np.float64)
+        price_falling = np.zeros(len(close), dtype=bool)
+        price_falling[4:] = ~(close[4:] > close[:-4])
+        
+        score = (
+            np.select([macd_bullish & (macd_histogram > 0), macd_bullish, macd_histogram > 0], [3, 2, 1], default=0)
+            + np.select([rsi < 35, (rsi >= 35) & (rsi <= 50), rsi > 65], [2, 1, -2], default=0)
+            + np.select([bb_position < 0.3, bb_position > 0.7], [1, -1], default=0)
+            + volume_above_avg
+            + 2 * (macd_bullish & price_falling & (rsi < 40))
+        )
+        
+        return self._select_signals(
+            [score >= 5, score >= 3, score <= -2],
+            [1, 1, -1],
+            [np.minimum(score / 8, 1.0), score / 8, np.abs(score) / 8],
+            start
+        )
+    
     def get_parameters(self) -> Dict[str, Any]:
         return {
             'macd_fast': 12,
@@ -307,7 +362,7 @@ class AdxMomentumStrategy(BaseStrategy):
         
         signal_data = {
             'timestamp': datetime.utcnow(),
-            'price': float(df['close'].iloc[-1]),
+            'price': float(df['close'].iat[-1]),
             'signal': 'HOLD',
             'confidence': 0.0,
             'reasoning': [],
@@ -325,7 +380,7 @@ class AdxMomentumStrategy(BaseStrategy):
         volume_above_avg = indicators.get('volume_above_average', False)
         macd_bullish = indicators.get('macd_bullish', False)
         
-        current_price = float(df['close'].iloc[-1])
+        current_price = float(df['close'].iat[-1])
         
         # ADX trend strength analysis
         if adx > 35:  # Very strong trend
@@ -412,7 +467,7 @@ class VolatilityBreakoutStrategy(BaseStrategy):
         
         signal_data = {
             'timestamp': datetime.utcnow(),
-            'price': float(df['close'].iloc[-1]),
+            'price': float(df['close'].iat[-1]),
             'signal': 'HOLD',
             'confidence': 0.0,
             'reasoning': [],
@@ -428,7 +483,7 @@ class VolatilityBreakoutStrategy(BaseStrategy):
         volume_spike = indicators.get('volume_spike', False)
         near_resistance = indicators.get('near_resistance', False)
         near_support = indicators.get('near_support', False)
-        current_price = float(df['close'].iloc[-1])
+        current_price = float(df['close'].iat[-1])
         recent_high = indicators.get('recent_high', current_price)
         recent_low = indicators.get('recent_low', current_price)
         
@@ -497,7 +552,7 @@ class VolatilityBreakoutStrategy(BaseStrategy):
         if len(df) >= 10:
             recent_range = df['high'].tail(10).max() - df['low'].tail(10).min()
             if recent_range > 0:
-                current_move = abs(current_price - df['close'].iloc[-2])
+                current_move = abs(current_price - df['close'].iat[-2])
                 move_pct = (current_move / recent_range) * 100
                 
                 if move_pct > 50:  # Significant move
@@ -541,7 +596,7 @@ class ScalpingStrategy(BaseStrategy):
         
         signal_data = {
             'timestamp': datetime.utcnow(),
-            'price': float(df['close'].iloc[-1]),
+            'price': float(df['close'].iat[-1]),
             'signal': 'HOLD',
             'confidence': 0.0,
             'reasoning': [],
@@ -557,7 +612,7 @@ class ScalpingStrategy(BaseStrategy):
         bb_position = indicators.get('bb_position', 0.5)
         volume_above_avg = indicators.get('volume_above_average', False)
         ema_crossover = indicators.get('ema_crossover', False)
-        current_price = float(df['close'].iloc[-1])
+        current_price = float(df['close'].iat[-1])
         
         # Fast RSI signals
         if rsi < 25:  # Very oversold
@@ -659,6 +714,25 @@ class ScalpingStrategy(BaseStrategy):
             'quick_exit': True
         }
 
+# Strategy name -> class, and the one-line descriptions shown in the menus; both fixed at import
+STRATEGY_CLASSES: Final[Mapping[str, type]] = MappingProxyType({
+    'BbandRsi': BbandRsiStrategy,
+    'EmaRsi': EmaRsiStrategy,
+    'MacdRsi': MacdRsiStrategy,
+    'AdxMomentum': AdxMomentumStrategy,
+    'VolatilityBreakout': VolatilityBreakoutStrategy,
+    'Scalping': ScalpingStrategy
+})
+
+STRATEGY_DESCRIPTIONS: Final[Mapping[str, str]] = MappingProxyType({
+    'BbandRsi': 'Bollinger Bands + RSI for oversold/overbought signals',
+    'EmaRsi': 'EMA crossovers with RSI momentum confirmation', 
+    'MacdRsi': 'MACD trend with RSI timing for entries',
+    'AdxMomentum': 'ADX trend strength with momentum indicators',
+    'VolatilityBreakout': 'ATR-based volatility breakout detection',
+    'Scalping': 'High-frequency short-term trading signals'
+})
+
 # Strategy factory for easy instantiation
 class AdvancedStrategyFactory:
     """Factory for creating advanced strategies"""
@@ -666,41 +740,18 @@ class AdvancedStrategyFactory:
     @staticmethod
     def get_all_strategies(config: Dict[str, Any]) -> List[BaseStrategy]:
         """Get all available advanced strategies"""
-        return [
-            BbandRsiStrategy(config),
-            EmaRsiStrategy(config),
-            MacdRsiStrategy(config),
-            AdxMomentumStrategy(config),
-            VolatilityBreakoutStrategy(config),
-            ScalpingStrategy(config)
-        ]
+        return [strategy_class(config) for strategy_class in STRATEGY_CLASSES.values()]
     
     @staticmethod
     def get_strategy_by_name(name: str, config: Dict[str, Any]) -> Optional[BaseStrategy]:
         """Get specific strategy by name"""
-        strategies = {
-            'BbandRsi': BbandRsiStrategy,
-            'EmaRsi': EmaRsiStrategy,
-            'MacdRsi': MacdRsiStrategy,
-            'AdxMomentum': AdxMomentumStrategy,
-            'VolatilityBreakout': VolatilityBreakoutStrategy,
-            'Scalping': ScalpingStrategy
-        }
-        
-        strategy_class = strategies.get(name)
+        strategy_class = STRATEGY_CLASSES.get(name)
         return strategy_class(config) if strategy_class else None
     
     @staticmethod
-    def get_strategy_descriptions() -> Dict[str, str]:
-        """Get descriptions of all strategies"""
-        return {
-            'BbandRsi': 'Bollinger Bands + RSI for oversold/overbought signals',
-            'EmaRsi': 'EMA crossovers with RSI momentum confirmation', 
-            'MacdRsi': 'MACD trend with RSI timing for entries',
-            'AdxMomentum': 'ADX trend strength with momentum indicators',
-            'VolatilityBreakout': 'ATR-based volatility breakout detection',
-            'Scalping': 'High-frequency short-term trading signals'
-        }
+    def get_strategy_descriptions() -> Mapping[str, str]:
+        """Get descriptions of all strategies (read-only, shared)"""
+        return STRATEGY_DESCRIPTIONS
 
 if __name__ == "__main__":
     # Test the strategies
@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 import pandas as pd
+import numpy as np
 from datetime import datetime
 from indicators.technical_indicators_simple import TechnicalIndicators
 from core.database_schema import TradingDatabase
@@ -22,6 +23,38 @@ class BaseStrategy(ABC):
     def get_parameters(self) -> Dict[str, Any]:
         """Get strategy parameters for optimization"""
         pass
+    
+    def generate_signal_arrays(self, df: pd.DataFrame, indicator_columns: Dict[str, np.ndarray],
+                               start: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Signals for every bar from `start`: side (+1 BUY, -1 SELL, 0) and confidence arrays.
+        The default replays generate_signal bar by bar; strategies whose rules are plain
+        indicator comparisons override this with whole-series masks.
+        """
+        side = np.zeros(len(df), dtype=np.int64)
+        confidence = np.zeros(len(df), dtype=np.float64)
+        
+        for i in range(start, len(df)):
+            indicators = self.indicators_calculator.indicators_at(indicator_columns, i)
+            # iloc slicing is a view, not a copy
+            signal_data = self.generate_signal(df.iloc[:i+1], indicators)
+            
+            if signal_data['signal'] == 'BUY':
+                side[i] = 1
+            elif signal_data['signal'] == 'SELL':
+                side[i] = -1
+            confidence[i] = signal_data.get('confidence', 0)
+        
+        return side, confidence
+    
+    def _select_signals(self, conditions: List[np.ndarray], sides: List[int],
+                        confidences: List[Any], start: int) -> Tuple[np.ndarray, np.ndarray]:
+        """First matching condition wins, like an if/elif chain; bars before start stay HOLD"""
+        side = np.select(conditions, sides, default=0).astype(np.int64)
+        confidence = np.select(conditions, confidences, default=0.0).astype(np.float64)
+        side[:start] = 0
+        confidence[:start] = 0.0
+        return side, confidence
 
 class MultiIndicatorStrategy(BaseStrategy):
     """Strategy combining multiple technical indicators"""
@@ -34,7 +67,7 @@ class MultiIndicatorStrategy(BaseStrategy):
         
         signal_data = {
             'timestamp': datetime.utcnow(),
-            'price': float(df['close'].iloc[-1]),
+            'price': float(df['close'].iat[-1]),
             'signal': 'HOLD',
             'confidence': 0.0,
             'reasoning': [],
@@ -127,6 +160,41 @@ class MultiIndicatorStrategy(BaseStrategy):
         signal_data['reasoning'] = reasoning
         return signal_data
     
+    def generate_signal_arrays(self, df: pd.DataFrame, indicator_columns: Dict[str, np.ndarray],
+                               start: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorized generate_signal over the whole series; NaN marks bars where an indicator is missing"""
+        values = self.indicators_calculator.indicator_values
+        flags = {key: values(indicator_columns, key, np.nan) for key in (
+            'rsi_oversold', 'rsi_overbought', 'rsi_bullish', 'macd_bullish', 'near_bb_lower', 'near_bb_upper',
+            'ema_crossover', 'volume_above_average', 'stoch_oversold', 'stoch_overbought')}
+        has = {key: ~np.isnan(flag) for key, flag in flags.items()}
+        on = {key: flag == 1 for key, flag in flags.items()}
+        has_rsi = ~np.isnan(values(indicator_columns, 'rsi', np.nan))
+        has_bb = has['near_bb_lower'] & has['near_bb_upper']
+        has_stoch = has['stoch_oversold'] & has['stoch_overbought']
+        
+        # Same weights as generate_signal; each term only counts where its indicators exist
+        rsi_score = np.select([on['rsi_oversold'], on['rsi_overbought'], on['rsi_bullish']], [2, -2, 1], default=-1)
+        score = (
+            np.where(has_rsi, rsi_score, 0)
+            + np.where(has['macd_bullish'], np.where(on['macd_bullish'], 2, -2), 0)
+            + np.where(has_bb, np.select([on['near_bb_lower'], on['near_bb_upper']], [2, -2], default=0), 0)
+            + np.where(has['ema_crossover'], np.where(on['ema_crossover'], 1, -1), 0)
+            + on['volume_above_average']
+            + np.where(has_stoch, np.select([on['stoch_oversold'], on['stoch_overbought']], [1, -1], default=0), 0)
+        )
+        max_score = (2 * has_rsi + 2 * has['macd_bullish'] + 2 * has_bb + has['ema_crossover']
+                     + has['volume_above_average'] + has_stoch)
+        
+        confidence = np.divide(np.abs(score), max_score, out=np.zeros(len(df)), where=max_score > 0)
+        threshold = self.config.get('signal_threshold', 0.6)
+        side = np.select([(score > 0) & (confidence >= threshold), (score < 0) & (confidence >= threshold)],
+                         [1, -1], default=0).astype(np.int64)
+        # generate_signal reports its confidence on HOLD bars too
+        side[:start] = 0
+        confidence[:start] = 0.0
+        return side, confidence
+    
     def get_parameters(self) -> Dict[str, Any]:
         return {
             'signal_threshold': self.config.get('signal_threshold', 0.6),
@@ -147,7 +215,7 @@ class MeanReversionStrategy(BaseStrategy):
         
         signal_data = {
             'timestamp': datetime.utcnow(),
-            'price': float(df['close'].iloc[-1]),
+            'price': float(df['close'].iat[-1]),
             'signal': 'HOLD',
             'confidence': 0.0,
             'reasoning': [],
@@ -185,6 +253,28 @@ class MeanReversionStrategy(BaseStrategy):
         signal_data['reasoning'] = reasoning
         return signal_data
     
+    def generate_signal_arrays(self, df: pd.DataFrame, indicator_columns: Dict[str, np.ndarray],
+                               start: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorized generate_signal over the whole series"""
+        values = self.indicators_calculator.indicator_values
+        rsi_oversold = values(indicator_columns, 'rsi_oversold', 0.0) != 0
+        rsi_overbought = values(indicator_columns, 'rsi_overbought', 0.0) != 0
+        near_bb_lower = values(indicator_columns, 'near_bb_lower', 0.0) != 0
+        near_bb_upper = values(indicator_columns, 'near_bb_upper', 0.0) != 0
+        bb_position = values(indicator_columns, 'bb_position', 0.5)
+        
+        return self._select_signals(
+            [
+                rsi_oversold & (near_bb_lower | (bb_position < 0.2)),
+                rsi_oversold | near_bb_lower,
+                rsi_overbought & (near_bb_upper | (bb_position > 0.8)),
+                rsi_overbought | near_bb_upper,
+            ],
+            [1, 1, -1, -1],
+            [0.8, 0.6, 0.8, 0.6],
+            start
+        )
+    
     def get_parameters(self) -> Dict[str, Any]:
         return {
             'rsi_period': self.config.get('rsi_period', 14),
@@ -205,7 +295,7 @@ class TrendFollowingStrategy(BaseStrategy):
         
         signal_data = {
             'timestamp': datetime.utcnow(),
-            'price': float(df['close'].iloc[-1]),
+            'price': float(df['close'].iat[-1]),
             'signal': 'HOLD',
             'confidence': 0.0,
             'reasoning': [],
@@ -248,6 +338,25 @@ class TrendFollowingStrategy(BaseStrategy):
         signal_data['reasoning'] = reasoning
         return signal_data
     
+    def generate_signal_arrays(self, df: pd.DataFrame, indicator_columns: Dict[str, np.ndarray],
+                               start: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorized generate_signal over the whole series"""
+        values = self.indicators_calculator.indicator_values
+        score = (
+            2 * (values(indicator_columns, 'ema_crossover', 0.0) != 0)
+            + (values(indicator_columns, 'sma_trend', 0.0) != 0)
+            + 2 * (values(indicator_columns, 'macd_bullish', 0.0) != 0)
+            + (values(indicator_columns, 'adx', 0.0) > self.config.get('adx_threshold', 25))
+            + (values(indicator_columns, 'volume_above_average', 0.0) != 0)
+        )
+        
+        return self._select_signals(
+            [score >= 4, score <= -4],
+            [1, -1],
+            [np.minimum(score / 7, 1.0), np.minimum(np.abs(score) / 7, 1.0)],
+            start
+        )
+    
     def get_parameters(self) -> Dict[str, Any]:
         return {
             'ema_fast': self.config.get('ema_fast', 12),
@@ -267,7 +376,7 @@ class BreakoutStrategy(BaseStrategy):
         
         signal_data = {
             'timestamp': datetime.utcnow(),
-            'price': float(df['close'].iloc[-1]),
+            'price': float(df['close'].iat[-1]),
             'signal': 'HOLD',
             'confidence': 0.0,
             'reasoning': [],
@@ -275,7 +384,7 @@ class BreakoutStrategy(BaseStrategy):
         }
         
         reasoning = []
-        current_price = float(df['close'].iloc[-1])
+        current_price = float(df['close'].iat[-1])
         
         # Volume spike confirmation
         volume_spike = indicators.get('volume_spike', False)
@@ -303,6 +412,32 @@ class BreakoutStrategy(BaseStrategy):
         signal_data['reasoning'] = reasoning
         return signal_data
     
+    def generate_signal_arrays(self, df: pd.DataFrame, indicator_columns: Dict[str, np.ndarray],
+                               start: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorized generate_signal over the whole series"""
+        values = self.indicators_calculator.indicator_values
+        close = df['close'].to_numpy(dtype=np.float64)
+        volume_spike = values(indicator_columns, 'volume_spike', 0.0) != 0
+        recent_high = values(indicator_columns, 'recent_high', np.nan)
+        recent_low = values(indicator_columns, 'recent_low', np.nan)
+        broke_resistance = close > np.where(np.isnan(recent_high), close, recent_high)
+        broke_support = close < np.where(np.isnan(recent_low), close, recent_low)
+        
+        # A level test with a volume spike holds unless price actually broke the level
+        resistance_test = (values(indicator_columns, 'near_resistance', 0.0) != 0) & volume_spike
+        support_test = (values(indicator_columns, 'near_support', 0.0) != 0) & volume_spike
+        
+        return self._select_signals(
+            [
+                resistance_test,
+                support_test,
+                (values(indicator_columns, 'near_bb_upper', 0.0) != 0) & volume_spike,
+            ],
+            [np.where(broke_resistance, 1, 0), np.where(broke_support, -1, 0), 1],
+            [np.where(broke_resistance, 0.8, 0.0), np.where(broke_support, 0.8, 0.0), 0.7],
+            start
+        )
+    
     def get_parameters(self) -> Dict[str, Any]:
         return {
             'volume_threshold': self.config.get('volume_threshold', 1.5),
@@ -317,6 +452,7 @@ class StrategyEngine:
         self.database = database
         self.strategies = {}
         self.active_strategies = []
+        self.active_version = 0  # bumped whenever active_strategies changes
         self.indicators_calculator = TechnicalIndicators()
         
     def register_strategy(self, strategy: BaseStrategy):
@@ -329,6 +465,7 @@ class StrategyEngine:
         if strategy_name in self.strategies:
             if strategy_name not in self.active_strategies:
                 self.active_strategies.append(strategy_name)
+                self.active_version += 1
                 print(f"Strategy '{strategy_name}' activated")
         else:
             print(f"Strategy '{strategy_name}' not found")
@@ -337,23 +474,33 @@ class StrategyEngine:
         """Deactivate a strategy"""
         if strategy_name in self.active_strategies:
             self.active_strategies.remove(strategy_name)
+            self.active_version += 1
             print(f"Strategy '{strategy_name}' deactivated")
     
-    def analyze_market(self, symbol: str, df: pd.DataFrame, config: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Analyze market data and generate signals from all active strategies"""
+    def analyze_market(self, symbol: str, df: pd.DataFrame, config: Dict[str, Any],
+                       indicators: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Analyze market data and generate signals from all active strategies.
+        Pass indicators when the caller already ran calculate_all_indicators on df.
+        """
         
         if df is None or len(df) < 50:
             return []
         
-        # Calculate technical indicators
-        indicators = self.indicators_calculator.calculate_all_indicators(df, config)
+        # Calculate technical indicators once, shared by every strategy
+        if indicators is None:
+            indicators = self.indicators_calculator.calculate_all_indicators(df, config)
+        
+        # One clock read stamps the indicator snapshot and every signal of this pass
+        now = datetime.utcnow()
         
         # Store indicators in database
         self.database.insert_indicators(
             symbol=symbol,
             timeframe=config.get('timeframe', '1h'),
-            timestamp=datetime.utcnow(),
-            indicators_data=indicators
+            timestamp=now,
+            indicators_data=indicators,
+            now=now
         )
         
         signals = []
@@ -369,7 +516,7 @@ class StrategyEngine:
                     signal_data['symbol'] = symbol
                     
                     # Store signal in database
-                    self.database.insert_signal(symbol, strategy_name, signal_data)
+                    self.database.insert_signal(symbol, strategy_name, signal_data, now=now)
                     
                     signals.append(signal_data)
                     
@@ -433,32 +580,34 @@ class StrategyEngine:
         position = 0
         trades = []
         
-        for i in range(50, len(df)):
-            window_df = df.iloc[:i+1]
-            indicators = self.indicators_calculator.calculate_all_indicators(window_df, config)
-            signal_data = strategy.generate_signal(window_df, indicators)
-            
-            if signal_data['signal'] == 'BUY' and position <= 0:
-                position = balance / df['close'].iloc[i]
+        # One causal indicator pass and array views instead of re-slicing the frame every bar
+        indicator_frame = self.indicators_calculator.calculate_indicator_frame(df, config)
+        indicator_columns = {name: indicator_frame[name].to_numpy() for name in indicator_frame.columns}
+        side, _ = strategy.generate_signal_arrays(df, indicator_columns, 50)
+        close = df['close'].to_numpy()
+        
+        for i in np.flatnonzero(side):
+            if side[i] == 1 and position <= 0:
+                position = balance / close[i]
                 balance = 0
                 trades.append({
                     'type': 'BUY',
-                    'price': df['close'].iloc[i],
-                    'timestamp': i,
+                    'price': close[i],
+                    'timestamp': int(i),
                     'position': position
                 })
-            elif signal_data['signal'] == 'SELL' and position > 0:
-                balance = position * df['close'].iloc[i]
+            elif side[i] == -1 and position > 0:
+                balance = position * close[i]
                 position = 0
                 trades.append({
                     'type': 'SELL',
-                    'price': df['close'].iloc[i],
-                    'timestamp': i,
+                    'price': close[i],
+                    'timestamp': int(i),
                     'balance': balance
                 })
         
         # Calculate final performance
-        final_value = balance + (position * df['close'].iloc[-1] if position > 0 else 0)
+        final_value = balance + (position * close[-1] if position > 0 else 0)
         return_pct = ((final_value - config.get('initial_balance', 1000.0)) / config.get('initial_balance', 1000.0)) * 100
         
         return {
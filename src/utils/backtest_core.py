@@ -0,0 +1,210 @@
+"""
+Compiled position walk for the backtesting engine.
+Signals are generated up front; this kernel only replays entries, stops and targets bar by bar.
+"""
+
+import numpy as np
+from utils._njit import njit, prange
+
+# Exit reason codes stored in the trade records
+EXIT_STOP_LOSS = 1
+EXIT_TAKE_PROFIT = 2
+EXIT_END_OF_DATA = 3
+EXIT_RUIN = 4
+
+EXIT_REASONS = {
+    EXIT_STOP_LOSS: 'STOP_LOSS',
+    EXIT_TAKE_PROFIT: 'TAKE_PROFIT',
+    EXIT_END_OF_DATA: 'END_OF_DATA',
+    EXIT_RUIN: 'RUIN',
+}
+
+@njit(cache=True)
+def _exit_fill(side, entry_price, quantity, price, commission, slippage):
+    """Fill price, net P&L, P&L % and cash returned when closing a position"""
+    # side is +1/-1, so one expression covers longs and shorts
+    fill = price * (1 - side * slippage)
+    pnl = side * (fill - entry_price) * quantity
+
+    commission_cost = (quantity * fill) * commission
+    pnl -= commission_cost
+    pnl_pct = pnl / (entry_price * quantity) * 100
+    return fill, pnl, pnl_pct, (quantity * fill) - commission_cost
+
+@njit(cache=True)
+def _fill_flat(equity, drawdown, first, value, peak):
+    """Hold equity at value from index first onwards"""
+    for j in range(first, equity.shape[0]):
+        equity[j] = value
+        drawdown[j] = (peak - value) / peak
+
+@njit(cache=True)
+def simulate_positions(close, side, confidence, atr, start,
+                       initial_capital, max_position_size, commission, slippage,
+                       atr_multiplier, reward_risk_ratio, ruin_equity=0.0):
+    """
+    Replay signals over close prices from bar `start`.
+    side holds +1 (BUY), -1 (SELL) or 0 per bar; atr may be NaN (falls back to 2% of price).
+    If the account value (cash plus the cost and P&L of open positions) drops below
+    ruin_equity (0 disables), everything is closed at that bar with EXIT_RUIN and
+    equity stays flat for the remaining bars.
+    Returns (equity, drawdown, positions, trades, n_trades):
+      positions rows: side, entry_bar, entry_price, quantity, stop_loss, take_profit, cost
+      trades rows (in closing order): position, exit_bar, exit_price, pnl, pnl_pct, exit_reason
+    """
+    n = close.shape[0]
+    capacity = max(n - start, 0)
+
+    positions = np.zeros((capacity, 7))
+    trades = np.zeros((capacity, 6))
+    open_slots = np.zeros(capacity, np.int64)
+    n_open = 0
+    n_positions = 0
+    n_trades = 0
+
+    equity = np.empty(capacity + 1)
+    drawdown = np.empty(capacity + 1)
+    equity[0] = initial_capital
+    drawdown[0] = 0.0
+    capital = initial_capital
+    peak = initial_capital
+    committed = 0.0  # cash tied up in open positions
+
+    # Once past the last signal with nothing open, equity can only stay flat
+    last_signal = start - 1
+    for i in range(n - 1, start - 1, -1):
+        if side[i] != 0:
+            last_signal = i
+            break
+
+    final_bar = n - 1
+    final_reason = EXIT_END_OF_DATA
+    for i in range(start, n):
+        if n_open == 0 and i > last_signal:
+            _fill_flat(equity, drawdown, i - start + 1, capital, peak)
+            break
+
+        price = close[i]
+
+        # Stops and targets, newest position first. Signing the distances by the
+        # position direction turns both the long and short checks into one branchless test.
+        k = n_open - 1
+        while k >= 0:
+            slot = open_slots[k]
+            direction = positions[slot, 0]
+            stop_hit = direction * (price - positions[slot, 4]) <= 0.0
+            target_hit = direction * (price - positions[slot, 5]) >= 0.0
+            reason = stop_hit * EXIT_STOP_LOSS + (1 - stop_hit) * target_hit * EXIT_TAKE_PROFIT
+
+            if reason != 0:
+                fill, pnl, pnl_pct, proceeds = _exit_fill(positions[slot, 0], positions[slot, 2], positions[slot, 3],
+                                                          price, commission, slippage)
+                capital += proceeds
+                committed -= positions[slot, 6]
+                trades[n_trades, 0] = slot
+                trades[n_trades, 1] = i
+                trades[n_trades, 2] = fill
+                trades[n_trades, 3] = pnl
+                trades[n_trades, 4] = pnl_pct
+                trades[n_trades, 5] = reason
+                n_trades += 1
+                for j in range(k, n_open - 1):
+                    open_slots[j] = open_slots[j + 1]
+                n_open -= 1
+            k -= 1
+
+        # New entry, sized by confidence
+        if side[i] != 0:
+            position_value = capital * max_position_size * confidence[i]
+            if position_value >= 100:
+                quantity = position_value / price
+                entry_price = price * (1 + side[i] * slippage)
+                total_cost = position_value + position_value * commission
+
+                if total_cost <= capital:
+                    bar_atr = atr[i]
+                    if bar_atr != bar_atr:
+                        bar_atr = price * 0.02
+                    stop_loss = price - side[i] * (bar_atr * atr_multiplier)
+                    take_profit = price + side[i] * (bar_atr * atr_multiplier * reward_risk_ratio)
+
+                    positions[n_positions, 0] = side[i]
+                    positions[n_positions, 1] = i
+                    positions[n_positions, 2] = entry_price
+                    positions[n_positions, 3] = quantity
+                    positions[n_positions, 4] = stop_loss
+                    positions[n_positions, 5] = take_profit
+                    positions[n_positions, 6] = total_cost
+                    open_slots[n_open] = n_positions
+                    n_open += 1
+                    n_positions += 1
+                    capital -= total_cost
+                    committed += total_cost
+
+        # Mark to market
+        unrealized_pnl = 0.0
+        for k in range(n_open):
+            slot = open_slots[k]
+            unrealized_pnl += positions[slot, 0] * (price - positions[slot, 2]) * positions[slot, 3]
+
+        current_equity = capital + unrealized_pnl
+        if current_equity > peak:
+            peak = current_equity
+        equity[i - start + 1] = current_equity
+        drawdown[i - start + 1] = (peak - current_equity) / peak
+
+        # A ruined run cannot recover into a useful result; stop walking bars
+        if current_equity + committed < ruin_equity:
+            final_bar = i
+            final_reason = EXIT_RUIN
+            break
+
+    # Close whatever is still open, oldest first
+    if n > 0:
+        for k in range(n_open):
+            slot = open_slots[k]
+            fill, pnl, pnl_pct, proceeds = _exit_fill(positions[slot, 0], positions[slot, 2], positions[slot, 3],
+                                                      close[final_bar], commission, slippage)
+            capital += proceeds
+            trades[n_trades, 0] = slot
+            trades[n_trades, 1] = final_bar
+            trades[n_trades, 2] = fill
+            trades[n_trades, 3] = pnl
+            trades[n_trades, 4] = pnl_pct
+            trades[n_trades, 5] = final_reason
+            n_trades += 1
+
+    if final_reason == EXIT_RUIN:
+        _fill_flat(equity, drawdown, final_bar - start + 2, capital, peak)
+
+    return equity, drawdown, positions, trades, n_trades
+
+@njit(parallel=True, cache=True)
+def simulate_batch(close, sides, confidences, atr, start,
+                   initial_capital, max_position_size, commission, slippage,
+                   atr_multiplier, reward_risk_ratio, ruin_equity=0.0):
+    """
+    simulate_positions for several signal sets over the same prices, run in parallel.
+    Row k of sides/confidences is one run; outputs gain a leading run axis and
+    n_trades becomes an array.
+    """
+    n_runs = sides.shape[0]
+    capacity = max(close.shape[0] - start, 0)
+
+    equity = np.empty((n_runs, capacity + 1))
+    drawdown = np.empty((n_runs, capacity + 1))
+    positions = np.empty((n_runs, capacity, 7))
+    trades = np.empty((n_runs, capacity, 6))
+    n_trades = np.empty(n_runs, np.int64)
+
+    for k in prange(n_runs):
+        run = simulate_positions(close, sides[k], confidences[k], atr, start,
+                                 initial_capital, max_position_size, commission, slippage,
+                                 atr_multiplier, reward_risk_ratio, ruin_equity)
+        equity[k] = run[0]
+        drawdown[k] = run[1]
+        positions[k] = run[2]
+        trades[k] = run[3]
+        n_trades[k] = run[4]
+
+    return equity, drawdown, positions, trades, n_trades
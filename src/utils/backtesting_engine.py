@@ -1,17 +1,44 @@
+import atexit
+import functools
+import hashlib
+import inspect
+import os
+import multiprocessing
+import pickle
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 import pandas as pd
 import numpy as np
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass
-import matplotlib.pyplot as plt
-import seaborn as sns
-from indicators.technical_indicators_simple import TechnicalIndicators
+from indicators import _kernels
+from indicators.technical_indicators_simple import TechnicalIndicators, MIN_INDICATOR_BARS, INDICATOR_CONFIG_KEYS
 from strategies.strategy_engine import BaseStrategy, StrategyEngine
 from core.risk_management import RiskManager
 from core.database_schema import TradingDatabase
+from core.market_data import OHLCV_COLUMNS
+from utils import backtest_core
+from utils.backtest_core import simulate_positions, simulate_batch, EXIT_REASONS
 import warnings
 warnings.filterwarnings('ignore')
 
+# On-disk indicator cache so repeated backtests of the same data skip the indicator pass
+INDICATOR_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                                   '.cache', 'indicators')
+
+# On-disk backtest results; only runs slower than RESULT_CACHE_MIN_SECONDS are stored, so the
+# vectorized strategies (milliseconds per run) never touch the disk
+RESULT_CACHE_DIR = os.path.join(os.path.dirname(INDICATOR_CACHE_DIR), 'backtests')
+RESULT_CACHE_MIN_SECONDS = 1.0
+# Oldest-used files beyond this many are deleted after each write
+RESULT_CACHE_MAX_FILES = 256
+# The key already hashes the source of the strategy, the indicators, backtest_core and
+# AdvancedBacktester; bump this to drop every cached result after other behavior changes
+RESULT_CACHE_VERSION = 1
+
 @dataclass
 class BacktestTrade:
     """Represents a single trade in backtesting"""
@@ -28,7 +55,7 @@ class BacktestTrade:
     pnl_pct: Optional[float]
     strategy: str
     status: str  # 'OPEN', 'CLOSED', 'STOPPED'
-    exit_reason: str  # 'TAKE_PROFIT', 'STOP_LOSS', 'SIGNAL', 'END_OF_DATA'
+    exit_reason: str  # 'TAKE_PROFIT', 'STOP_LOSS', 'SIGNAL', 'END_OF_DATA', 'RUIN'
 
 @dataclass
 class BacktestMetrics:
@@ -60,14 +87,22 @@ class BacktestMetrics:
 class AdvancedBacktester:
     """Advanced backtesting engine with comprehensive analytics"""
     
-    def __init__(self, initial_capital: float = 10000.0):
+    def __init__(self, initial_capital: float = 10000.0, cache_dir: Optional[str] = INDICATOR_CACHE_DIR,
+                 verbose: bool = True, result_cache_dir: Optional[str] = RESULT_CACHE_DIR):
         self.initial_capital = initial_capital
+        self.verbose = verbose  # per-run progress lines; off when the caller reports results itself
         self.indicators_calculator = TechnicalIndicators()
         
         # Backtesting parameters
         self.commission = 0.001  # 0.1% per trade
         self.slippage = 0.0005   # 0.05% slippage
         
+        # Indicator columns per (dataset, indicator params), shared by every strategy run on that data
+        self._indicator_cache: Dict[Tuple, Dict[str, np.ndarray]] = {}
+        self._indicator_cache_size = 8
+        self.cache_dir = cache_dir  # None keeps the cache in memory only
+        self.result_cache_dir = result_cache_dir  # None disables the results cache
+        
         # Results storage
         self.trades: List[BacktestTrade] = []
         self.equity_curve = []
@@ -82,7 +117,8 @@ class AdvancedBacktester:
                     end_date: Optional[datetime] = None) -> Dict[str, Any]:
         """Run comprehensive backtest on historical data"""
         
-        print(f"Starting backtest for strategy: {strategy.name}")
+        if self.verbose:
+            print(f"Starting backtest for strategy: {strategy.name}")
         
         # Filter data by date range if specified
         if start_date or end_date:
@@ -91,21 +127,84 @@ class AdvancedBacktester:
         if len(data) < 100:
             raise ValueError("Insufficient data for backtesting (minimum 100 data points required)")
         
+        # A slow strategy re-run on the same data and settings comes back from disk
+        cache_path = self._result_cache_path(strategy, data, config)
+        results = self._load_results(cache_path)
+        if results is not None:
+            if self.verbose:
+                print(f"Backtest loaded from cache: {len(results['trades'])} trades, "
+                      f"{results['metrics'].total_return_pct:.2f}% return")
+            return results
+        
+        started = time.perf_counter()
+        
         # Initialize backtest state
         self._initialize_backtest(data)
         
         # Run simulation
         self._run_simulation(strategy, data, config)
         
-        # Calculate metrics
+        results = self._build_results(strategy, data)
+        if time.perf_counter() - started >= RESULT_CACHE_MIN_SECONDS:
+            self._save_results(cache_path, results)
+        return results
+    
+    def run_backtests(self, strategies: List[BaseStrategy], data: pd.DataFrame,
+                      config: Dict[str, Any]) -> List[Tuple[str, Optional[Dict[str, Any]], Optional[str]]]:
+        """
+        Backtest several strategies on the same data, returning (name, results, error) in input order.
+        Indicators are computed once and all position walks run as one parallel batch.
+        """
+        if len(data) < 100:
+            error = "Insufficient data for backtesting (minimum 100 data points required)"
+            return [(strategy.name, None, error) for strategy in strategies]
+        
+        lookback_period = config.get('min_lookback_period', 50)
+        market = self._market_arrays(data)
+        indicator_columns = self._get_indicator_columns(data, market, config)
+        bar_times = self._bar_times(data)
+        
+        outcomes = {}
+        batch = []
+        for index, strategy in enumerate(strategies):
+            if self.verbose:
+                print(f"Starting backtest for strategy: {strategy.name}")
+            try:
+                side, confidence = strategy.generate_signal_arrays(data, indicator_columns, lookback_period)
+                batch.append((index, strategy, side, confidence))
+            except Exception as e:
+                outcomes[index] = (strategy.name, None, str(e))
+        
+        if batch:
+            equity, drawdown, positions, trades, n_trades = simulate_batch(
+                market['close'],
+                np.stack([side for _, _, side, _ in batch]),
+                np.stack([confidence for _, _, _, confidence in batch]),
+                self._stop_atr(indicator_columns), lookback_period,
+                *self._simulation_params(config)
+            )
+            
+            for row, (index, strategy, _, _) in enumerate(batch):
+                self._initialize_backtest(data)
+                self._store_simulation(strategy, bar_times, config, equity[row], drawdown[row],
+                                       positions[row], trades[row], n_trades[row])
+                try:
+                    outcomes[index] = (strategy.name, self._build_results(strategy, data), None)
+                except Exception as e:
+                    outcomes[index] = (strategy.name, None, str(e))
+        
+        return [outcomes[index] for index in range(len(strategies))]
+    
+    def _build_results(self, strategy: BaseStrategy, data: pd.DataFrame) -> Dict[str, Any]:
+        """Metrics and report for the simulation currently held in the backtester"""
         metrics = self._calculate_metrics(data)
         
         # Generate reports
         results = {
             'strategy_name': strategy.name,
             'backtest_period': {
-                'start': data.index[0] if hasattr(data.index[0], 'strftime') else data.iloc[0]['timestamp'],
-                'end': data.index[-1] if hasattr(data.index[-1], 'strftime') else data.iloc[-1]['timestamp'],
+                'start': data.index[0] if hasattr(data.index[0], 'strftime') else data['timestamp'].iat[0],
+                'end': data.index[-1] if hasattr(data.index[-1], 'strftime') else data['timestamp'].iat[-1],
                 'total_days': len(data)
             },
             'initial_capital': self.initial_capital,
@@ -117,7 +216,8 @@ class AdvancedBacktester:
             'daily_returns': self.daily_returns
         }
         
-        print(f"Backtest completed: {len(self.trades)} trades, {metrics.total_return_pct:.2f}% return")
+        if self.verbose:
+            print(f"Backtest completed: {len(self.trades)} trades, {metrics.total_return_pct:.2f}% return")
         
         return results
     
@@ -127,207 +227,207 @@ class AdvancedBacktester:
         self.equity_curve = [self.initial_capital]
         self.drawdown_curve = [0.0]
         self.daily_returns = []
-        self.current_capital = self.initial_capital
-        self.peak_capital = self.initial_capital
-        self.open_positions = []
         
     def _run_simulation(self, strategy: BaseStrategy, data: pd.DataFrame, config: Dict[str, Any]):
         """Run the main simulation loop"""
         
         lookback_period = config.get('min_lookback_period', 50)
-        
-        for i in range(lookback_period, len(data)):
-            current_time = data.index[i] if hasattr(data.index[i], 'strftime') else data.iloc[i]['timestamp']
-            current_data = data.iloc[:i+1]
-            current_price = float(data.iloc[i]['close'])
-            
-            # Calculate indicators for current window
-            indicators = self.indicators_calculator.calculate_all_indicators(current_data, config)
-            
-            # Update open positions
-            self._update_open_positions(current_time, current_price, data.iloc[i])
-            
-            # Generate new signals
-            if len(current_data) >= lookback_period:
-                signal_data = strategy.generate_signal(current_data, indicators)
-                
-                if signal_data['signal'] in ['BUY', 'SELL']:
-                    self._process_signal(signal_data, current_time, current_price, indicators, config)
-            
-            # Update equity curve
-            unrealized_pnl = self._calculate_unrealized_pnl(current_price)
-            current_equity = self.current_capital + unrealized_pnl
-            self.equity_curve.append(current_equity)
-            
-            # Update drawdown
-            if current_equity > self.peak_capital:
-                self.peak_capital = current_equity
-            drawdown = (self.peak_capital - current_equity) / self.peak_capital
-            self.drawdown_curve.append(drawdown)
-            
-            # Calculate daily returns
-            if len(self.equity_curve) > 1:
-                daily_return = (self.equity_curve[-1] - self.equity_curve[-2]) / self.equity_curve[-2]
-                self.daily_returns.append(daily_return)
-        
-        # Close any remaining open positions
-        self._close_all_positions(data.iloc[-1]['timestamp'], float(data.iloc[-1]['close']), 'END_OF_DATA')
-    
-    def _process_signal(self, 
-                       signal_data: Dict[str, Any], 
-                       current_time: datetime, 
-                       current_price: float,
-                       indicators: Dict[str, Any],
-                       config: Dict[str, Any]):
-        """Process a trading signal"""
-        
-        signal = signal_data['signal']
-        confidence = signal_data.get('confidence', 0)
-        
-        # Simple position sizing (can be enhanced)
-        max_position_size = config.get('max_position_size', 0.1)
-        position_value = self.current_capital * max_position_size
-        
-        # Apply confidence-based sizing
-        position_value *= confidence
-        
-        if position_value < 100:  # Minimum position size
+
+        # Struct-of-arrays view of the prices; the hot path never touches the DataFrame again
+        market = self._market_arrays(data)
+        indicator_columns = self._get_indicator_columns(data, market, config)
+        bar_times = self._bar_times(data)
+
+        # Strategies with vectorized rules skip the per-bar generate_signal replay
+        side, confidence = strategy.generate_signal_arrays(data, indicator_columns, lookback_period)
+
+        # Sequential position walk (compiled when numba is available)
+        equity, drawdown, positions, trades, n_trades = simulate_positions(
+            market['close'], side, confidence, self._stop_atr(indicator_columns), lookback_period,
+            *self._simulation_params(config)
+        )
+        self._store_simulation(strategy, bar_times, config, equity, drawdown, positions, trades, n_trades)
+
+    def _stop_atr(self, indicator_columns: Dict[str, np.ndarray]) -> np.ndarray:
+        """ATR used to place stops; NaN before the indicators are available (kernel falls back to 2%)"""
+        atr = indicator_columns['atr'].copy()
+        atr[:MIN_INDICATOR_BARS - 1] = np.nan
+        return atr
+
+    def _simulation_params(self, config: Dict[str, Any]) -> Tuple[float, ...]:
+        """Scalar arguments shared by simulate_positions and simulate_batch"""
+        return (
+            float(self.initial_capital),
+            float(config.get('max_position_size', 0.1)),
+            self.commission,
+            self.slippage,
+            float(config.get('atr_multiplier', 2.0)),
+            float(config.get('reward_risk_ratio', 2.0)),
+            float(config.get('ruin_threshold', 0.2)) * self.initial_capital
+        )
+
+    def _store_simulation(self, strategy: BaseStrategy, bar_times: pd.Index, config: Dict[str, Any],
+                          equity: np.ndarray, drawdown: np.ndarray, positions: np.ndarray,
+                          trades: np.ndarray, n_trades: int):
+        """Keep a kernel run as the backtester's curves and trade list"""
+        self.equity_curve = equity.tolist()
+        self.drawdown_curve = drawdown.tolist()
+        self.daily_returns = (np.diff(equity) / equity[:-1]).tolist()
+        self.trades = [self._build_trade(positions[int(trade[0])], trade, bar_times, strategy.name, config)
+                       for trade in trades[:n_trades]]
+
+    def _market_arrays(self, data: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Contiguous float64 OHLCV columns keyed by name"""
+        return {column: np.ascontiguousarray(data[column].to_numpy(dtype=np.float64))
+                for column in OHLCV_COLUMNS if column in data.columns}
+
+    def precompute_indicators(self, data: pd.DataFrame, config: Dict[str, Any]):
+        """Compute (or load) the indicator columns for data ahead of the backtests that will share them"""
+        self._get_indicator_columns(data, self._market_arrays(data), config)
+
+    def _get_indicator_columns(self, data: pd.DataFrame, market: Dict[str, np.ndarray],
+                               config: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        """Indicator frame columns for this data, computed once per dataset and indicator params"""
+        key = self._indicator_cache_key(market, config)
+        columns = self._indicator_cache.get(key)
+        if columns is not None:
+            return columns
+
+        cache_path = self._indicator_cache_path(key)
+        columns = self._load_indicator_columns(cache_path)
+        if columns is None:
+            # Indicators are causal, so a single pass over the full series yields every bar's values
+            indicator_frame = self.indicators_calculator.calculate_indicator_frame(data, config)
+            columns = {name: indicator_frame[name].to_numpy() for name in indicator_frame.columns}
+            self._save_indicator_columns(cache_path, columns)
+
+        for values in columns.values():
+            values.setflags(write=False)  # shared between runs, never mutated
+
+        if len(self._indicator_cache) >= self._indicator_cache_size:
+            self._indicator_cache.pop(next(iter(self._indicator_cache)))
+        self._indicator_cache[key] = columns
+        return columns
+
+    def _indicator_cache_path(self, key: Tuple) -> Optional[str]:
+        """File holding the indicator columns for a cache key, or None when disk caching is off"""
+        if not self.cache_dir:
+            return None
+        name = hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+        return os.path.join(self.cache_dir, f"{name}.npz")
+
+    def _load_indicator_columns(self, path: Optional[str]) -> Optional[Dict[str, np.ndarray]]:
+        """Read cached indicator columns; an unreadable file counts as a miss"""
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as cached:
+                return {name: cached[name] for name in cached.files}
+        except (OSError, ValueError):
+            return None
+
+    def _save_indicator_columns(self, path: Optional[str], columns: Dict[str, np.ndarray]):
+        """Write indicator columns atomically so parallel workers never read a partial file"""
+        if not path:
             return
-        
-        # Calculate position size
-        quantity = position_value / current_price
-        
-        # Apply commission and slippage
-        effective_price = current_price * (1 + self.slippage) if signal == 'BUY' else current_price * (1 - self.slippage)
-        commission_cost = position_value * self.commission
-        
-        # Check if we have enough capital
-        total_cost = position_value + commission_cost
-        if total_cost > self.current_capital:
-            return  # Insufficient capital
-        
-        # Calculate stop loss and take profit
-        atr = indicators.get('atr', current_price * 0.02)  # Default to 2% if no ATR
-        
-        if signal == 'BUY':
-            stop_loss = current_price - (atr * config.get('atr_multiplier', 2.0))
-            take_profit = current_price + (atr * config.get('atr_multiplier', 2.0) * config.get('reward_risk_ratio', 2.0))
-        else:  # SELL
-            stop_loss = current_price + (atr * config.get('atr_multiplier', 2.0))
-            take_profit = current_price - (atr * config.get('atr_multiplier', 2.0) * config.get('reward_risk_ratio', 2.0))
-        
-        # Create trade
-        trade = BacktestTrade(
-            entry_time=current_time,
-            exit_time=None,
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, 'wb') as f:
+                np.savez(f, **columns)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"⚠️ Could not write indicator cache: {e}")
+
+    def _indicator_cache_key(self, market: Dict[str, np.ndarray], config: Dict[str, Any]) -> Tuple:
+        """Fingerprint of the OHLCV values plus the config keys the indicators read"""
+        digest = hashlib.blake2b(digest_size=16)
+        for column in ('high', 'low', 'close', 'volume'):
+            if column in market:
+                digest.update(market[column].tobytes())
+        return (digest.hexdigest(), len(market['close'])) + tuple(config.get(key) for key in INDICATOR_CONFIG_KEYS)
+
+    def _result_cache_path(self, strategy: BaseStrategy, data: pd.DataFrame, config: Dict[str, Any]) -> Optional[str]:
+        """File for a backtest of strategy on data under config, or None when the results cache is off"""
+        if not self.result_cache_dir:
+            return None
+        digest = hashlib.blake2b(digest_size=16)
+        for values in self._market_arrays(data).values():
+            digest.update(values.tobytes())
+        digest.update(np.asarray(self._bar_times(data), dtype='datetime64[ns]').tobytes())
+        digest.update(repr((type(strategy).__qualname__, strategy.name, sorted(strategy.config.items()),
+                            sorted(config.items()), self.initial_capital, self.commission,
+                            self.slippage)).encode())
+        # Code changes must not return results computed by the old code
+        digest.update(_code_digest(type(strategy)).encode())
+        return os.path.join(self.result_cache_dir, f"{digest.hexdigest()}.pkl")
+
+    def _load_results(self, path: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Cached results; an unreadable file counts as a miss"""
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                results = pickle.load(f)
+            os.utime(path)  # mark as recently used for _prune_results
+            return results
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            return None
+
+    def _save_results(self, path: Optional[str], results: Dict[str, Any]):
+        """Write results atomically so parallel workers never read a partial file"""
+        if not path:
+            return
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, 'wb') as f:
+                pickle.dump(results, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, path)
+            self._prune_results()
+        except OSError as e:
+            print(f"⚠️ Could not write backtest cache: {e}")
+
+    def _prune_results(self):
+        """Delete the least recently used result files beyond RESULT_CACHE_MAX_FILES"""
+        entries = []
+        for entry in os.scandir(self.result_cache_dir):
+            if entry.name.endswith('.pkl'):
+                try:
+                    entries.append((entry.stat().st_mtime, entry.path))
+                except OSError:
+                    pass  # removed by another worker
+        for _, path in sorted(entries)[:max(len(entries) - RESULT_CACHE_MAX_FILES, 0)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _build_trade(self, position: np.ndarray, trade: np.ndarray, bar_times: pd.Index,
+                     strategy_name: str, config: Dict[str, Any]) -> BacktestTrade:
+        """Turn a simulate_positions record into a BacktestTrade"""
+        return BacktestTrade(
+            entry_time=bar_times[int(position[1])],
+            exit_time=bar_times[int(trade[1])],
             symbol=config.get('symbol', 'UNKNOWN'),
-            side=signal,
-            entry_price=effective_price,
-            exit_price=None,
-            quantity=quantity,
-            stop_loss=stop_loss,
-            take_profit=take_profit,
-            pnl=None,
-            pnl_pct=None,
-            strategy=signal_data.get('strategy', 'Unknown'),
-            status='OPEN',
-            exit_reason=''
+            side='BUY' if position[0] == 1 else 'SELL',
+            entry_price=float(position[2]),
+            exit_price=float(trade[2]),
+            quantity=float(position[3]),
+            stop_loss=float(position[4]),
+            take_profit=float(position[5]),
+            pnl=float(trade[3]),
+            pnl_pct=float(trade[4]),
+            strategy=strategy_name,
+            status='CLOSED',
+            exit_reason=EXIT_REASONS[int(trade[5])]
         )
-        
-        # Update capital
-        self.current_capital -= total_cost
-        
-        # Add to open positions
-        self.open_positions.append(trade)
-        
-    def _update_open_positions(self, current_time: datetime, current_price: float, current_bar: pd.Series):
-        """Update all open positions and close if necessary"""
-        
-        positions_to_close = []
-        
-        for i, position in enumerate(self.open_positions):
-            # Check stop loss and take profit
-            should_close = False
-            exit_reason = ''
-            
-            if position.side == 'BUY':
-                if current_price <= position.stop_loss:
-                    should_close = True
-                    exit_reason = 'STOP_LOSS'
-                elif current_price >= position.take_profit:
-                    should_close = True
-                    exit_reason = 'TAKE_PROFIT'
-            else:  # SELL
-                if current_price >= position.stop_loss:
-                    should_close = True
-                    exit_reason = 'STOP_LOSS'
-                elif current_price <= position.take_profit:
-                    should_close = True
-                    exit_reason = 'TAKE_PROFIT'
-            
-            if should_close:
-                positions_to_close.append((i, exit_reason))
-        
-        # Close positions (reverse order to maintain indices)
-        for i, exit_reason in reversed(positions_to_close):
-            self._close_position(i, current_time, current_price, exit_reason)
-    
-    def _close_position(self, position_index: int, exit_time: datetime, exit_price: float, exit_reason: str):
-        """Close a specific position"""
-        
-        position = self.open_positions[position_index]
-        
-        # Apply slippage
-        effective_exit_price = exit_price * (1 - self.slippage) if position.side == 'BUY' else exit_price * (1 + self.slippage)
-        
-        # Calculate P&L
-        if position.side == 'BUY':
-            pnl = (effective_exit_price - position.entry_price) * position.quantity
-        else:  # SELL
-            pnl = (position.entry_price - effective_exit_price) * position.quantity
-        
-        # Apply commission
-        commission_cost = (position.quantity * effective_exit_price) * self.commission
-        pnl -= commission_cost
-        
-        # Calculate percentage P&L
-        pnl_pct = pnl / (position.entry_price * position.quantity) * 100
-        
-        # Update position
-        position.exit_time = exit_time
-        position.exit_price = effective_exit_price
-        position.pnl = pnl
-        position.pnl_pct = pnl_pct
-        position.status = 'CLOSED'
-        position.exit_reason = exit_reason
-        
-        # Update capital
-        self.current_capital += (position.quantity * effective_exit_price) - commission_cost
-        
-        # Move to completed trades
-        self.trades.append(position)
-        
-        # Remove from open positions
-        del self.open_positions[position_index]
-    
-    def _close_all_positions(self, exit_time: datetime, exit_price: float, exit_reason: str):
-        """Close all remaining open positions"""
-        while self.open_positions:
-            self._close_position(0, exit_time, exit_price, exit_reason)
-    
-    def _calculate_unrealized_pnl(self, current_price: float) -> float:
-        """Calculate unrealized P&L for open positions"""
-        unrealized_pnl = 0.0
-        
-        for position in self.open_positions:
-            if position.side == 'BUY':
-                pnl = (current_price - position.entry_price) * position.quantity
-            else:  # SELL
-                pnl = (position.entry_price - current_price) * position.quantity
-            
-            unrealized_pnl += pnl
-        
-        return unrealized_pnl
+
+    def _bar_times(self, data: pd.DataFrame) -> pd.Index:
+        """Bar timestamps, whether they live in the index or a timestamp column"""
+        if len(data) and hasattr(data.index[0], 'strftime'):
+            return data.index
+        return pd.Index(data['timestamp'])
     
     def _calculate_metrics(self, data: pd.DataFrame) -> BacktestMetrics:
         """Calculate comprehensive backtest metrics"""
@@ -537,6 +637,10 @@ Average Trade Duration: {metrics.avg_trade_duration:.1f} hours
     
     def plot_results(self, results: Dict[str, Any], save_path: Optional[str] = None):
         """Generate comprehensive backtest plots"""
+        # Plotting libraries are only loaded when a report is actually drawn, not by the
+        # bots or by every backtest worker process
+        import matplotlib.pyplot as plt
+        import seaborn as sns
         
         fig, axes = plt.subplots(3, 2, figsize=(15, 12))
         fig.suptitle(f"Backtest Results: {results['strategy_name']}", fontsize=16)
@@ -597,6 +701,98 @@ Average Trade Duration: {metrics.avg_trade_duration:.1f} hours
         
         plt.show()
 
+@functools.lru_cache(maxsize=None)
+def _code_digest(strategy_class: type) -> str:
+    """Hash of the code a cached backtest result depends on, for one strategy class"""
+    digest = hashlib.blake2b(str(RESULT_CACHE_VERSION).encode(), digest_size=16)
+    sources = [klass for klass in strategy_class.__mro__ if klass.__module__ not in ('builtins', 'abc')]
+    # Whole modules for the indicator side: calculate_indicator_frame leans on module-level
+    # helpers and constants next to TechnicalIndicators, and on the numba kernels
+    sources += [inspect.getmodule(TechnicalIndicators), _kernels, AdvancedBacktester, backtest_core]
+    for source in sources:
+        try:
+            digest.update(inspect.getsource(source).encode())
+        except (OSError, TypeError):
+            # No source on disk (e.g. a class defined in a REPL): fall back to its name
+            digest.update(getattr(source, '__qualname__', source.__name__).encode())
+    return digest.hexdigest()
+
+# Per-process backtester for run_backtests_parallel workers
+_worker_backtester: Optional[AdvancedBacktester] = None
+
+# Spawned workers are kept between runs, so each one imports pandas/numba and loads the
+# compiled kernels once per session rather than once per backtest
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+def _get_pool(max_workers: int) -> ProcessPoolExecutor:
+    """Shared worker pool with at least max_workers processes"""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers < max_workers:
+            if _pool is not None:
+                _pool.shutdown()
+            # spawn, not fork: numba's parallel thread pool in this process is not fork-safe
+            _pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn'))
+            _pool_workers = max_workers
+        return _pool
+
+def _shutdown_pool():
+    """Stop the shared worker pool (a later run starts a new one)"""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool, _pool_workers = None, 0
+
+atexit.register(_shutdown_pool)
+
+def _backtest_strategy(backtester: AdvancedBacktester, strategy: BaseStrategy,
+                       data: pd.DataFrame, config: Dict[str, Any]) -> Tuple[str, Optional[Dict[str, Any]], Optional[str]]:
+    """Backtest one strategy, returning (name, results, error)"""
+    try:
+        return strategy.name, backtester.run_backtest(strategy, data, config), None
+    except Exception as e:
+        return strategy.name, None, str(e)
+
+def _run_worker_backtest(strategy: BaseStrategy, data: pd.DataFrame, config: Dict[str, Any],
+                         initial_capital: float) -> Tuple[str, Optional[Dict[str, Any]], Optional[str]]:
+    """Pool task: backtest one strategy with the worker's backtester"""
+    global _worker_backtester
+    if _worker_backtester is None or _worker_backtester.initial_capital != initial_capital:
+        _worker_backtester = AdvancedBacktester(initial_capital=initial_capital, verbose=False)
+    return _backtest_strategy(_worker_backtester, strategy, data, config)
+
+def run_backtests_parallel(strategies: List[BaseStrategy],
+                           data: pd.DataFrame,
+                           config: Dict[str, Any],
+                           initial_capital: float = 10000.0,
+                           max_workers: Optional[int] = None) -> List[Tuple[str, Optional[Dict[str, Any]], Optional[str]]]:
+    """
+    Backtest independent strategies across processes; results come back in input order.
+    The backtesters run quietly: callers print the (name, results, error) tuples themselves.
+    """
+    if max_workers is None:
+        max_workers = min(len(strategies), os.cpu_count() or 1)
+    
+    if max_workers <= 1 or len(strategies) <= 1:
+        # In-process: one indicator pass and one compiled batch for every strategy
+        return AdvancedBacktester(initial_capital=initial_capital, verbose=False).run_backtests(strategies, data, config)
+    
+    if len(data) >= 100:
+        # One indicator pass here instead of one per worker: the workers load it from the disk cache
+        AdvancedBacktester(initial_capital=initial_capital, verbose=False).precompute_indicators(data, config)
+    
+    n = len(strategies)
+    try:
+        return list(_get_pool(max_workers).map(_run_worker_backtest, strategies,
+                                               [data] * n, [config] * n, [initial_capital] * n))
+    except BrokenProcessPool:
+        # A worker died; drop the pool so the next run starts fresh ones
+        _shutdown_pool()
+        raise
+
 if __name__ == "__main__":
     # Example usage
     import pandas as pd
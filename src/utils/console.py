@@ -0,0 +1,54 @@
+"""
+Buffered console output for the periodic reports.
+Inside buffered_output() a thread's print() calls are collected and written to stdout
+in one call when the block ends; other threads keep printing straight through.
+"""
+
+import sys
+import threading
+from contextlib import contextmanager
+
+_local = threading.local()
+_install_lock = threading.Lock()
+
+class _ThreadBufferedStdout:
+    """sys.stdout wrapper that diverts writes into the current thread's buffer, if it has one"""
+
+    def __init__(self, stream):
+        self._stream = stream
+
+    def write(self, text):
+        parts = getattr(_local, 'parts', None)
+        if parts is None:
+            return self._stream.write(text)
+        parts.append(text)
+        return len(text)
+
+    def flush(self):
+        if getattr(_local, 'parts', None) is None:
+            self._stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+def _install():
+    with _install_lock:
+        if not isinstance(sys.stdout, _ThreadBufferedStdout):
+            sys.stdout = _ThreadBufferedStdout(sys.stdout)
+
+@contextmanager
+def buffered_output():
+    """Collect this thread's printed output and emit it as a single write (nested blocks join the outer one)"""
+    _install()
+    if getattr(_local, 'parts', None) is not None:
+        yield
+        return
+
+    _local.parts = []
+    try:
+        yield
+    finally:
+        parts, _local.parts = _local.parts, None
+        if parts:
+            sys.stdout.write(''.join(parts))
+            sys.stdout.flush()
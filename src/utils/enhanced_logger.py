@@ -5,29 +5,52 @@ Provides comprehensive real-time trading information
 
 import time
 import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
+import numpy as np
 import pandas as pd
 from core.database_schema import TradingDatabase
-from indicators.technical_indicators_simple import TechnicalIndicators
+from indicators.technical_indicators_simple import TechnicalIndicators, RSI_ZONES
 from strategies.strategy_engine import StrategyEngine
 from core.risk_management import RiskManager
 from core.binance_client import BinanceClient
+from core.market_data import OHLCV_COLUMNS, TIMEFRAME_MAP, MarketDataCache
+from utils.console import buffered_output
 import config
 
+# Zone boundaries for the 30-second report (percent of price for volatility)
+VOLATILITY_ZONES = np.array([1.5, 3.0])
+REPORT_BB_POSITION_ZONES = np.array([0.3, 0.7])
+
 class EnhancedMarketLogger:
     """Enhanced logger with detailed 30-second market analysis"""
     
     def __init__(self, database: TradingDatabase, strategy_engine: StrategyEngine, 
-                 risk_manager: RiskManager, exchange: BinanceClient):
+                 risk_manager: RiskManager, exchange: BinanceClient,
+                 market_data_cache: Optional[MarketDataCache] = None,
+                 kline_source=None, interactive: bool = True):
         self.database = database
         self.strategy_engine = strategy_engine
         self.risk_manager = risk_manager
         self.exchange = exchange
+        self.market_data_cache = market_data_cache or MarketDataCache()
+        # Anything with BinanceClient.get_klines' signature, e.g. a BinanceKlineStream
+        self.kline_source = kline_source or exchange
         self.indicators_calc = TechnicalIndicators()
+        # False when nobody watches the console live (e.g. stdout redirected to a file):
+        # the purely descriptive panels are skipped and each cycle only does the data work
+        self.interactive = interactive
         
         self.is_running = False
         self.log_thread = None
+        self.interval = 30.0  # seconds between analyses
+        self._stop_event = threading.Event()  # wakes the logging loop immediately on stop
+        
+        # The risk report is several MongoDB round trips; it runs here while the
+        # main analysis thread waits on Binance for candles
+        self.account_balance = 10000.0  # Simulated; would be the real balance in live trading
+        self._io_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="risk-report")
         
         # Performance tracking
         self.session_start = datetime.utcnow()
@@ -48,6 +71,7 @@ class EnhancedMarketLogger:
             return
         
         self.is_running = True
+        self._stop_event.clear()
         self.log_thread = threading.Thread(target=self._logging_loop, daemon=True)
         self.log_thread.start()
         
@@ -58,19 +82,27 @@ class EnhancedMarketLogger:
     def stop_logging(self):
         """Stop the enhanced logging system"""
         self.is_running = False
+        self._stop_event.set()
         if self.log_thread:
             self.log_thread.join(timeout=5)
         print("🛑 Enhanced logging stopped")
     
     def _logging_loop(self):
         """Main logging loop - runs every 30 seconds"""
+        # Sleep until the next fixed deadline so the analysis time does not push later
+        # cycles back; stop_logging() interrupts the wait
+        next_run = time.monotonic()
         while self.is_running:
             try:
-                self._perform_detailed_analysis()
-                time.sleep(30)  # Wait 30 seconds
+                # The report is dozens of lines; emit it in one write
+                with buffered_output():
+                    self._perform_detailed_analysis()
             except Exception as e:
                 print(f"❌ Enhanced logging error: {e}")
-                time.sleep(30)
+            
+            # An overrun skips the missed slots instead of running back to back
+            next_run += self.interval * (1 + int(max(0.0, time.monotonic() - next_run) // self.interval))
+            self._stop_event.wait(max(0.0, next_run - time.monotonic()))
     
     def _perform_detailed_analysis(self):
         """Perform comprehensive 30-second market analysis"""
@@ -85,6 +117,11 @@ class EnhancedMarketLogger:
         symbol = config.TRADING_CONFIG['symbol'].replace('/', '')  # ETH/USDT -> ETHUSDT
         timeframe = config.TRADING_CONFIG['timeframe']
         
+        # Start the risk report now so it overlaps the market data fetch
+        risk_report = None
+        if self.interactive:
+            risk_report = self._io_pool.submit(self.risk_manager.get_risk_report, self.account_balance)
+        
         # Fetch fresh market data
         market_data = self._fetch_market_data(symbol, timeframe)
         
@@ -100,26 +137,28 @@ class EnhancedMarketLogger:
             return
         
         # Current price analysis
-        current_price = float(market_data['close'].iloc[-1])
+        current_price = float(market_data['close'].iat[-1])
         self._analyze_price_movement(symbol, current_price)
         
         # Technical indicators summary
-        self._analyze_technical_indicators(indicators, current_price)
+        if self.interactive:
+            self._analyze_technical_indicators(indicators, current_price)
         
         # Strategy signals analysis
         self._analyze_all_strategies(symbol, market_data, indicators)
         
-        # Risk and portfolio analysis
-        self._analyze_risk_and_portfolio()
-        
-        # Market sentiment and alerts
-        self._analyze_market_sentiment(market_data, indicators)
-        
-        # Performance summary
-        self._show_session_performance()
+        if self.interactive:
+            # Risk and portfolio analysis
+            self._analyze_risk_and_portfolio(risk_report)
+            
+            # Market sentiment and alerts
+            self._analyze_market_sentiment(market_data, indicators)
+            
+            # Performance summary
+            self._show_session_performance()
         
         # Store analysis in database
-        self._store_analysis_data(symbol, timeframe, indicators, market_data)
+        self._store_analysis_data(symbol, timeframe, indicators, market_data, current_time)
         
         print(f"{'='*80}")
     
@@ -129,36 +168,17 @@ class EnhancedMarketLogger:
             if not self.exchange.client:
                 return None
                 
-            binance_interval = self._map_timeframe(timeframe)
-            klines = self.exchange.get_klines(symbol=symbol, interval=binance_interval, limit=limit)
-            
-            if not klines:
-                return None
-            
-            df = pd.DataFrame(klines, columns=[
-                'timestamp', 'open', 'high', 'low', 'close', 'volume',
-                'close_time', 'quote_asset_volume', 'number_of_trades',
-                'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore'
-            ])
-            
-            for col in ['open', 'high', 'low', 'close', 'volume']:
-                df[col] = pd.to_numeric(df[col])
-                
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            return df[['timestamp', 'open', 'high', 'low', 'close', 'volume']]
+            binance_interval = TIMEFRAME_MAP.get(timeframe, '5m')
+            market_data = self.market_data_cache.get(
+                symbol, binance_interval, limit,
+                lambda n: self.kline_source.get_klines(symbol=symbol, interval=binance_interval, limit=n)
+            )
+            return market_data.to_dataframe() if market_data is not None else None
             
         except Exception as e:
             print(f"❌ Error fetching market data: {e}")
             return None
     
-    def _map_timeframe(self, timeframe: str) -> str:
-        """Map timeframe to Binance format"""
-        mapping = {
-            '1m': '1m', '5m': '5m', '15m': '15m', '30m': '30m',
-            '1h': '1h', '4h': '4h', '1d': '1d'
-        }
-        return mapping.get(timeframe, '5m')
-    
     def _analyze_price_movement(self, symbol: str, current_price: float):
         """Analyze price movement and changes"""
         print(f"💰 PRICE ANALYSIS - {symbol}")
@@ -201,7 +221,7 @@ class EnhancedMarketLogger:
         macd = indicators.get('macd', 0)
         macd_signal = indicators.get('macd_signal', 0)
         
-        rsi_status = "🔴 OVERBOUGHT" if rsi > 70 else "🟢 OVERSOLD" if rsi < 30 else "🟡 NEUTRAL"
+        rsi_status = self.indicators_calc.classify(rsi, RSI_ZONES, ("🟢 OVERSOLD", "🟡 NEUTRAL", "🔴 OVERBOUGHT"))
         macd_status = "🟢 BULLISH" if macd > macd_signal else "🔴 BEARISH"
         
         print(f"   RSI: {rsi:.1f} ({rsi_status})")
@@ -214,11 +234,12 @@ class EnhancedMarketLogger:
         bb_position = indicators.get('bb_position', 0.5)
         
         volatility_pct = (atr / current_price) * 100 if atr > 0 else 0
-        volatility_status = "🔴 HIGH" if volatility_pct > 3 else "🟢 LOW" if volatility_pct < 1.5 else "🟡 NORMAL"
+        volatility_status = self.indicators_calc.classify(volatility_pct, VOLATILITY_ZONES, ("🟢 LOW", "🟡 NORMAL", "🔴 HIGH"))
         
         print(f"   Volatility (ATR): {volatility_pct:.2f}% ({volatility_status})")
         print(f"   Bollinger Bands: ${bb_lower:,.2f} - ${bb_upper:,.2f}")
-        print(f"   BB Position: {bb_position:.1%} {'(Lower)' if bb_position < 0.3 else '(Upper)' if bb_position > 0.7 else '(Middle)'}")
+        bb_zone = self.indicators_calc.classify(bb_position, REPORT_BB_POSITION_ZONES, ('(Lower)', '(Middle)', '(Upper)'))
+        print(f"   BB Position: {bb_position:.1%} {bb_zone}")
         
         # Volume Analysis
         volume_above_avg = indicators.get('volume_above_average', False)
@@ -232,7 +253,7 @@ class EnhancedMarketLogger:
         print(f"\n🎯 STRATEGY SIGNALS")
         
         # Get signals from strategy engine
-        signals = self.strategy_engine.analyze_market(symbol, market_data, config.STRATEGY_CONFIG)
+        signals = self.strategy_engine.analyze_market(symbol, market_data, config.STRATEGY_CONFIG, indicators)
         
         if not signals:
             print("   ⚠️ No signals generated from active strategies")
@@ -266,15 +287,13 @@ class EnhancedMarketLogger:
             if consensus['signal'] in ['BUY', 'SELL']:
                 self.signals_today += 1
     
-    def _analyze_risk_and_portfolio(self):
+    def _analyze_risk_and_portfolio(self, risk_report_future: Future):
         """Analyze current risk metrics and portfolio status"""
         print(f"\n⚖️ RISK & PORTFOLIO")
         
         try:
-            # Get account balance (simulated for now)
-            account_balance = 10000.0  # This would be real balance in live trading
-            
-            risk_report = self.risk_manager.get_risk_report(account_balance)
+            account_balance = self.account_balance
+            risk_report = risk_report_future.result()
             
             print(f"   💰 Account Balance: ${account_balance:,.2f}")
             print(f"   📊 Daily P&L: ${risk_report['daily_pnl']['amount']:+,.2f} ({risk_report['daily_pnl']['percentage']:+.2f}%)")
@@ -305,8 +324,8 @@ class EnhancedMarketLogger:
         
         # Price trend (last 24 candles)
         if len(market_data) >= 24:
-            price_24h_ago = float(market_data['close'].iloc[-24])
-            current_price = float(market_data['close'].iloc[-1])
+            price_24h_ago = float(market_data['close'].iat[-24])
+            current_price = float(market_data['close'].iat[-1])
             price_change_24h = ((current_price - price_24h_ago) / price_24h_ago) * 100
             
             if price_change_24h > 2:
@@ -388,34 +407,31 @@ class EnhancedMarketLogger:
             for alert in self.price_alerts[-2:]:  # Show last 2 alerts
                 print(f"      └─ {alert}")
     
-    def _store_analysis_data(self, symbol: str, timeframe: str, indicators: Dict[str, Any], market_data: pd.DataFrame):
-        """Store analysis data in database"""
+    def _store_analysis_data(self, symbol: str, timeframe: str, indicators: Dict[str, Any],
+                             market_data: pd.DataFrame, now: datetime):
+        """Store analysis data in database, stamped with the analysis time"""
         try:
             # Store latest market data
-            latest = market_data.iloc[-1]
-            self.database.insert_market_data(symbol, timeframe, {
-                'timestamp': latest['timestamp'],
-                'open': latest['open'],
-                'high': latest['high'],
-                'low': latest['low'],
-                'close': latest['close'],
-                'volume': latest['volume']
-            })
+            # Scalar reads per column; iloc[-1] would first build a mixed-dtype row Series
+            latest = {'timestamp': market_data['timestamp'].iat[-1]}
+            latest.update((column, float(market_data[column].iat[-1])) for column in OHLCV_COLUMNS)
+            self.database.insert_market_data(symbol, timeframe, latest, now=now)
             
             # Store indicators
             self.database.insert_indicators(
                 symbol=symbol,
                 timeframe=timeframe,
-                timestamp=datetime.utcnow(),
-                indicators_data=indicators
+                timestamp=now,
+                indicators_data=indicators,
+                now=now
             )
             
             # Log activity
             self.database.log_bot_activity('INFO', f'Enhanced analysis #{self.analysis_count} completed', {
                 'symbol': symbol,
                 'indicators_count': len(indicators),
-                'analysis_time': datetime.utcnow().isoformat()
-            })
+                'analysis_time': now.isoformat()
+            }, now=now)
             
         except Exception as e:
             print(f"   ⚠️ Database storage error: {e}")
@@ -1,4 +1,7 @@
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
 from datetime import datetime
 from typing import Dict, Any, Optional
@@ -6,6 +9,18 @@ from core.database_schema import TradingDatabase
 import json
 import traceback
 
+# Drains the 'TradingBot' logger's queue into the file and console handlers
+_listener: Optional[logging.handlers.QueueListener] = None
+
+def _stop_listener():
+    """Write out everything still queued and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+atexit.register(_stop_listener)
+
 class TradingLogger:
     """Enhanced logging system for trading bot with database integration"""
     
@@ -27,6 +42,8 @@ class TradingLogger:
     def setup_logging(self):
         """Setup logging configuration"""
         
+        global _listener
+        
         # Create logger
         self.logger = logging.getLogger('TradingBot')
         self.logger.setLevel(getattr(logging, self.config.get('log_level', 'INFO')))
@@ -34,6 +51,7 @@ class TradingLogger:
         # Remove existing handlers
         for handler in self.logger.handlers[:]:
             self.logger.removeHandler(handler)
+        _stop_listener()
         
         # Create formatters
         detailed_formatter = logging.Formatter(
@@ -50,13 +68,19 @@ class TradingLogger:
         file_handler = logging.FileHandler(log_file)
         file_handler.setLevel(logging.DEBUG)
         file_handler.setFormatter(detailed_formatter)
-        self.logger.addHandler(file_handler)
         
         # Console handler for important messages
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setLevel(getattr(logging, self.config.get('console_log_level', 'INFO')))
         console_handler.setFormatter(console_formatter)
-        self.logger.addHandler(console_handler)
+        
+        # Trading threads only enqueue records; one background thread does the file and
+        # console writes, so a slow disk or terminal never stalls a trade cycle
+        log_queue = queue.SimpleQueue()
+        self.logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        _listener = logging.handlers.QueueListener(log_queue, file_handler, console_handler,
+                                                   respect_handler_level=True)
+        _listener.start()
         
         # Prevent duplicate logs
         self.logger.propagate = False
@@ -233,18 +257,19 @@ class TradingLogger:
         """Create a comprehensive session summary"""
         uptime = datetime.utcnow() - self.performance_metrics['session_start']
         
-        # Get recent performance from database
-        recent_logs = list(self.database.logs.find({
-            'timestamp': {'$gte': self.performance_metrics['session_start']}
-        }).sort('timestamp', -1))
-        
-        log_counts = {
-            'INFO': len([log for log in recent_logs if log['level'] == 'INFO']),
-            'WARNING': len([log for log in recent_logs if log['level'] == 'WARNING']),
-            'ERROR': len([log for log in recent_logs if log['level'] == 'ERROR']),
-            'DEBUG': len([log for log in recent_logs if log['level'] == 'DEBUG'])
+        # Count this session's logs per level on the server; $group only reads level, so
+        # the {timestamp, level} index covers the pipeline and no log documents are fetched
+        self.database.flush_writes()
+        level_counts = {
+            row['_id']: row['count']
+            for row in self.database.logs.aggregate([
+                {'$match': {'timestamp': {'$gte': self.performance_metrics['session_start']}}},
+                {'$group': {'_id': '$level', 'count': {'$sum': 1}}}
+            ])
         }
         
+        log_counts = {level: level_counts.get(level, 0) for level in ('INFO', 'WARNING', 'ERROR', 'DEBUG')}
+        
         summary = {
             'session_start': self.performance_metrics['session_start'],
             'session_end': datetime.utcnow(),
@@ -252,7 +277,7 @@ class TradingLogger:
             'uptime_hours': uptime.total_seconds() / 3600,
             'performance_metrics': self.performance_metrics,
             'log_counts': log_counts,
-            'total_logs': len(recent_logs)
+            'total_logs': sum(level_counts.values())
         }
         
         return summary